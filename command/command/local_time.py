@@ -1,8 +1,28 @@
-"""Qiita記事 「Python script を pip でインストール可能にする」 のサンプルプログラム."""
+"""Qiita記事 「Python script を pip でインストール可能にする」 のサンプルプログラム.
+
+コマンドの起動を速くするため、arrow は必要になったときに読み込みます.
+"""
 
 import argparse
+from datetime import datetime, timezone
+
+from dateutil.tz import gettz
+from mtools.clock_util.formatter import format_datetime
+
+
+def to_local(utc: datetime, zone: str) -> datetime:
+    """UTC の日時を指定したタイムゾーンの日時に変換します.
 
-import arrow
+    :param utc: UTC の日時.
+    :param zone: タイムゾーン. 例) Asia/Tokyo
+    :return: 指定したタイムゾーンの日時.
+    """
+    tz = gettz(zone) if "/" in zone else None
+    if tz is None:
+        # "local" や "+09:00" などは arrow で変換する.
+        import arrow
+        return arrow.get(utc).to(zone).datetime
+    return utc.astimezone(tz)
 
 
 class LocalTime():
@@ -22,11 +42,11 @@ class LocalTime():
 
         :param full: Trueの場合は日付時刻を表示し、Falseの場合は時刻のみ表示します.
         """
-        utc = arrow.utcnow()
+        utc = datetime.now(timezone.utc)
         for zone in self.time_zones:
             fmt = self.time_format if full else self.time_format_short
             # ローカル時刻に変換する.
-            s = utc.to(zone).format(fmt)
+            s = format_datetime(to_local(utc, zone), fmt)
             # Asia 等は省いて表示する.
             print(f"{zone.split('/')[1]}\t{s}".expandtabs(16))
 
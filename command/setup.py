@@ -6,7 +6,10 @@ setup(
     name="lt",
     packages=find_packages(),
     install_requires=[
-        "arrow"],
+        "arrow",
+        "python-dateutil",
+        # 時刻の書式の解釈をキャッシュする. microlib_tools/microlibs/clock_util_module からインストールします.
+        "mtools_clock_util"],
     # lt コマンドはここで設定.
     entry_points={
         'console_scripts': ['lt=command.local_time:exec']})
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest import TestCase
+
+from nose.tools import eq_, ok_
+
+# command のディレクトリ.
+ROOT = Path(__file__).resolve().parent.parent
+CLOCK_UTIL = ROOT.parent / "microlib_tools" / "microlibs" / "clock_util_module"
+# lt コマンドで読み込んではいけないモジュール.
+HEAVY_MODULES = ["arrow"]
+# lt コマンドを実行し、読み込まれたモジュールの一覧を標準エラー出力に書き出すスクリプト.
+SCRIPT = """
+import json, sys
+from command.local_time import exec
+sys.argv = ["lt"] + sys.argv[1:]
+exec()
+sys.stderr.write(json.dumps(sorted(sys.modules)))
+"""
+
+
+class StartupTestCase(TestCase):
+    """Test case for the modules loaded by the lt command."""
+
+    def run_lt(self, *args: str):
+        """lt コマンドを別のプロセスで実行し、(標準出力, 読み込まれたモジュールの一覧) を返します."""
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join([str(ROOT), str(CLOCK_UTIL), env.get("PYTHONPATH", "")])
+        ret = subprocess.run([sys.executable, "-c", SCRIPT] + list(args), stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE, universal_newlines=True, env=env, check=True)
+        return ret.stdout, json.loads(ret.stderr)
+
+    def test_no_heavy_imports(self) -> None:
+        """Test that the local times are shown without arrow."""
+        for args in ((), ("--time-only",)):
+            out, modules = self.run_lt(*args)
+            eq_(len(out.splitlines()), 3)
+            ok_("mtools.clock_util.formatter" in modules)
+            for module in HEAVY_MODULES:
+                ok_(module not in modules, f"{module} is imported by lt {' '.join(args)}")
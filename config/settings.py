@@ -2,10 +2,10 @@
 
 from pathlib import Path
 
+from mtools.config_util.snapshot import load_config
 from traitlets import Int, List, Unicode
 from traitlets.config import Application
 from traitlets.config.configurable import Configurable
-from traitlets.config.loader import PyFileConfigLoader
 
 # 外部設定ファイル.
 CONFIG_FILE = "config.py"
@@ -25,12 +25,15 @@ class Settings(Configurable):
         pass
 
     def load_config(self) -> None:
-        """設定ファイルを読み込みパラメータを更新する."""
+        """設定ファイルを読み込みパラメータを更新する.
+
+        設定ファイルが前回から変更されていない場合は、実行した結果のキャッシュを使う.
+        キャッシュを削除する場合は mtools.config_util.snapshot.invalidate を使う.
+        """
         p = Path(CONFIG_FILE)
         if p.exists():
             # 設定ファイルが存在すれば読み込む.
-            loader = PyFileConfigLoader(str(p))
-            c = loader.load_config()
+            c = load_config(p)
             # 自身のパラメータを更新する.
             self.update_config(c)
 
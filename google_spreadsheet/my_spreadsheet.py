@@ -2,46 +2,542 @@
 """Google Sheet API V4 を用い、スプレッドシートを操作するサンプルです.
 
 認証情報は使用する環境で適切なものに置き換えてください.
+
+Sheets API のサービスは、google-api-python-client に同梱されている discovery document から
+一度だけ作り、認証済みの HTTP の接続と合わせて使い回します.
+アクセストークンは token_manager.TokenManager で共有し、有効期限の前に更新します.
+
+多数の範囲を読み書きする場合は MySpreadsheet.batch で ValueBatch を作り、
+batchGet / batchUpdate / batchClear でまとめて送信してください.
+大きなテーブルは MySpreadsheet.read_chunks で行のまとまりごとに読み込めます.
+大きな DataFrame は MySpreadsheet.upload で行のまとまりごとに並行して書き込めます.
 """
+import collections
 import datetime
-from typing import Dict, List, Union
-
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+import httplib2
+import numpy as np
 import pandas as pd
-import requests
 from apiclient import discovery
 from oauth2client.client import OAuth2Credentials
 
+from token_manager import ManagedCredentials, get_token_manager
+
 # 認証情報
 CLIENT_ID = "84xxxxxxxxxx.apps.googleusercontent.com"
 CLIENT_SECRET = "jpgIxxxxxxxx"
 REFRESH_TOKEN = "1/RMxxxxxxxx"
+# アクセストークンを保存するファイル. None の場合はプロセス内でだけ共有します.
+TOKEN_CACHE = None
+
+# HTTP のタイムアウト(秒).
+HTTP_TIMEOUT = 60
+# 429 (割り当ての超過) や 5xx のときに再試行する回数. 再試行の間隔は指数的に延ばします.
+NUM_RETRIES = 5
+
+# ValueBatch が一回の要求で送る本文の大きさの上限(バイト). Google は 2 MB 以下を推奨しています.
+MAX_PAYLOAD_BYTES = 2 * 1024 * 1024
+# ValueBatch が一回の batchGet で送る範囲の文字数の上限. 範囲は URL に入るため、URL の長さで制限されます.
+MAX_QUERY_CHARS = 6000
+# ValueBatch が一回の要求で送る範囲の数の上限.
+MAX_RANGES = 500
+# 一分あたりの要求の数の上限. Sheets API の利用者ごとの割り当ては 60 回/分です.
+REQUESTS_PER_MINUTE = 60
+# read_chunks が一回の要求で読み込む行数.
+CHUNK_ROWS = 10000
+# upload が一回の要求で書き込む行数.
+UPLOAD_CHUNK_ROWS = 5000
+# upload が並行して送る要求の数.
+UPLOAD_WORKERS = 4
+
+# A1 形式の範囲. 例) "A2:C", "A2:C100"
+A1_RANGE = re.compile(r"^([A-Za-z]+)(\d*):([A-Za-z]+)(\d*)$")
+# A1 形式の範囲の始まりのセル. 例) "A2", "A2:C"
+A1_START = re.compile(r"^(?:.*!)?([A-Za-z]+)(\d*)")
+
+# 作成したサービスのキャッシュ. httplib2.Http はスレッドセーフではないため、スレッドごとに持つ.
+_local = threading.local()
+
+
+def get_service(credentials: OAuth2Credentials) -> Any:
+    """Sheets API のサービスを返します.
+
+    サービスは認証情報(client_id, refresh_token)ごとに一度だけ作り、同じスレッドで使い回します.
+    discovery document はネットワークから取得せず、google-api-python-client に同梱されているものを使います.
+    HTTP の接続は認証済みの httplib2.Http を共有し、同じホストへの接続を再利用します.
+
+    :param credentials: 認証情報.
+    :return: discovery.build で作ったサービス.
+    """
+    services: Dict[Tuple[str, str], Any] = getattr(_local, "services", None)
+    if services is None:
+        services = _local.services = {}
+    key = (credentials.client_id, credentials.refresh_token)
+    service = services.get(key)
+    if service is None:
+        http = credentials.authorize(httplib2.Http(timeout=HTTP_TIMEOUT))
+        service = discovery.build('sheets', 'v4', http=http,
+                                  cache_discovery=False, static_discovery=True)
+        services[key] = service
+    return service
+
+
+class RateLimiter:
+    """直近一分間の要求の数を数え、上限を超える場合は待つクラス."""
+
+    def __init__(self, per_minute: int = REQUESTS_PER_MINUTE) -> None:
+        """コンストラクタ.
+
+        :param per_minute: 一分あたりの要求の数の上限.
+        """
+        self.per_minute = per_minute
+        self._sent: collections.deque = collections.deque()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """要求を送ってよい時刻まで待ちます."""
+        with self._lock:
+            now = time.monotonic()
+            while self._sent and self._sent[0] <= now - 60:
+                self._sent.popleft()
+            if len(self._sent) >= self.per_minute:
+                # 一番古い要求から一分経つまで待つ.
+                delay = self._sent[0] + 60 - now
+                time.sleep(delay)
+                self._sent.popleft()
+                now += delay
+            self._sent.append(now)
+
+
+# ValueBatch が共有する要求の数の制限.
+rate_limiter = RateLimiter()
+
+
+def _to_cell(value: Any) -> Any:
+    """一つの値を JSON にできるセルの値にします. 欠損値は空のセルにします."""
+    if value is None or value is pd.NA or value is pd.NaT:
+        return ""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return "" if math.isnan(value) or math.isinf(value) else value
+    if isinstance(value, (str, bool, int)):
+        return value
+    if isinstance(value, datetime.datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _column_converter(column: pd.Series) -> Callable[[int, int], List[Any]]:
+    """列の [start, stop) 行をセルの値のリストにする関数を返します.
+
+    数値と日時の列は NumPy の配列のまま変換し、それ以外の列だけ値ごとに _to_cell で変換します.
+    """
+    if isinstance(column.dtype, pd.DatetimeTZDtype):
+        # タイムゾーン付きの日時は現地時刻で書き込む.
+        column = column.dt.tz_localize(None)
+    if isinstance(column.dtype, pd.api.extensions.ExtensionDtype) and column.dtype.kind != "M":
+        # Int64 などの欠損値を扱える型は、整数が浮動小数点数にならないように値ごとに変換する.
+        values = column.to_numpy(dtype=object)
+    else:
+        values = column.to_numpy()
+    kind = values.dtype.kind
+
+    if kind in "iub":
+        return lambda start, stop: values[start:stop].tolist()
+    if kind == "f":
+        def convert_float(start: int, stop: int) -> List[Any]:
+            block = values[start:stop]
+            cells = block.tolist()
+            if not np.isfinite(block).all():
+                cells = [x if math.isfinite(x) else "" for x in cells]
+            return cells
+        return convert_float
+    if kind == "M":
+        def convert_datetime(start: int, stop: int) -> List[Any]:
+            cells = np.datetime_as_string(values[start:stop], unit="s").tolist()
+            return ["" if x == "NaT" else x.replace("T", " ") for x in cells]
+        return convert_datetime
+    if kind == "m":
+        return lambda start, stop: ["" if pd.isna(x) else str(pd.Timedelta(x)) for x in values[start:stop]]
+    return lambda start, stop: [_to_cell(x) for x in values[start:stop]]
+
+
+class _RowSerializer:
+    """DataFrame の行のまとまりを、スプレッドシートに書き込む値のリストにするクラス.
+
+    列ごとに変換するため、DataFrame 全体を Python のリストにすることはありません.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.length = len(df)
+        self.width = df.shape[1]
+        self.header = [_to_cell(c) for c in df.columns]
+        self.converters = [_column_converter(df.iloc[:, i]) for i in range(self.width)]
+
+    def rows(self, start: int, stop: int) -> List[Any]:
+        """[start, stop) 行の値のリストを返します."""
+        stop = min(stop, self.length)
+        if not self.width:
+            return [[] for _ in range(start, stop)]
+        return list(zip(*[convert(start, stop) for convert in self.converters]))
+
+
+def _to_values(df: pd.DataFrame, header: bool) -> List[Any]:
+    """DataFrame をスプレッドシートに書き込む値のリストにします."""
+    serializer = _RowSerializer(df)
+    rows = serializer.rows(0, len(df))
+    if header:
+        rows.insert(0, serializer.header)
+    return rows
+
+
+def _to_frame(values: List[List[Any]], header: bool) -> pd.DataFrame:
+    """スプレッドシートから読み込んだ値のリストを DataFrame にします."""
+    if header:
+        return pd.DataFrame(values[1:], columns=values[0] if values else None)
+    return pd.DataFrame(values)
+
+
+def _column_number(letters: str) -> int:
+    """列の名前を番号にします. 例) "A" -> 1, "AA" -> 27"""
+    n = 0
+    for c in letters.upper():
+        n = n * 26 + ord(c) - ord("A") + 1
+    return n
+
+
+def _parse_range(sheet_range: str) -> Tuple[str, int, str, Optional[int]]:
+    """A1 形式の範囲を (始まりの列, 始まりの行, 終わりの列, 終わりの行) にします.
+
+    行を省略した場合、始まりの行は 1、終わりの行は None(データが続くまで)になります.
+
+    :raises ValueError: "A2:C" のような形式ではない場合.
+    """
+    m = A1_RANGE.match(sheet_range)
+    if m is None:
+        raise ValueError(f"Range must be like 'A2:C' or 'A2:C100': {sheet_range}")
+    start_col, start_row, end_col, end_row = m.groups()
+    return start_col, int(start_row or 1), end_col, int(end_row) if end_row else None
+
+
+def _column_letters(n: int) -> str:
+    """列の番号を名前にします. 例) 1 -> "A", 27 -> "AA" """
+    letters = ""
+    while n:
+        n, r = divmod(n - 1, 26)
+        letters = chr(ord("A") + r) + letters
+    return letters
+
+
+def _pad_header(columns: List[Any], start_col: str, width: int) -> List[Any]:
+    """見出しの行を width 列に揃えます.
+
+    スプレッドシートの API は行末の空のセルを省略するため、見出しのない列にはシートの列の名前を付けます.
+    """
+    first = _column_number(start_col)
+    return columns + [_column_letters(first + i) for i in range(len(columns), width)]
+
+
+def _pad_rows(rows: List[List[Any]], width: int) -> List[List[Any]]:
+    """各行の長さを width に揃えます. 行のリストはその場で変更します.
+
+    スプレッドシートの API は行末の空のセルを省略するため、短い行は None で埋めます.
+    """
+    for row in rows:
+        n = len(row)
+        if n < width:
+            row.extend([None] * (width - n))
+        elif n > width:
+            del row[width:]
+    return rows
+
+
+def _apply_dtypes(df: pd.DataFrame, dtypes: List[Any]) -> pd.DataFrame:
+    """各列を dtypes の型に変換します. 変換できない列はそのままにします."""
+    for i, dtype in enumerate(dtypes):
+        column = df.iloc[:, i]
+        if column.dtype != dtype:
+            try:
+                df.isetitem(i, column.astype(dtype))
+            except (ValueError, TypeError):
+                pass
+    return df
+
+
+def _query_size(_range: str) -> int:
+    """batchGet の URL のクエリで、範囲が占める文字数を返します.
+
+    範囲は "&ranges=<パーセントエンコードした範囲>" としてクエリに入ります.
+    """
+    return len(urllib.parse.quote(_range, safe="")) + len("&ranges=")
+
+
+def _chunks(items: Sequence[Any], size: Callable[[Any], int], max_size: int) -> Iterator[List[Any]]:
+    """items を、大きさの合計が max_size 以下かつ MAX_RANGES 個以下のまとまりに分けます.
+
+    一つで max_size を超えるものは、それだけのまとまりにします.
+    """
+    chunk: List[Any] = []
+    total = 0
+    for item in items:
+        n = size(item)
+        if chunk and (total + n > max_size or len(chunk) >= MAX_RANGES):
+            yield chunk
+            chunk, total = [], 0
+        chunk.append(item)
+        total += n
+    if chunk:
+        yield chunk
+
+
+class ValueBatch:
+    """複数の範囲の読み込み・更新・削除をためておき、まとめて送信するクラス.
+
+    続けて追加した同じ種類の操作は batchGet / batchUpdate / batchClear の一回の要求にまとめます.
+    要求は本文の大きさと範囲の数で自動的に分割し、一分あたりの要求の数の上限を超えないように送信します.
+    操作は追加した順に実行されます.
+
+    :Example:
+
+        >>> with ms.batch(spreadsheet_id) as batch:
+        ...     batch.clear("Sheet1", "A:Z")
+        ...     batch.update("Sheet1", "A1", df, header=True)
+        ...     batch.get("Sheet1", "A1:C")
+        >>> batch.results["Sheet1!A1:C"]
+           id  value1  value2
+        0   1     110     210
+    """
+
+    def __init__(self, spreadsheet: "MySpreadsheet", spreadsheet_id: str,
+                 limiter: Optional[RateLimiter] = None) -> None:
+        """コンストラクタ.
+
+        :param spreadsheet: 送信に使う MySpreadsheet.
+        :param spreadsheet_id: スプレッドシート ID.
+        :param limiter: 要求の数の制限. 省略した場合はプロセスで共有する rate_limiter を使います.
+        """
+        self.spreadsheet = spreadsheet
+        self.spreadsheet_id = spreadsheet_id
+        self.limiter = limiter or rate_limiter
+        # (操作の種類, 範囲, 引数) のリスト.
+        self._ops: List[Tuple[str, str, Any]] = []
+        # 範囲 -> 結果.
+        self.results: Dict[str, Any] = {}
+
+    def __enter__(self) -> "ValueBatch":
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        if exc_type is None:
+            self.execute()
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def get(self, sheet_name: str, sheet_range: str, header: bool = True) -> str:
+        """範囲の読み込みを追加します. 結果は読み込んだテーブルの DataFrame です.
+
+        :param sheet_name: シートの名前.
+        :param sheet_range: 読み込む範囲. 例) "A2:C"
+        :param header: 先頭行は各カラム名ならTrueを指定してください.
+        :return: 結果を参照するための範囲. 例) "Sheet1!A2:C"
+        """
+        return self._add("get", f"{sheet_name}!{sheet_range}", header)
+
+    def update(self, sheet_name: str, sheet_range: str, df: pd.DataFrame, header: bool = False) -> str:
+        """範囲の更新を追加します. 結果は UpdateValuesResponse の辞書です.
+
+        :param sheet_name: シートの名前.
+        :param sheet_range: 更新する範囲. 例) "A2"
+        :param df: 更新する情報が入っている DataFrame.
+        :param header: カラム名を書き込む場合は True を設定してください.
+        :return: 結果を参照するための範囲.
+        """
+        _range = f"{sheet_name}!{sheet_range}"
+        data = {"range": _range, "values": _to_values(df, header)}
+        # 分割のために大きさを求めておく.
+        size = len(json.dumps(data, default=str).encode("utf-8"))
+        return self._add("update", _range, (data, size))
+
+    def clear(self, sheet_name: str, sheet_range: str) -> str:
+        """範囲の削除を追加します. 結果は削除した範囲です.
+
+        :param sheet_name: シートの名前.
+        :param sheet_range: 削除する範囲. 例) "A:Z"
+        :return: 結果を参照するための範囲.
+        """
+        return self._add("clear", f"{sheet_name}!{sheet_range}", None)
+
+    def _add(self, kind: str, _range: str, arg: Any) -> str:
+        self._ops.append((kind, _range, arg))
+        return _range
+
+    def execute(self) -> Dict[str, Any]:
+        """ためておいた操作を送信します.
+
+        同じ範囲に複数の操作を追加した場合、結果は最後の操作のものになります.
+
+        :return: 範囲 -> 結果 の辞書. self.results と同じものです.
+        """
+        ops, self._ops = self._ops, []
+        start = 0
+        while start < len(ops):
+            # 続けて追加された同じ種類の操作をまとめる.
+            kind = ops[start][0]
+            end = start
+            while end < len(ops) and ops[end][0] == kind:
+                end += 1
+            getattr(self, f"_send_{kind}")(ops[start:end])
+            start = end
+        return self.results
+
+    def _execute(self, request: Any) -> Dict[str, Any]:
+        """要求の数の上限を守って要求を送信します."""
+        self.limiter.wait()
+        return request.execute(num_retries=NUM_RETRIES)
+
+    def _send_get(self, ops: List[Tuple[str, str, Any]]) -> None:
+        values = self.spreadsheet.service.spreadsheets().values()
+        for chunk in _chunks(ops, lambda op: _query_size(op[1]), MAX_QUERY_CHARS):
+            response = self._execute(values.batchGet(spreadsheetId=self.spreadsheet_id,
+                                                     ranges=[op[1] for op in chunk],
+                                                     valueRenderOption="UNFORMATTED_VALUE"))
+            for (_, _range, header), value_range in zip(chunk, response["valueRanges"]):
+                self.results[_range] = _to_frame(value_range.get("values", []), header)
+
+    def _send_update(self, ops: List[Tuple[str, str, Any]]) -> None:
+        values = self.spreadsheet.service.spreadsheets().values()
+        for chunk in _chunks(ops, lambda op: op[2][1], MAX_PAYLOAD_BYTES):
+            body = {"valueInputOption": "USER_ENTERED", "data": [op[2][0] for op in chunk]}
+            response = self._execute(values.batchUpdate(spreadsheetId=self.spreadsheet_id, body=body))
+            for (_, _range, _), result in zip(chunk, response.get("responses", [])):
+                self.results[_range] = result
+
+    def _send_clear(self, ops: List[Tuple[str, str, Any]]) -> None:
+        values = self.spreadsheet.service.spreadsheets().values()
+        for chunk in _chunks(ops, lambda op: len(op[1]) + 8, MAX_PAYLOAD_BYTES):
+            body = {"ranges": [op[1] for op in chunk]}
+            response = self._execute(values.batchClear(spreadsheetId=self.spreadsheet_id, body=body))
+            for (_, _range, _), cleared in zip(chunk, response.get("clearedRanges", [])):
+                self.results[_range] = cleared
+
+
+class UploadError(Exception):
+    """upload が途中で失敗した場合の例外.
+
+    checkpoint を upload に渡すと、書き込みが済んでいないまとまりから再開します.
+    """
+
+    def __init__(self, message: str, checkpoint: "UploadCheckpoint") -> None:
+        super().__init__(message)
+        self.checkpoint = checkpoint
+
+
+class UploadCheckpoint:
+    """upload で書き込みが済んだまとまりを記録するクラス.
+
+    path を指定した場合はファイルにも記録するため、プロセスを起動し直しても再開できます.
+    書き込みがすべて済んだ場合はファイルを削除します.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        """コンストラクタ.
+
+        :param path: 記録するファイルのパス. 省略した場合はメモリ上にだけ記録します.
+        """
+        self.path = Path(path) if path else None
+        # 書き込む内容を表す文字列. 内容が変わった場合は記録を使いません.
+        self.key: Optional[str] = None
+        # 書き込みが済んだまとまりの番号.
+        self.done: Set[int] = set()
+        # append の場合に、最初のまとまりが書き込まれたセル. 例) ("A", 5)
+        self.start: Optional[Tuple[str, int]] = None
+        self._lock = threading.Lock()
+
+    def begin(self, key: str) -> None:
+        """書き込みを始めます. 同じ内容の記録があれば引き継ぎます.
+
+        :param key: 書き込む内容を表す文字列.
+        """
+        if self.key == key:
+            return
+        self.key, self.done, self.start = key, set(), None
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("key") == key:
+            self.done = set(data["done"])
+            self.start = tuple(data["start"]) if data.get("start") else None
+
+    def commit(self, index: int) -> None:
+        """まとまりの書き込みが済んだことを記録します.
+
+        :param index: まとまりの番号.
+        """
+        with self._lock:
+            self.done.add(index)
+            if self.path is not None:
+                content = json.dumps({"key": self.key, "done": sorted(self.done), "start": self.start})
+                tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+                tmp.write_text(content, encoding="utf-8")
+                os.replace(str(tmp), str(self.path))
+
+    def finish(self) -> None:
+        """書き込みがすべて済んだので記録を削除します."""
+        self.key, self.done, self.start = None, set(), None
+        if self.path is not None:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
 
 
 class MySpreadsheet:
     """Google Spreadsheet を操作します."""
 
-    def __init__(self):
-        """初期化. OAuth認証もここで行います."""
-        refresh_params = {
-            "client_id": CLIENT_ID,
-            "refresh_token": REFRESH_TOKEN,
-            "client_secret": CLIENT_SECRET,
-            "grant_type": "refresh_token"}
-
-        rs = requests.post('https://accounts.google.com/o/oauth2/token',
-                           refresh_params).json()
-        expiry = datetime.datetime.now() + datetime.timedelta(seconds=rs['expires_in'])
-
-        cred_params = {
-            'access_token': rs['access_token'],
-            'client_id': CLIENT_ID,
-            'client_secret': CLIENT_SECRET,
-            'refresh_token': REFRESH_TOKEN,
-            'token_expiry': expiry,
-            'token_uri': 'https://accounts.google.com/o/oauth2/token',
-            'user_agent': ''}
-
-        self.credentials = OAuth2Credentials(**cred_params)
+    def __init__(self, token_cache: Optional[Union[str, Path]] = TOKEN_CACHE) -> None:
+        """初期化.
+
+        アクセストークンは同じ認証情報の MySpreadsheet で共有する TokenManager から受け取ります.
+        初期化ではトークンを取得せず、最初の要求の前に取得します.
+
+        :param token_cache: アクセストークンを保存するファイルのパス. 複数のプロセスで共有する場合に指定します.
+        """
+        manager = get_token_manager(CLIENT_ID, CLIENT_SECRET, REFRESH_TOKEN, token_cache)
+        self.credentials = ManagedCredentials(manager)
+
+    @property
+    def service(self) -> Any:
+        """Sheets API のサービス. 同じ認証情報のインスタンスで共有します."""
+        return get_service(self.credentials)
+
+    def batch(self, spreadsheet_id: str) -> ValueBatch:
+        """複数の範囲の操作をまとめて送信するための ValueBatch を返します.
+
+        :param spreadsheet_id: スプレッドシート ID.
+        :return: ValueBatch. with 文で使うと、ブロックを抜けるときに送信します.
+        """
+        return ValueBatch(self, spreadsheet_id)
 
     def create(self, title: str) -> Dict[str, Union[str, List[str]]]:
         """スプレッドシートを新規作成します.
@@ -49,9 +545,8 @@ class MySpreadsheet:
         :param title: スプレッドシートのタイトル.
         :return: スプレッドシートの属性.
         """
-        service = discovery.build('sheets', 'v4', credentials=self.credentials)
         body = {"properties": {"title": title}}
-        request = service.spreadsheets().create(body=body)
+        request = self.service.spreadsheets().create(body=body)
         response = request.execute()
 
         return {"id": response["spreadsheetId"],
@@ -59,33 +554,102 @@ class MySpreadsheet:
                 "sheets": [x["properties"]["title"] for x in response["sheets"]]}
 
     def read(self, spreadsheet_id: int, sheet_name: str, sheet_range: str,
-             header: bool = True) -> pd.DataFrame:
+             header: bool = True, chunk_size: Optional[int] = None) -> pd.DataFrame:
         """スプレッドシートのテーブルを読込み、pandas DataFrame にして返します.
 
         :param spreadsheet_id: スプレッドシート ID.
         :param sheet_name: シートの名前.
         :param sheet_range: 読み込む範囲. 例) "A2:C" A2からC行のデータが続くまで.
         :param header: 先頭行は各カラム名ならTrueを指定してください.
+        :param chunk_size: 指定した場合は read_chunks で chunk_size 行ずつ読み込んでから連結します.
+            大きなテーブルで、読み込み中に使用するメモリを減らせます.
         :return: 読み込んだテーブルの情報が入った DataFrame.
         """
-        service = discovery.build('sheets', 'v4', credentials=self.credentials)
+        if chunk_size is not None:
+            frames = list(self.read_chunks(spreadsheet_id, sheet_name, sheet_range, header, chunk_size))
+            if not frames:
+                return pd.DataFrame()
+            return pd.concat(frames, ignore_index=True)
+
         _range = f"{sheet_name}!{sheet_range}"
-        request = service.spreadsheets().values().get(spreadsheetId=spreadsheet_id,
-                                                      range=_range,
-                                                      valueRenderOption="UNFORMATTED_VALUE")
+        request = self.service.spreadsheets().values().get(spreadsheetId=spreadsheet_id,
+                                                           range=_range,
+                                                           valueRenderOption="UNFORMATTED_VALUE")
         response = request.execute()
         values = response["values"]
 
         if header:
-            columns = values[0]
-            values = values[1:]
+            # 全ての行をコピーしないように、先頭行はその場で取り除く.
+            columns = values.pop(0)
         else:
             columns = None
 
         return pd.DataFrame(values, columns=columns)
 
+    def read_chunks(self, spreadsheet_id: str, sheet_name: str, sheet_range: str,
+                    header: bool = True, chunk_size: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """スプレッドシートのテーブルを chunk_size 行ずつ読み込み、DataFrame にして順に返します.
+
+        全ての行を一度に読み込まないため、大きなテーブルでも使用するメモリは chunk_size 行分で済みます.
+
+        - 行末の空のセルは None で埋めます.
+        - 各列の型は最初のまとまりから決め、以降のまとまりも同じ型にします. (変換できない列はそのままです.)
+        - index は全体を通した行番号(0 から)です.
+        - 見出しの行末の空のセルには列の名前(例: "C")を付けます.
+        - 途中の空の行は、一度に読み込んだ場合と同じく None の行になります.
+          まとまりの末尾の空の行は、次のまとまりの先頭に含めて返します.
+        - chunk_size 行がすべて空のまとまりがあると、そこでテーブルが終わったとみなします.
+
+        :param spreadsheet_id: スプレッドシート ID.
+        :param sheet_name: シートの名前.
+        :param sheet_range: 読み込む範囲. 例) "A2:C" A2からC行のデータが続くまで.
+            "A2:C1000" のように終わりの行も指定できます.
+        :param header: 先頭行は各カラム名ならTrueを指定してください.
+        :param chunk_size: 一回の要求で読み込む行数.
+        :return: chunk_size 行ずつの DataFrame のイテレータ.
+        :raises ValueError: 範囲が "A2:C" のような形式ではない場合.
+        """
+        start_col, row, end_col, last_row = _parse_range(sheet_range)
+        width = _column_number(end_col) - _column_number(start_col) + 1
+        columns: Optional[List[Any]] = None
+        dtypes: Optional[List[Any]] = None
+        index = 0
+        # 前のまとまりの末尾にある空の行の数.
+        blank = 0
+        values = self.service.spreadsheets().values()
+        while last_row is None or row <= last_row:
+            end = row + chunk_size - 1 if last_row is None else min(row + chunk_size - 1, last_row)
+            rate_limiter.wait()
+            response = values.get(spreadsheetId=spreadsheet_id,
+                                  range=f"{sheet_name}!{start_col}{row}:{end_col}{end}",
+                                  valueRenderOption="UNFORMATTED_VALUE").execute(num_retries=NUM_RETRIES)
+            rows = response.get("values", [])
+            del response
+            # 一行も返ってこない場合は、テーブルの終わりに達している.
+            if not rows:
+                return
+            returned = len(rows)
+            # 前のまとまりの末尾の空の行は省略されているため、この位置で補う.
+            if blank:
+                rows[:0] = [[] for _ in range(blank)]
+            blank = end - row + 1 - returned
+            row = end + 1
+
+            if header and columns is None:
+                columns = _pad_header(rows.pop(0), start_col, width)
+            if rows:
+                df = pd.DataFrame(_pad_rows(rows, width), columns=columns,
+                                  index=pd.RangeIndex(index, index + len(rows)))
+                del rows
+                if dtypes is None:
+                    dtypes = list(df.dtypes)
+                else:
+                    df = _apply_dtypes(df, dtypes)
+                index += len(df)
+                yield df
+
     def update(self, spreadsheet_id: int, sheet_name: str, sheet_range: str,
-               df: pd.DataFrame, header: bool = False) -> None:
+               df: pd.DataFrame, header: bool = False, chunk_rows: Optional[int] = None) -> None:
         """スプレッドシートのテーブルを更新します.
 
         :param spreadsheet_id: スプレッドシート ID.
@@ -93,24 +657,23 @@ class MySpreadsheet:
         :param sheet_range: 読み込む範囲. 例) "A2" 更新する範囲がA2から始まっている.
         :param df: 更新する情報が入っている DataFrame.
         :param header: カラム名を書き込む場合は True を設定してください.
+        :param chunk_rows: 指定した場合は upload で chunk_rows 行ずつ並行して書き込みます.
         """
+        if chunk_rows is not None:
+            self.upload(spreadsheet_id, sheet_name, sheet_range, df, header, chunk_rows=chunk_rows)
+            return
         _range = f"{sheet_name}!{sheet_range}"
-        if header:
-            dat = [df.columns.tolist()] + df.values.tolist()
-        else:
-            dat = df.values.tolist()
-        body = {"values": dat}
+        body = {"values": _to_values(df, header)}
 
         value_input_option = "USER_ENTERED"
-        service = discovery.build('sheets', 'v4', credentials=self.credentials)
-        request = service.spreadsheets().values().update(spreadsheetId=spreadsheet_id,
-                                                         valueInputOption=value_input_option,
-                                                         range=_range,
-                                                         body=body)
+        request = self.service.spreadsheets().values().update(spreadsheetId=spreadsheet_id,
+                                                              valueInputOption=value_input_option,
+                                                              range=_range,
+                                                              body=body)
         request.execute()
 
     def append(self, spreadsheet_id: str, sheet_name: str, sheet_range: str,
-               df: pd.DataFrame, header: bool = False) -> None:
+               df: pd.DataFrame, header: bool = False, chunk_rows: Optional[int] = None) -> None:
         """スプレッドシートのテーブルに情報を加えます.
 
         :param spreadsheet_id: スプレッドシート ID.
@@ -118,22 +681,113 @@ class MySpreadsheet:
         :param sheet_range: 読み込む範囲. 例) "A2" 更新するテーブルはA2から始まっている.
         :param df: 更新する情報が入っている DataFrame.
         :param header: カラム名を書き込む場合は True を設定してください.
+        :param chunk_rows: 指定した場合は upload で chunk_rows 行ずつ並行して書き込みます.
         """
+        if chunk_rows is not None:
+            self.upload(spreadsheet_id, sheet_name, sheet_range, df, header, append=True, chunk_rows=chunk_rows)
+            return
         _range = f"{sheet_name}!{sheet_range}"
         value_input_option = "USER_ENTERED"
-        if header:
-            dat = [df.columns.tolist()] + df.values.tolist()
-        else:
-            dat = df.values.tolist()
-        body = {"values": dat}
-
-        service = discovery.build('sheets', 'v4', credentials=self.credentials)
-        request = service.spreadsheets().values().append(spreadsheetId=spreadsheet_id,
-                                                         valueInputOption=value_input_option,
-                                                         range=_range,
-                                                         body=body)
+        body = {"values": _to_values(df, header)}
+
+        request = self.service.spreadsheets().values().append(spreadsheetId=spreadsheet_id,
+                                                              valueInputOption=value_input_option,
+                                                              range=_range,
+                                                              body=body)
         request.execute()
 
+    def upload(self, spreadsheet_id: str, sheet_name: str, sheet_range: str, df: pd.DataFrame,
+               header: bool = False, append: bool = False, chunk_rows: int = UPLOAD_CHUNK_ROWS,
+               workers: int = UPLOAD_WORKERS,
+               checkpoint: Optional[Union[str, Path, UploadCheckpoint]] = None) -> None:
+        """大きな DataFrame を chunk_rows 行ずつ、並行して書き込みます.
+
+        - 各まとまりは列ごとに変換するため、DataFrame 全体を Python のリストにすることはありません.
+          欠損値(NaN, None, NaT)は空のセル、日時は "YYYY-MM-DD HH:MM:SS" の文字列になります.
+        - まとまりは重ならない範囲に書き込むため、workers 個まで並行して送信します.
+        - append=True の場合は、最初のまとまりを append で書き込んで書き込まれた行を求め、
+          残りのまとまりはその続きの行に書き込みます.
+        - 失敗した場合は UploadError を送出します. 例外の checkpoint(またはファイルのパス)を
+          checkpoint に渡して同じ内容で呼び出すと、書き込みが済んでいないまとまりから再開します.
+
+        :param spreadsheet_id: スプレッドシート ID.
+        :param sheet_name: シートの名前.
+        :param sheet_range: 書き込む範囲の始まり. 例) "A2"
+        :param df: 書き込む情報が入っている DataFrame.
+        :param header: カラム名を書き込む場合は True を設定してください.
+        :param append: テーブルに情報を加える場合は True を設定してください.
+        :param chunk_rows: 一回の要求で書き込む行数.
+        :param workers: 並行して送る要求の数.
+        :param checkpoint: 書き込みが済んだまとまりの記録. ファイルのパスを指定することもできます.
+        :raises UploadError: 書き込みに失敗した場合.
+        """
+        if not isinstance(checkpoint, UploadCheckpoint):
+            checkpoint = UploadCheckpoint(checkpoint)
+        m = A1_START.match(sheet_range)
+        if m is None:
+            raise ValueError(f"Range must start with a cell like 'A2': {sheet_range}")
+        column, row = m.group(1), int(m.group(2) or 1)
+
+        serializer = _RowSerializer(df)
+        n_chunks = math.ceil(len(df) / chunk_rows)
+        if header:
+            n_chunks = max(n_chunks, 1)
+
+        def block(index: int) -> List[Any]:
+            rows = serializer.rows(index * chunk_rows, (index + 1) * chunk_rows)
+            if header and index == 0:
+                rows.insert(0, serializer.header)
+            return rows
+
+        # 同じ長さでも値が違う DataFrame で再開しないように、書き込む値のハッシュを記録の鍵に含める.
+        digest = hashlib.sha256()
+        for i in range(n_chunks):
+            digest.update(json.dumps(block(i), default=str).encode())
+        key = (f"{spreadsheet_id}|{sheet_name}!{sheet_range}|{len(df)}|{chunk_rows}|{header}|{append}"
+               f"|{digest.hexdigest()}")
+        checkpoint.begin(key)
+
+        def execute(request: Any) -> Dict[str, Any]:
+            rate_limiter.wait()
+            return request.execute(num_retries=NUM_RETRIES)
+
+        def send(index: int) -> None:
+            offset = index * chunk_rows + (1 if header and index else 0)
+            _range = f"{sheet_name}!{column}{row + offset}"
+            execute(self.service.spreadsheets().values().update(spreadsheetId=spreadsheet_id,
+                                                                valueInputOption="USER_ENTERED",
+                                                                range=_range,
+                                                                body={"values": block(index)}))
+            checkpoint.commit(index)
+
+        try:
+            if append and n_chunks:
+                if checkpoint.start is None:
+                    # 最初のまとまりを append で書き込み、書き込まれたセルを求める.
+                    response = execute(self.service.spreadsheets().values().append(
+                        spreadsheetId=spreadsheet_id, valueInputOption="USER_ENTERED",
+                        range=f"{sheet_name}!{sheet_range}", body={"values": block(0)}))
+                    start = A1_START.match(response["updates"]["updatedRange"])
+                    checkpoint.start = (start.group(1), int(start.group(2)))
+                    checkpoint.commit(0)
+                column, row = checkpoint.start
+
+            pending = [i for i in range(n_chunks) if i not in checkpoint.done]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(send, i) for i in pending]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                except BaseException:
+                    # 送信していないまとまりは取り消す.
+                    for future in futures:
+                        future.cancel()
+                    raise
+        except Exception as e:
+            raise UploadError(f"Upload failed after {len(checkpoint.done)} of {n_chunks} chunks",
+                              checkpoint) from e
+        checkpoint.finish()
+
     def clear(self, spreadsheet_id: str, sheet_name: str, sheet_range: str) -> None:
         """スプレッドシートのテーブルのうち、指定範囲の情報を削除します.
 
@@ -143,10 +797,9 @@ class MySpreadsheet:
         """
         _range = f"{sheet_name}!{sheet_range}"
         body = {}
-        service = discovery.build('sheets', 'v4', credentials=self.credentials)
-        request = service.spreadsheets().values().clear(spreadsheetId=spreadsheet_id,
-                                                        range=_range,
-                                                        body=body)
+        request = self.service.spreadsheets().values().clear(spreadsheetId=spreadsheet_id,
+                                                             range=_range,
+                                                             body=body)
         request.execute()
 
 
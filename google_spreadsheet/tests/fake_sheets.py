@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""テスト用の Sheets API のサービスの代わり.
+
+service.spreadsheets().values() の要求を calls に記録し、execute されたときに応答を返します.
+get / update / append はシートのセルの表(grid)を読み書きします. シートの名前は区別しません.
+"""
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# A1 形式の範囲. 例) "Sheet1!A2:C100", "Sheet1!A2"
+A1 = re.compile(r"^(?:.*!)?([A-Z]+)(\d+)(?::([A-Z]+)(\d*))?$")
+
+
+def column_number(letters: str) -> int:
+    n = 0
+    for c in letters:
+        n = n * 26 + ord(c) - ord("A") + 1
+    return n
+
+
+def parse(_range: str) -> Tuple[int, int, Optional[int], Optional[int]]:
+    """範囲を (始まりの列, 始まりの行, 終わりの列, 終わりの行) にします. 列と行は 1 から."""
+    start_col, start_row, end_col, end_row = A1.match(_range).groups()
+    return (column_number(start_col), int(start_row),
+            column_number(end_col) if end_col else None, int(end_row) if end_row else None)
+
+
+class FakeRequest:
+    """execute で応答を返す要求."""
+
+    def __init__(self, respond: Callable[[], Dict[str, Any]]) -> None:
+        self.respond = respond
+
+    def execute(self, num_retries: int = 0) -> Dict[str, Any]:
+        return self.respond()
+
+
+class FakeValues:
+    """spreadsheets().values() の代わり. batch* 用の 範囲 -> 値 の辞書と、セルの表を持ちます."""
+
+    def __init__(self) -> None:
+        self.values: Dict[str, List[List[Any]]] = {}
+        # 行 -> 列 -> 値. 行と列は 1 から.
+        self.grid: Dict[int, Dict[int, Any]] = {}
+        # (メソッドの名前, 引数) のリスト.
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+        # update がこれらの行から書き込もうとすると失敗する.
+        self.fail_rows: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def _request(self, name: str, kwargs: Dict[str, Any], respond: Callable[[], Dict[str, Any]]) -> FakeRequest:
+        def execute() -> Dict[str, Any]:
+            with self._lock:
+                self.calls.append((name, kwargs))
+                return respond()
+        return FakeRequest(execute)
+
+    def table(self) -> List[List[Any]]:
+        """A1 から、値のある最後の行・列までの表を返します. 空のセルは None です."""
+        if not self.grid:
+            return []
+        rows = max(self.grid)
+        cols = max(max(row) for row in self.grid.values() if row)
+        return [[self.grid.get(r, {}).get(c) for c in range(1, cols + 1)] for r in range(1, rows + 1)]
+
+    def _write(self, col: int, row: int, values: List[List[Any]]) -> None:
+        for i, cells in enumerate(values):
+            line = self.grid.setdefault(row + i, {})
+            for j, value in enumerate(cells):
+                line[col + j] = value
+
+    def get(self, **kwargs: Any) -> FakeRequest:
+        def respond() -> Dict[str, Any]:
+            # API と同じく、行末の空のセルと末尾の空の行は返さない.
+            start_col, start_row, end_col, end_row = parse(kwargs["range"])
+            rows = []
+            for r in range(start_row, end_row + 1):
+                line = self.grid.get(r, {})
+                cells = [line.get(c) for c in range(start_col, end_col + 1)]
+                while cells and cells[-1] in (None, ""):
+                    cells.pop()
+                rows.append(cells)
+            while rows and not rows[-1]:
+                rows.pop()
+            return {"values": rows} if rows else {}
+        return self._request("get", kwargs, respond)
+
+    def update(self, **kwargs: Any) -> FakeRequest:
+        def respond() -> Dict[str, Any]:
+            col, row, _, _ = parse(kwargs["range"])
+            if row in self.fail_rows:
+                raise RuntimeError(f"failed to write row {row}")
+            self._write(col, row, kwargs["body"]["values"])
+            return {"updatedRange": kwargs["range"]}
+        return self._request("update", kwargs, respond)
+
+    def append(self, **kwargs: Any) -> FakeRequest:
+        def respond() -> Dict[str, Any]:
+            # 範囲の始まりから続くテーブルの次の行に書き込む.
+            col, row, _, _ = parse(kwargs["range"])
+            while any(v not in (None, "") for v in self.grid.get(row, {}).values()):
+                row += 1
+            values = kwargs["body"]["values"]
+            self._write(col, row, values)
+            return {"updates": {"updatedRange": f"Sheet1!{chr(64 + col)}{row}:Z{row + len(values) - 1}"}}
+        return self._request("append", kwargs, respond)
+
+    def batchGet(self, **kwargs: Any) -> FakeRequest:
+        return self._request("batchGet", kwargs, lambda: {
+            "valueRanges": [{"range": r, "values": self.values.get(r, [])} for r in kwargs["ranges"]]})
+
+    def batchUpdate(self, **kwargs: Any) -> FakeRequest:
+        def respond() -> Dict[str, Any]:
+            for data in kwargs["body"]["data"]:
+                self.values[data["range"]] = data["values"]
+            return {"responses": [{"updatedRange": d["range"]} for d in kwargs["body"]["data"]]}
+        return self._request("batchUpdate", kwargs, respond)
+
+    def batchClear(self, **kwargs: Any) -> FakeRequest:
+        def respond() -> Dict[str, Any]:
+            for r in kwargs["body"]["ranges"]:
+                self.values.pop(r, None)
+            return {"clearedRanges": kwargs["body"]["ranges"]}
+        return self._request("batchClear", kwargs, respond)
+
+
+class FakeService:
+    """Sheets API のサービスの代わり."""
+
+    def __init__(self) -> None:
+        self._values = FakeValues()
+
+    def spreadsheets(self) -> "FakeService":
+        return self
+
+    def values(self) -> FakeValues:
+        return self._values
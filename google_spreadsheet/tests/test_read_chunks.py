@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+from unittest.mock import patch
+
+import pandas as pd
+from nose.tools import eq_, ok_, raises
+
+import my_spreadsheet
+from fake_sheets import FakeService
+from my_spreadsheet import MySpreadsheet, RateLimiter
+
+
+class ReadChunksTestCase(TestCase):
+    """Test case for MySpreadsheet.read_chunks."""
+
+    def setUp(self) -> None:
+        """Read from a fake sheet."""
+        self.service = FakeService()
+        self.values = self.service.values()
+        for patcher in (patch.object(my_spreadsheet, "get_service", lambda credentials: self.service),
+                        patch.object(my_spreadsheet, "rate_limiter", RateLimiter(10 ** 6))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.ms = MySpreadsheet()
+
+    def fill(self, rows) -> None:
+        for r, cells in enumerate(rows, 1):
+            self.values.grid[r] = {c: v for c, v in enumerate(cells, 1)}
+
+    def ranges(self):
+        return [kwargs["range"] for name, kwargs in self.values.calls if name == "get"]
+
+    def test_padding(self) -> None:
+        """Test that short rows are padded and the index runs through chunks."""
+        self.fill([["id", "name", "note"], [1, "a", "x"], [2, "b"], [3], [4, "d", "y"], [5, "e"]])
+        frames = list(self.ms.read_chunks("sid", "S", "A1:C", chunk_size=2))
+        eq_([len(df) for df in frames], [1, 2, 2])
+        df = pd.concat(frames)
+        eq_(list(df.columns), ["id", "name", "note"])
+        eq_(list(df.index), [0, 1, 2, 3, 4])
+        # 埋めたセルは欠損値になる. (文字列の列では NaN)
+        cells = [[None if pd.isna(v) else v for v in row] for row in df.values.tolist()]
+        eq_(cells, [[1, "a", "x"], [2, "b", None], [3, None, None],
+                    [4, "d", "y"], [5, "e", None]])
+        eq_(self.ranges(), ["S!A1:C2", "S!A3:C4", "S!A5:C6", "S!A7:C8"])
+
+    def test_dtypes(self) -> None:
+        """Test that later chunks take the dtypes of the first chunk."""
+        self.fill([["id", "score", "label"], [1, 1.5, "a"], [2, 2.5, "b"], [3, 3, 4], [4, 4, "x"]])
+        frames = list(self.ms.read_chunks("sid", "S", "A1:C", chunk_size=3))
+        eq_(len(frames), 2)
+        first, second = frames
+        eq_(first.dtypes.tolist(), second.dtypes.tolist())
+        eq_(second["score"].tolist(), [3.0, 4.0])
+        eq_(str(second["id"].dtype), str(first["id"].dtype))
+
+    def test_dtypes_not_converted(self) -> None:
+        """Test that a column that cannot be converted is left as is."""
+        self.fill([["id"], [1], [2], ["x"]])
+        first, second = self.ms.read_chunks("sid", "S", "A1:A", chunk_size=3)
+        ok_(pd.api.types.is_integer_dtype(first["id"]))
+        eq_(second["id"].tolist(), ["x"])
+
+    def test_exact_multiple(self) -> None:
+        """Test that reading stops at an empty chunk."""
+        self.fill([["id"], [1], [2], [3]])
+        frames = list(self.ms.read_chunks("sid", "S", "A1:A", chunk_size=2))
+        eq_([df["id"].tolist() for df in frames], [[1], [2, 3]])
+        eq_(self.ranges(), ["S!A1:A2", "S!A3:A4", "S!A5:A6"])
+
+    def test_blank_row(self) -> None:
+        """Test that a blank row at the end of a chunk does not end the table."""
+        self.fill([[1, "a"], [2, "b"], [3, "c"], [], [5, "e"], [6, "f"]])
+        frames = list(self.ms.read_chunks("sid", "S", "A1:B", header=False, chunk_size=2))
+        # 2 つ目のまとまりの末尾の空の行は、3 つ目のまとまりの先頭に含まれる.
+        eq_([len(df) for df in frames], [2, 1, 3])
+        df = pd.concat(frames)
+        eq_(list(df.index), [0, 1, 2, 3, 4, 5])
+        cells = [[None if pd.isna(v) else v for v in row] for row in df.values.tolist()]
+        eq_(cells, [[1, "a"], [2, "b"], [3, "c"], [None, None], [5, "e"], [6, "f"]])
+
+    def test_blank_rows_in_chunk(self) -> None:
+        """Test that blank rows inside a chunk are kept."""
+        self.fill([["id"], [1], [], [], [4]])
+        frames = list(self.ms.read_chunks("sid", "S", "A1:A", chunk_size=3))
+        eq_([df.index.tolist() for df in frames], [[0], [1, 2, 3]])
+        eq_([None if pd.isna(v) else v for v in pd.concat(frames)["id"]], [1, None, None, 4])
+
+    def test_short_header(self) -> None:
+        """Test that columns without a header keep their data and get the name of the sheet column."""
+        self.fill([["id"], [1, "a"], [2, "b", "x"]])
+        df = pd.concat(self.ms.read_chunks("sid", "S", "A1:C", chunk_size=10))
+        eq_(list(df.columns), ["id", "B", "C"])
+        eq_(df["B"].tolist(), ["a", "b"])
+        eq_(df["C"].tolist()[1], "x")
+
+    def test_last_row(self) -> None:
+        """Test that the end row of the range is respected."""
+        self.fill([[i] for i in range(10)])
+        frames = list(self.ms.read_chunks("sid", "S", "A2:A5", header=False, chunk_size=3))
+        eq_([df[0].tolist() for df in frames], [[1, 2, 3], [4]])
+        eq_(self.ranges(), ["S!A2:A4", "S!A5:A5"])
+
+    def test_empty(self) -> None:
+        """Test that an empty sheet yields nothing."""
+        eq_(list(self.ms.read_chunks("sid", "S", "A1:C")), [])
+        ok_(self.ms.read("sid", "S", "A1:C", chunk_size=10).empty)
+
+    def test_read(self) -> None:
+        """Test that read with chunk_size gives the same table as a single read."""
+        self.fill([["id", "name"]] + [[i, f"n{i}"] for i in range(7)])
+        df = self.ms.read("sid", "S", "A1:B", chunk_size=3)
+        eq_(df.values.tolist(), [[i, f"n{i}"] for i in range(7)])
+        eq_(list(df.columns), ["id", "name"])
+
+    @raises(ValueError)
+    def test_invalid_range(self) -> None:
+        """Test that a range without an end column is rejected."""
+        list(self.ms.read_chunks("sid", "S", "A2"))
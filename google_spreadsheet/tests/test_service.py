@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import json
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+import httplib2
+from nose.tools import eq_, ok_
+
+import my_spreadsheet
+import token_manager
+from my_spreadsheet import MySpreadsheet, get_service
+from token_manager import ManagedCredentials, TokenManager
+
+
+class FakeResponse:
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self):
+        return {"access_token": "tok", "expires_in": 3600}
+
+
+class GetServiceTestCase(TestCase):
+    """Test case for get_service."""
+
+    def setUp(self) -> None:
+        """Record HTTP requests instead of sending them."""
+        self.sent = []
+
+        def fake_request(http, uri, method="GET", body=None, headers=None, **kwargs):
+            self.sent.append((method, uri, headers))
+            content = json.dumps({"range": "Sheet1!A1:B2", "values": [["a", "b"]]}).encode("utf-8")
+            return httplib2.Response({"status": "200"}), content
+
+        for patcher in (patch.object(httplib2.Http, "request", fake_request),
+                        patch.object(token_manager.requests, "post", lambda *args, **kwargs: FakeResponse()),
+                        patch.object(my_spreadsheet, "_local", threading.local())):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def credentials(self, refresh_token: str = "rt") -> ManagedCredentials:
+        return ManagedCredentials(TokenManager("cid", "sec", refresh_token, background=False))
+
+    def test_no_request_on_build(self) -> None:
+        """Test that the service is built without fetching the discovery document."""
+        get_service(self.credentials())
+        eq_(self.sent, [])
+
+    def test_reuse(self) -> None:
+        """Test that the service is shared per credentials in a thread."""
+        a = get_service(self.credentials())
+        ok_(get_service(self.credentials()) is a)
+        ok_(get_service(self.credentials("rt-other")) is not a)
+
+    def test_per_thread(self) -> None:
+        """Test that another thread gets its own service."""
+        credentials = self.credentials()
+        a = get_service(credentials)
+        other = []
+        thread = threading.Thread(target=lambda: other.append(get_service(credentials)))
+        thread.start()
+        thread.join()
+        ok_(other[0] is not a)
+
+    def test_request(self) -> None:
+        """Test that requests are sent with the managed access token."""
+        ms = MySpreadsheet()
+        df = ms.read("sid", "Sheet1", "A1:B2", header=False)
+        eq_(df.values.tolist(), [["a", "b"]])
+        ms.read("sid", "Sheet1", "A1:B2", header=False)
+        eq_(len(self.sent), 2)
+        method, uri, headers = self.sent[0]
+        eq_(method, "GET")
+        ok_(uri.startswith("https://sheets.googleapis.com/v4/spreadsheets/sid/values/Sheet1%21A1%3AB2"))
+        eq_(headers[b"Authorization"], b"Bearer tok")
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+import httplib2
+from nose.tools import eq_, ok_
+
+import token_manager
+from token_manager import ManagedCredentials, TokenManager
+
+
+class FakeTokenEndpoint:
+    """トークンのエンドポイントの代わり. 要求ごとに tok1, tok2, ... を返します."""
+
+    def __init__(self, expires_in: int = 3600, delay: float = 0.0) -> None:
+        self.expires_in = expires_in
+        self.delay = delay
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def post(self, uri, params, timeout=None):
+        time.sleep(self.delay)
+        with self._lock:
+            self.requests.append(dict(params))
+            n = len(self.requests)
+        endpoint = self
+
+        class Response:
+            def raise_for_status(self) -> None:
+                pass
+
+            def json(self):
+                return {"access_token": f"tok{n}", "expires_in": endpoint.expires_in}
+
+        return Response()
+
+
+class TokenManagerTestCase(TestCase):
+    """Test case for TokenManager."""
+
+    def setUp(self) -> None:
+        """Replace the token endpoint."""
+        self.endpoint = FakeTokenEndpoint()
+        patcher = patch.object(token_manager.requests, "post", self.endpoint.post)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = os.path.join(self.tmp.name, "token.json")
+
+    def test_reuse_until_expiry(self) -> None:
+        """Test that a valid token is reused without a new request."""
+        manager = TokenManager("cid", "sec", "rt", background=False)
+        eq_(manager.token()[0], "tok1")
+        eq_(manager.token()[0], "tok1")
+        eq_(len(self.endpoint.requests), 1)
+
+    def test_single_flight(self) -> None:
+        """Test that concurrent callers share one refresh."""
+        self.endpoint.delay = 0.05
+        manager = TokenManager("cid", "sec", "rt", background=False)
+        tokens = []
+        threads = [threading.Thread(target=lambda: tokens.append(manager.token()[0])) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        eq_(set(tokens), {"tok1"})
+        eq_(len(self.endpoint.requests), 1)
+
+    def test_rejected_token(self) -> None:
+        """Test that a rejected token is refreshed once."""
+        manager = TokenManager("cid", "sec", "rt", background=False)
+        manager.token()
+        eq_(manager.token(rejected="tok1")[0], "tok2")
+        # 既に更新されていれば、古いトークンが拒否されても更新しない.
+        eq_(manager.token(rejected="tok1")[0], "tok2")
+        eq_(len(self.endpoint.requests), 2)
+
+    def test_expiring_token(self) -> None:
+        """Test that a token within the expiry margin is refreshed."""
+        self.endpoint.expires_in = token_manager.EXPIRY_MARGIN - 1
+        manager = TokenManager("cid", "sec", "rt", background=False)
+        eq_(manager.token()[0], "tok1")
+        eq_(manager.token()[0], "tok2")
+
+    def test_file_cache_shared(self) -> None:
+        """Test that managers with the same credentials share the cached token."""
+        a = TokenManager("cid", "sec", "rt", cache_path=self.cache, background=False)
+        b = TokenManager("cid", "sec", "rt", cache_path=self.cache, background=False)
+        eq_(a.token()[0], "tok1")
+        eq_(b.token()[0], "tok1")
+        eq_(len(self.endpoint.requests), 1)
+        eq_(os.stat(self.cache).st_mode & 0o777, 0o600)
+        # リフレッシュトークンはファイルに保存しない.
+        ok_("rt" not in json.loads(open(self.cache).read())["key"].split(":"))
+
+    def test_file_cache_other_user(self) -> None:
+        """Test that a cached token of another refresh token is not reused."""
+        a = TokenManager("cid", "sec", "rt-alice", cache_path=self.cache, background=False)
+        b = TokenManager("cid", "sec", "rt-bob", cache_path=self.cache, background=False)
+        eq_(a.token()[0], "tok1")
+        eq_(b.token()[0], "tok2")
+        eq_([r["refresh_token"] for r in self.endpoint.requests], ["rt-alice", "rt-bob"])
+
+    def test_file_cache_broken(self) -> None:
+        """Test that a broken cache file is replaced."""
+        with open(self.cache, "w") as f:
+            f.write("{")
+        manager = TokenManager("cid", "sec", "rt", cache_path=self.cache, background=False)
+        eq_(manager.token()[0], "tok1")
+        eq_(json.loads(open(self.cache).read())["access_token"], "tok1")
+
+    def test_background_refresh(self) -> None:
+        """Test that the token is refreshed before it expires."""
+        self.endpoint.expires_in = 0.4
+        with patch.object(token_manager, "EXPIRY_MARGIN", 0):
+            manager = TokenManager("cid", "sec", "rt")
+            try:
+                eq_(manager.token()[0], "tok1")
+                time.sleep(0.3)
+                ok_(len(self.endpoint.requests) >= 2)
+            finally:
+                manager.close()
+
+    def test_shared_manager(self) -> None:
+        """Test that get_token_manager returns one manager per credentials."""
+        a = token_manager.get_token_manager("cid-shared", "sec", "rt")
+        b = token_manager.get_token_manager("cid-shared", "sec", "rt")
+        c = token_manager.get_token_manager("cid-shared", "sec", "rt-other")
+        ok_(a is b)
+        ok_(a is not c)
+
+
+class ManagedCredentialsTestCase(TestCase):
+    """Test case for ManagedCredentials."""
+
+    def setUp(self) -> None:
+        """Replace the token endpoint."""
+        self.endpoint = FakeTokenEndpoint()
+        patcher = patch.object(token_manager.requests, "post", self.endpoint.post)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_refresh_on_401(self) -> None:
+        """Test that a 401 response gets a new token from the manager."""
+        sent = []
+
+        def fake_request(self, uri, method="GET", body=None, headers=None, **kwargs):
+            sent.append(headers[b"Authorization"])
+            status = "401" if len(sent) == 1 else "200"
+            return httplib2.Response({"status": status}), b"{}"
+
+        manager = TokenManager("cid", "sec", "rt", background=False)
+        with patch.object(httplib2.Http, "request", fake_request):
+            http = ManagedCredentials(manager).authorize(httplib2.Http())
+            resp, _ = http.request("https://example.com/")
+        eq_(resp.status, 200)
+        eq_(sent, [b"Bearer tok1", b"Bearer tok2"])
+        eq_(len(self.endpoint.requests), 2)
+
+    def test_no_request_on_init(self) -> None:
+        """Test that creating credentials does not request a token."""
+        ManagedCredentials(TokenManager("cid", "sec", "rt", background=False))
+        eq_(self.endpoint.requests, [])
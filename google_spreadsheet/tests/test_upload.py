@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from nose.tools import eq_, ok_, raises
+
+import my_spreadsheet
+from fake_sheets import FakeService
+from my_spreadsheet import MySpreadsheet, RateLimiter, UploadCheckpoint, UploadError
+
+
+class UploadTestCase(TestCase):
+    """Test case for MySpreadsheet.upload."""
+
+    def setUp(self) -> None:
+        """Write to a fake sheet."""
+        self.service = FakeService()
+        self.values = self.service.values()
+        for patcher in (patch.object(my_spreadsheet, "get_service", lambda credentials: self.service),
+                        patch.object(my_spreadsheet, "rate_limiter", RateLimiter(10 ** 6))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.ms = MySpreadsheet()
+        self.df = pd.DataFrame({"id": range(1, 8), "value": [i * 10 for i in range(1, 8)]})
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def ranges(self, name: str = "update"):
+        return [kwargs["range"] for n, kwargs in self.values.calls if n == name]
+
+    def test_update(self) -> None:
+        """Test that chunks are written after each other below the header."""
+        self.ms.upload("sid", "S", "A1", self.df, header=True, chunk_rows=3, workers=3)
+        eq_(self.values.table(), [["id", "value"]] + self.df.values.tolist())
+        eq_(sorted(self.ranges()), ["S!A1", "S!A5", "S!A8"])
+
+    def test_update_offset(self) -> None:
+        """Test that a start cell other than A1 is respected."""
+        self.ms.update("sid", "S", "B3", self.df, chunk_rows=2)
+        table = self.values.table()
+        eq_([row[1:] for row in table[2:]], self.df.values.tolist())
+        eq_(sorted(self.ranges()), ["S!B3", "S!B5", "S!B7", "S!B9"])
+
+    def test_append(self) -> None:
+        """Test that the remaining chunks follow the row the first chunk was appended to."""
+        self.values._write(1, 1, [["id", "value"], [0, 0]])
+        self.ms.append("sid", "S", "A1", self.df, chunk_rows=3)
+        eq_(self.ranges("append"), ["S!A1"])
+        eq_(sorted(self.ranges()), ["S!A6", "S!A9"])
+        eq_(self.values.table(), [["id", "value"], [0, 0]] + self.df.values.tolist())
+
+    def test_append_header(self) -> None:
+        """Test that the header is appended with the first chunk."""
+        self.values._write(1, 1, [["x"]])
+        self.ms.upload("sid", "S", "A1", self.df, header=True, append=True, chunk_rows=4)
+        eq_(self.values.table()[1:], [["id", "value"]] + self.df.values.tolist())
+        eq_(self.ranges(), ["S!A7"])
+
+    def test_cells(self) -> None:
+        """Test that missing values and dates become cells without changing integer columns."""
+        df = pd.DataFrame({
+            "int": pd.array([1, None, 3], dtype="Int64"),
+            "float": [1.5, np.nan, np.inf],
+            "date": pd.to_datetime(["2018-01-02 03:04:05", None, "2018-12-31 00:00:00"]),
+            "text": ["a", None, "c"]})
+        self.ms.upload("sid", "S", "A1", df, chunk_rows=2)
+        eq_(self.values.table(), [[1, 1.5, "2018-01-02 03:04:05", "a"],
+                                  ["", "", "", ""],
+                                  [3, "", "2018-12-31 00:00:00", "c"]])
+        ok_(isinstance(self.values.table()[0][0], int))
+
+    def test_resume(self) -> None:
+        """Test that a failed upload resumes from the chunks that were not written."""
+        self.values.fail_rows.add(7)
+        try:
+            self.ms.upload("sid", "S", "A1", self.df, chunk_rows=2, workers=1)
+            raise AssertionError("UploadError was not raised")
+        except UploadError as e:
+            checkpoint = e.checkpoint
+        ok_({0, 1} <= checkpoint.done)
+        ok_(3 not in checkpoint.done)
+        done = set(checkpoint.done)
+        self.values.fail_rows.clear()
+        del self.values.calls[:]
+        self.ms.upload("sid", "S", "A1", self.df, chunk_rows=2, workers=1, checkpoint=checkpoint)
+        eq_(sorted(self.ranges()), sorted(f"S!A{i * 2 + 1}" for i in range(4) if i not in done))
+        eq_(self.values.table(), self.df.values.tolist())
+        eq_(checkpoint.done, set())
+
+    def test_resume_append(self) -> None:
+        """Test that a resumed append does not append the first chunk again."""
+        self.values._write(1, 1, [["id", "value"]])
+        self.values.fail_rows.add(4)
+        with self.assertRaises(UploadError) as cm:
+            self.ms.upload("sid", "S", "A1", self.df, append=True, chunk_rows=2, workers=1)
+        eq_(cm.exception.checkpoint.start, ("A", 2))
+        self.values.fail_rows.clear()
+        self.ms.upload("sid", "S", "A1", self.df, append=True, chunk_rows=2, workers=1,
+                       checkpoint=cm.exception.checkpoint)
+        eq_(self.ranges("append"), ["S!A1"])
+        eq_(self.values.table(), [["id", "value"]] + self.df.values.tolist())
+
+    def test_resume_file(self) -> None:
+        """Test that a checkpoint file lets another process resume and is removed when done."""
+        path = os.path.join(self.tmp.name, "upload.json")
+        self.values.fail_rows.add(5)
+        with self.assertRaises(UploadError):
+            self.ms.upload("sid", "S", "A1", self.df, chunk_rows=2, workers=1, checkpoint=path)
+        saved = json.loads(open(path).read())
+        ok_(0 in saved["done"] and 2 not in saved["done"])
+        self.values.fail_rows.clear()
+        del self.values.calls[:]
+        self.ms.upload("sid", "S", "A1", self.df, chunk_rows=2, workers=1, checkpoint=path)
+        ok_("S!A1" not in self.ranges())
+        eq_(self.values.table(), self.df.values.tolist())
+        ok_(not os.path.exists(path))
+
+    def test_checkpoint_other_content(self) -> None:
+        """Test that a checkpoint of other content is not used."""
+        checkpoint = UploadCheckpoint()
+        checkpoint.begin("other")
+        checkpoint.commit(0)
+        self.ms.upload("sid", "S", "A1", self.df, chunk_rows=4, checkpoint=checkpoint)
+        eq_(sorted(self.ranges()), ["S!A1", "S!A5"])
+
+    def test_checkpoint_changed_values(self) -> None:
+        """Test that a checkpoint file is not used for a DataFrame of the same length with other values."""
+        path = os.path.join(self.tmp.name, "upload.json")
+        self.values.fail_rows.add(5)
+        with self.assertRaises(UploadError):
+            self.ms.upload("sid", "S", "A1", self.df, chunk_rows=2, workers=1, checkpoint=path)
+        self.values.fail_rows.clear()
+        del self.values.calls[:]
+        changed = self.df.assign(value=self.df["value"] + 1)
+        self.ms.upload("sid", "S", "A1", changed, chunk_rows=2, workers=1, checkpoint=path)
+        eq_(sorted(self.ranges()), ["S!A1", "S!A3", "S!A5", "S!A7"])
+        eq_(self.values.table(), changed.values.tolist())
+
+    @raises(ValueError)
+    def test_invalid_range(self) -> None:
+        """Test that a range without a start cell is rejected."""
+        self.ms.upload("sid", "S", ":C", self.df)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+import json
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+import pandas as pd
+from nose.tools import eq_, ok_, raises
+
+import my_spreadsheet
+from fake_sheets import FakeService
+from my_spreadsheet import RateLimiter, ValueBatch, _query_size
+
+
+class ValueBatchTestCase(TestCase):
+    """Test case for ValueBatch."""
+
+    def setUp(self) -> None:
+        """Create a batch on a fake service."""
+        self.service = FakeService()
+        self.values = self.service.values()
+        spreadsheet = SimpleNamespace(service=self.service)
+        self.batch = ValueBatch(spreadsheet, "sid", limiter=RateLimiter(10 ** 6))
+
+    def calls(self, name: str):
+        return [kwargs for n, kwargs in self.values.calls if n == name]
+
+    def test_get(self) -> None:
+        """Test that get returns a DataFrame per range."""
+        self.values.values["Sheet1!A1:B"] = [["a", "b"], [1, 2]]
+        with self.batch as batch:
+            key = batch.get("Sheet1", "A1:B")
+            empty = batch.get("Sheet1", "D1:E")
+        eq_(key, "Sheet1!A1:B")
+        eq_(batch.results[key].to_dict("list"), {"a": [1], "b": [2]})
+        ok_(batch.results[empty].empty)
+        eq_(len(self.values.calls), 1)
+
+    def test_order(self) -> None:
+        """Test that consecutive operations of the same kind are sent together, in order."""
+        df = pd.DataFrame([[1, 2]], columns=["a", "b"])
+        self.batch.clear("Sheet1", "A:Z")
+        self.batch.clear("Sheet2", "A:Z")
+        self.batch.update("Sheet1", "A1", df, header=True)
+        self.batch.get("Sheet1", "A1")
+        self.batch.clear("Sheet1", "A:Z")
+        eq_(len(self.batch), 5)
+        self.batch.execute()
+        eq_([n for n, _ in self.values.calls], ["batchClear", "batchUpdate", "batchGet", "batchClear"])
+        eq_(self.values.calls[0][1]["body"]["ranges"], ["Sheet1!A:Z", "Sheet2!A:Z"])
+        eq_(self.batch.results["Sheet1!A1"].to_dict("list"), {"a": [1], "b": [2]})
+        eq_(len(self.batch), 0)
+
+    def test_not_sent_on_error(self) -> None:
+        """Test that nothing is sent when the with block raises."""
+        try:
+            with self.batch as batch:
+                batch.clear("Sheet1", "A:Z")
+                raise KeyError
+        except KeyError:
+            pass
+        eq_(self.values.calls, [])
+
+    def test_query_size(self) -> None:
+        """Test that a range is sized as it appears in the URL."""
+        eq_(_query_size("Sheet1!A1:B2"), len("&ranges=Sheet1%21A1%3AB2"))
+        eq_(_query_size("シート!A1"), len("&ranges=") + 9 * 3 + len("%21A1"))
+
+    def test_split_by_query_chars(self) -> None:
+        """Test that batchGet is split by the encoded length of the ranges."""
+        ranges = [self.batch.get("シート1", f"A{i}:B{i}") for i in range(200)]
+        # エンコードしない長さなら一回に収まる.
+        ok_(sum(len(r) + 8 for r in ranges) <= my_spreadsheet.MAX_QUERY_CHARS)
+        self.batch.execute()
+        gets = self.calls("batchGet")
+        ok_(len(gets) > 1)
+        for kwargs in gets:
+            ok_(sum(_query_size(r) for r in kwargs["ranges"]) <= my_spreadsheet.MAX_QUERY_CHARS)
+        eq_([r for kwargs in gets for r in kwargs["ranges"]], ranges)
+        eq_(len(self.batch.results), 200)
+
+    def test_split_by_range_count(self) -> None:
+        """Test that a request has at most MAX_RANGES ranges."""
+        for i in range(1200):
+            self.batch.clear("S", f"A{i}")
+        self.batch.execute()
+        eq_([len(kwargs["body"]["ranges"]) for kwargs in self.calls("batchClear")], [500, 500, 200])
+
+    def test_split_by_payload(self) -> None:
+        """Test that batchUpdate is split by the size of the body."""
+        df = pd.DataFrame({"a": ["x" * 100] * 10})
+        for i in range(10):
+            self.batch.update("Sheet1", f"A{i * 20 + 1}", df)
+        size = len(json.dumps({"range": "Sheet1!A1", "values": [["x" * 100]] * 10}))
+        with patch.object(my_spreadsheet, "MAX_PAYLOAD_BYTES", size * 3 + 50):
+            self.batch.execute()
+        updates = self.calls("batchUpdate")
+        eq_([len(kwargs["body"]["data"]) for kwargs in updates], [3, 3, 3, 1])
+        eq_(len(self.batch.results), 10)
+
+    def test_too_large(self) -> None:
+        """Test that an update larger than the limit is sent alone."""
+        df = pd.DataFrame({"a": ["x" * 100] * 10})
+        self.batch.update("Sheet1", "A1", df)
+        self.batch.update("Sheet1", "B1", df)
+        with patch.object(my_spreadsheet, "MAX_PAYLOAD_BYTES", 10):
+            self.batch.execute()
+        eq_(len(self.calls("batchUpdate")), 2)
+
+    @raises(KeyError)
+    def test_no_results(self) -> None:
+        """Test that results of unsent operations are not available."""
+        key = self.batch.get("Sheet1", "A1")
+        self.batch.results[key]
+
+
+class RateLimiterTestCase(TestCase):
+    """Test case for RateLimiter."""
+
+    def test_wait(self) -> None:
+        """Test that a request over the limit waits until the oldest one is a minute old."""
+        clock = [1000.0]
+        slept = []
+
+        def sleep(seconds: float) -> None:
+            slept.append(seconds)
+            clock[0] += seconds
+
+        limiter = RateLimiter(per_minute=2)
+        with patch.object(my_spreadsheet.time, "monotonic", lambda: clock[0]), \
+                patch.object(my_spreadsheet.time, "sleep", sleep):
+            limiter.wait()
+            clock[0] += 10
+            limiter.wait()
+            limiter.wait()
+        eq_(slept, [50.0])
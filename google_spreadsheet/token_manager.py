@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""OAuth のアクセストークンを管理するモジュールです.
+
+アクセストークンは同じ認証情報(client_id, refresh_token)の MySpreadsheet で共有し、
+有効期限の少し前まで使い回します. 有効期限が近づくとバックグラウンドで更新します.
+cache_path を指定した場合はファイルにも保存し、ファイルをロックして複数のプロセスで共有します.
+
+- TokenManager class: アクセストークンを取得・更新・共有するクラス.
+- ManagedCredentials class: TokenManager のアクセストークンを使う oauth2client の認証情報.
+- get_token_manager function: 認証情報ごとに共有する TokenManager を返す関数.
+"""
+import datetime
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+import requests
+from oauth2client.client import OAuth2Credentials
+
+try:
+    import fcntl
+except ImportError:
+    # fcntl がない環境(Windows)ではファイルをロックしない.
+    fcntl = None
+
+TOKEN_URI = "https://accounts.google.com/o/oauth2/token"
+# トークンを取得する HTTP のタイムアウト(秒).
+TOKEN_TIMEOUT = 30
+# 有効期限のこの秒数前からは期限切れとみなし、使う前に更新します.
+EXPIRY_MARGIN = 60
+# 有効期限のこの秒数前にバックグラウンドで更新します.
+REFRESH_AHEAD = 300
+
+# (client_id, refresh_token) -> TokenManager
+_managers: Dict[Tuple[str, str], "TokenManager"] = {}
+_managers_lock = threading.Lock()
+
+# (アクセストークン, 有効期限の UNIX 時間)
+Token = Tuple[str, float]
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """path の隣のロックファイルを排他的にロックします. 他のプロセスのロックが外れるまで待ちます."""
+    fd = os.open(str(path.with_name(path.name + ".lock")), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        # ファイルを閉じるとロックも外れる.
+        os.close(fd)
+
+
+class TokenManager:
+    """アクセストークンを取得・更新・共有するクラス.
+
+    - アクセストークンは有効期限の EXPIRY_MARGIN 秒前まで使い回します.
+    - 更新は一度に一つのスレッドだけが行い、他のスレッドはその結果を使います.
+    - 有効期限の REFRESH_AHEAD 秒前に、バックグラウンドのスレッドで更新します.
+    - cache_path を指定した場合は、更新する前にファイルを確認し、他のプロセスが更新したトークンを使います.
+    """
+
+    def __init__(self, client_id: str, client_secret: str, refresh_token: str,
+                 token_uri: str = TOKEN_URI, cache_path: Optional[Union[str, Path]] = None,
+                 background: bool = True) -> None:
+        """コンストラクタ. トークンは最初に必要になったときに取得します.
+
+        :param client_id: クライアント ID.
+        :param client_secret: クライアントシークレット.
+        :param refresh_token: リフレッシュトークン.
+        :param token_uri: トークンを取得する URI.
+        :param cache_path: トークンを保存するファイルのパス. 省略した場合はプロセス内でだけ共有します.
+        :param background: 有効期限の前にバックグラウンドで更新する場合は True.
+        """
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_token = refresh_token
+        self.token_uri = token_uri
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.background = background
+        self._token: Optional[str] = None
+        self._expiry = 0.0
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    @property
+    def cache_key(self) -> str:
+        """保存したトークンがこの認証情報のものかを確かめるための値.
+
+        同じ client_id でもリフレッシュトークン(利用者)が違えば別の値になります.
+        リフレッシュトークンそのものはファイルに保存しません.
+        """
+        digest = hashlib.sha256(self.refresh_token.encode("utf-8")).hexdigest()
+        return f"{self.client_id}:{digest}"
+
+    def token(self, rejected: Optional[str] = None) -> Token:
+        """有効なアクセストークンを返します. 期限が近い場合は更新します.
+
+        :param rejected: サーバーに拒否されたアクセストークン. 同じトークンは返さずに更新します.
+        :return: (アクセストークン, 有効期限の UNIX 時間)
+        """
+        token, expiry = self._token, self._expiry
+        if self._usable(token, expiry, rejected):
+            return token, expiry
+        with self._lock:
+            # 待っている間に他のスレッドが更新していれば、それを使う.
+            if not self._usable(self._token, self._expiry, rejected):
+                self._refresh(rejected)
+            return self._token, self._expiry
+
+    def close(self) -> None:
+        """バックグラウンドでの更新を止めます."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    @staticmethod
+    def _usable(token: Optional[str], expiry: float, rejected: Optional[str]) -> bool:
+        return bool(token) and token != rejected and expiry - EXPIRY_MARGIN > time.time()
+
+    def _refresh(self, rejected: Optional[str]) -> None:
+        """アクセストークンを更新します. self._lock を取得してから呼び出してください."""
+        if self.cache_path is None:
+            self._token, self._expiry = self._request()
+        else:
+            with _file_lock(self.cache_path):
+                cached = self._read_cache()
+                if cached is not None and self._usable(cached[0], cached[1], rejected):
+                    # 他のプロセスが更新したトークンを使う.
+                    self._token, self._expiry = cached
+                else:
+                    self._token, self._expiry = self._request()
+                    self._write_cache()
+        self._schedule()
+
+    def _request(self) -> Token:
+        """トークンのエンドポイントにアクセストークンを要求します."""
+        params = {
+            "client_id": self.client_id,
+            "refresh_token": self.refresh_token,
+            "client_secret": self.client_secret,
+            "grant_type": "refresh_token"}
+        rs = requests.post(self.token_uri, params, timeout=TOKEN_TIMEOUT)
+        rs.raise_for_status()
+        data = rs.json()
+        return data["access_token"], time.time() + data["expires_in"]
+
+    def _read_cache(self) -> Optional[Token]:
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            if data["key"] == self.cache_key:
+                return data["access_token"], float(data["expiry"])
+        except (OSError, ValueError, KeyError, TypeError):
+            # ファイルがないか壊れている場合は更新する.
+            pass
+        return None
+
+    def _write_cache(self) -> None:
+        content = json.dumps({"key": self.cache_key, "access_token": self._token, "expiry": self._expiry})
+        tmp = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        try:
+            # アクセストークンを他の利用者が読めないようにする.
+            fd = os.open(str(tmp), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(str(tmp), str(self.cache_path))
+        except OSError:
+            # 保存できない場合も、プロセス内では使える.
+            pass
+
+    def _schedule(self) -> None:
+        """有効期限の REFRESH_AHEAD 秒前に、バックグラウンドで更新するようにします."""
+        if not self.background:
+            return
+        self.close()
+        remaining = self._expiry - time.time()
+        # 有効期間が短いトークンでも更新し続けないよう、少なくとも残りの半分は待つ.
+        delay = max(remaining - REFRESH_AHEAD, remaining / 2, 0)
+        self._timer = threading.Timer(delay, self._refresh_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _refresh_in_background(self) -> None:
+        try:
+            with self._lock:
+                self._refresh(self._token)
+        except Exception:
+            # 失敗した場合は、次に使うときに更新する.
+            pass
+
+
+class ManagedCredentials(OAuth2Credentials):
+    """TokenManager のアクセストークンを使う oauth2client の認証情報.
+
+    要求のたびに TokenManager からアクセストークンを受け取るため、自分ではトークンを更新しません.
+    """
+
+    def __init__(self, manager: TokenManager) -> None:
+        """コンストラクタ.
+
+        :param manager: アクセストークンを管理する TokenManager.
+        """
+        super().__init__(None, manager.client_id, manager.client_secret, manager.refresh_token,
+                         None, manager.token_uri, "")
+        self.manager = manager
+
+    def apply(self, headers: Dict[str, Any]) -> None:
+        """要求のヘッダーに有効なアクセストークンを設定します."""
+        self._set_token(self.manager.token())
+        super().apply(headers)
+
+    def _refresh(self, http: Any) -> None:
+        """アクセストークンが拒否された場合などに、TokenManager から新しいトークンを受け取ります."""
+        self._set_token(self.manager.token(rejected=self.access_token))
+
+    def _set_token(self, token: Token) -> None:
+        self.access_token = token[0]
+        # oauth2client の有効期限はタイムゾーンなしの UTC.
+        self.token_expiry = datetime.datetime.fromtimestamp(token[1], datetime.timezone.utc).replace(tzinfo=None)
+        self.invalid = False
+
+
+def get_token_manager(client_id: str, client_secret: str, refresh_token: str,
+                      cache_path: Optional[Union[str, Path]] = None) -> TokenManager:
+    """認証情報ごとに共有する TokenManager を返します.
+
+    cache_path は最初に TokenManager を作ったときのものを使います.
+
+    :param client_id: クライアント ID.
+    :param client_secret: クライアントシークレット.
+    :param refresh_token: リフレッシュトークン.
+    :param cache_path: トークンを保存するファイルのパス.
+    :return: TokenManager.
+    """
+    key = (client_id, refresh_token)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = TokenManager(client_id, client_secret, refresh_token,
+                                                    cache_path=cache_path)
+        return manager
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""mtools.clock_util.formatter のベンチマークです.
+
+同じ時刻を arrow.Arrow.format と format_datetime で整形し、処理速度(件/秒)を比較します.
+整形の結果が一致しない場合は終了コード 1 で終了します.
+
+clock_util のディレクトリで実行してください.
+
+    $ python benchmarks/bench_formatter.py
+    $ python benchmarks/bench_formatter.py --number 100000
+"""
+
+import argparse
+import sys
+import time
+from typing import Callable, List
+
+import arrow
+
+from mtools.clock_util.formatter import compile_format, format_datetime
+
+FORMATS = [
+    "YYYY-MM-DD HH:mm:ss ZZ",
+    "HH:mm:ss",
+    "dddd, MMMM Do YYYY h:mm:ss A ZZZ",
+]
+ZONES = ["Asia/Tokyo", "Europe/London", "America/New_York"]
+
+
+def measure(number: int, func: Callable[[], object], repeat: int = 3) -> float:
+    """func を number 回実行する処理を repeat 回繰り返し、最も速かった処理速度(件/秒)を返します."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return number / best
+
+
+def main() -> int:
+    """ベンチマークのエントリーポイント."""
+    parser = argparse.ArgumentParser(description="書式の整形を arrow.Arrow.format と比較します.")
+    parser.add_argument("--number", type=int, default=20000, help="整形を繰り返す回数.")
+    args = parser.parse_args()
+
+    utc = arrow.utcnow()
+    locals_: List[arrow.Arrow] = [utc.to(zone) for zone in ZONES]
+    mismatches = 0
+    print(f"{'format':<36}{'arrow ops/sec':>16}{'compiled ops/sec':>18}{'ratio':>8}")
+    for fmt in FORMATS:
+        for local in locals_:
+            if local.format(fmt) != format_datetime(local.datetime, fmt):
+                print(f"mismatch: {fmt!r} {local}")
+                mismatches += 1
+
+        local = locals_[0]
+        dt = local.datetime
+        base = measure(args.number, lambda: local.format(fmt))
+        compiled = measure(args.number, lambda: format_datetime(dt, fmt))
+        print(f"{fmt:<36}{base:>16.0f}{compiled:>18.0f}{compiled / base:>7.1f}x")
+
+    info = compile_format.cache_info()
+    print(f"compile_format cache: hits={info.hits} misses={info.misses}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""Arrow の書式("YYYY-MM-DD HH:mm:ss ZZ" など)を事前に解釈しておくモジュールです.
+
+arrow.Arrow.format は呼び出すたびに書式の文字列を正規表現で解釈します.
+compile_format は書式を一度だけ解釈し、各トークンを出力する関数のリストにします.
+以降は UNIX 時間と UTC オフセットから、整数の計算だけで文字列を作ります.
+
+書式のトークンは arrow.formatter.DateTimeFormatter と同じものに対応しています.
+月や曜日の名称は arrow のロケールを使います. arrow は名称のトークンを使う書式を解釈するときに読み込みます.
+解釈した書式は LRU キャッシュに保存し、同じ書式で何度呼び出しても解釈は一度だけ行います.
+
+:Example:
+
+    >>> from mtools.clock_util.formatter import format_datetime
+    >>> from mtools.clock_util.local_time import get_local_time
+    >>> format_datetime(get_local_time("Asia/Tokyo"), "YYYY-MM-DD HH:mm:ss ZZ")
+    '2018-07-09 15:50:30 +09:00'
+"""
+import math
+import re
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 解釈した書式をキャッシュする数.
+CACHE_SIZE = 128
+# 書式のトークン. arrow.formatter.DateTimeFormatter._FORMAT_RE と同じです.
+FORMAT_RE = re.compile(
+    r"(\[(?:(?=(?P<literal>[^]]))(?P=literal))*\]|YYY?Y?|MM?M?M?|Do|DD?D?D?|d?dd?d?|HH?|hh?|mm?|ss?|SS?S?S?S?S?|ZZ?Z?|a|A|X|x|W)"
+)
+# 月や曜日の名称などロケールを使うトークン.
+NAME_TOKENS = {"MMMM", "MMM", "Do", "dddd", "ddd", "a", "A"}
+# 英語以外のロケールでは年もロケールにしたがって出力する(タイ語は仏暦など).
+YEAR_TOKENS = {"YYYY", "YY"}
+
+# 各トークンを出力する関数の引数.
+# (time.struct_time, マイクロ秒, UTC オフセット(秒), タイムゾーン名, UNIX 時間(マイクロ秒))
+Fields = Tuple[time.struct_time, int, int, str, int]
+Emitter = Callable[[Fields], str]
+
+
+def _hour12(hour: int) -> int:
+    return hour if 0 < hour < 13 else abs(hour - 12)
+
+
+def _offset(separator: str) -> Emitter:
+    def emit(f: Fields) -> str:
+        total_minutes = int(f[2] / 60)
+        sign = "+" if total_minutes >= 0 else "-"
+        hour, minute = divmod(abs(total_minutes), 60)
+        return f"{sign}{hour:02d}{separator}{minute:02d}"
+    return emit
+
+
+def _iso_week(f: Fields) -> str:
+    tm = f[0]
+    year, week, day = date(tm.tm_year, tm.tm_mon, tm.tm_mday).isocalendar()
+    return f"{year}-W{week:02d}-{day}"
+
+
+def _emitters(locale: Optional[Any]) -> Dict[str, Emitter]:
+    """トークン -> 出力する関数 の辞書を返します.
+
+    locale が None の場合、名称のトークンは含まず、年は西暦の数字で出力します.
+    """
+    emitters: Dict[str, Emitter] = {
+        "YYYY": lambda f: f"{f[0].tm_year:04d}",
+        "YY": lambda f: f"{f[0].tm_year:04d}"[2:],
+        "MM": lambda f: f"{f[0].tm_mon:02d}",
+        "M": lambda f: f"{f[0].tm_mon}",
+        "DDDD": lambda f: f"{f[0].tm_yday:03d}",
+        "DDD": lambda f: f"{f[0].tm_yday}",
+        "DD": lambda f: f"{f[0].tm_mday:02d}",
+        "D": lambda f: f"{f[0].tm_mday}",
+        "d": lambda f: f"{f[0].tm_wday + 1}",
+        "HH": lambda f: f"{f[0].tm_hour:02d}",
+        "H": lambda f: f"{f[0].tm_hour}",
+        "hh": lambda f: f"{_hour12(f[0].tm_hour):02d}",
+        "h": lambda f: f"{_hour12(f[0].tm_hour)}",
+        "mm": lambda f: f"{f[0].tm_min:02d}",
+        "m": lambda f: f"{f[0].tm_min}",
+        "ss": lambda f: f"{f[0].tm_sec:02d}",
+        "s": lambda f: f"{f[0].tm_sec}",
+        "SSSSSS": lambda f: f"{f[1]:06d}",
+        "SSSSS": lambda f: f"{f[1] // 10:05d}",
+        "SSSS": lambda f: f"{f[1] // 100:04d}",
+        "SSS": lambda f: f"{f[1] // 1000:03d}",
+        "SS": lambda f: f"{f[1] // 10000:02d}",
+        "S": lambda f: f"{f[1] // 100000}",
+        "X": lambda f: f"{f[4] / 1000000}",
+        "x": lambda f: f"{f[4]}",
+        "ZZZ": lambda f: f[3],
+        "ZZ": _offset(":"),
+        "Z": _offset(""),
+        "W": _iso_week,
+    }
+    if locale is not None:
+        emitters.update({
+            "YYYY": lambda f: locale.year_full(f[0].tm_year),
+            "YY": lambda f: locale.year_abbreviation(f[0].tm_year),
+            "MMMM": lambda f: locale.month_name(f[0].tm_mon),
+            "MMM": lambda f: locale.month_abbreviation(f[0].tm_mon),
+            "Do": lambda f: locale.ordinal_number(f[0].tm_mday),
+            "dddd": lambda f: locale.day_name(f[0].tm_wday + 1),
+            "ddd": lambda f: locale.day_abbreviation(f[0].tm_wday + 1),
+            "a": lambda f: locale.meridian(f[0].tm_hour, "a"),
+            "A": lambda f: locale.meridian(f[0].tm_hour, "A"),
+        })
+    return emitters
+
+
+class CompiledFormat:
+    """事前に解釈した書式.
+
+    :Example:
+
+        >>> fmt = CompiledFormat("YYYY-MM-DD HH:mm:ss ZZ")
+        >>> fmt.format(1600000000.0, 9 * 3600, "JST")
+        '2020-09-13 21:26:40 +09:00'
+    """
+
+    def __init__(self, fmt: str, locale: str = "en_us") -> None:
+        """コンストラクタ.
+
+        :param fmt: Arrow の書式.
+        :param locale: 月や曜日の名称に使うロケール.
+        """
+        self.fmt = fmt
+        tokens = {m.group(0) for m in FORMAT_RE.finditer(fmt)}
+        if tokens & NAME_TOKENS or (tokens & YEAR_TOKENS and not locale.lower().startswith("en")):
+            from arrow import locales
+            emitters = _emitters(locales.get_locale(locale))
+        else:
+            emitters = _emitters(None)
+        parts: List[Emitter] = []
+        self._needs_epoch = False
+        pos = 0
+        for m in FORMAT_RE.finditer(fmt):
+            if m.start() > pos:
+                parts.append(_literal(fmt[pos:m.start()]))
+            token = m.group(0)
+            if token.startswith("["):
+                parts.append(_literal(token[1:-1]))
+            elif token in emitters:
+                parts.append(emitters[token])
+                self._needs_epoch |= token in ("X", "x")
+            else:
+                # Arrow が解釈しないトークン(YYY など)は何も出力しない.
+                parts.append(_literal(""))
+            pos = m.end()
+        if pos < len(fmt):
+            parts.append(_literal(fmt[pos:]))
+        self._parts = parts
+
+    def format(self, timestamp: float, offset: int, tzname: str = "") -> str:
+        """UNIX 時間を書式にしたがって文字列にします.
+
+        :param timestamp: UNIX 時間(秒).
+        :param offset: UTC オフセット(秒).
+        :param tzname: タイムゾーン名. ZZZ トークンで出力されます.
+        :return: 書式にしたがった文字列.
+        """
+        # datetime.fromtimestamp と同じ方法でマイクロ秒に丸める.
+        frac, seconds = math.modf(timestamp)
+        seconds, us = int(seconds), round(frac * 1000000)
+        if us >= 1000000:
+            seconds, us = seconds + 1, us - 1000000
+        elif us < 0:
+            seconds, us = seconds - 1, us + 1000000
+        epoch_us = seconds * 1000000 + us
+        fields = (time.gmtime(seconds + offset), us, offset, tzname, epoch_us)
+        return "".join([emit(fields) for emit in self._parts])
+
+    def format_datetime(self, dt: datetime) -> str:
+        """タイムゾーン付きの datetime を書式にしたがって文字列にします.
+
+        :param dt: タイムゾーン付きの datetime.
+        :return: 書式にしたがった文字列.
+        """
+        offset = dt.utcoffset()
+        seconds = int(offset.total_seconds()) if offset else 0
+        # UNIX 時間は X と x のトークンを出力する場合だけ計算する.
+        epoch_us = round(dt.timestamp() * 1000000) if self._needs_epoch else 0
+        fields = (dt.timetuple(), dt.microsecond, seconds, dt.tzname() or "", epoch_us)
+        return "".join([emit(fields) for emit in self._parts])
+
+
+def _literal(s: str) -> Emitter:
+    return lambda f: s
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_format(fmt: str, locale: str = "en_us") -> CompiledFormat:
+    """書式を解釈した CompiledFormat を返します.
+
+    同じ書式とロケールに対しては、キャッシュした CompiledFormat を返します.
+
+    :param fmt: Arrow の書式.
+    :param locale: 月や曜日の名称に使うロケール.
+    :return: 事前に解釈した書式.
+    """
+    return CompiledFormat(fmt, locale)
+
+
+def format_datetime(dt: datetime, fmt: str, locale: str = "en_us") -> str:
+    """タイムゾーン付きの datetime を Arrow の書式で文字列にします.
+
+    arrow.get(dt).format(fmt) と同じ結果を返します.
+
+    :param dt: タイムゾーン付きの datetime.
+    :param fmt: Arrow の書式.
+    :param locale: 月や曜日の名称に使うロケール.
+    :return: 書式にしたがった文字列.
+    """
+    return compile_format(fmt, locale).format_datetime(dt)
@@ -3,9 +3,13 @@ import argparse
 import sys
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
 
 import arrow
 
+from mtools.clock_util.formatter import format_datetime
+from mtools.clock_util.transitions import offset_table
+
 
 def get_local_time(timezone: str) -> datetime:
     """指定したタイムゾーンにおける現在時刻を返します.
@@ -23,6 +27,77 @@ def get_local_time(timezone: str) -> datetime:
     return utc.to(timezone).datetime
 
 
+def format_local_time(timezone: str, fmt: str = "YYYY-MM-DD HH:mm:ss ZZ") -> str:
+    """指定したタイムゾーンにおける現在時刻を Arrow の書式で文字列にして返します.
+
+    書式の解釈は mtools.clock_util.formatter でキャッシュされます.
+
+    :param timezone: タイムゾーン. 例) Asia/Tokyo
+    :param fmt: Arrow の書式.
+    :return: 指定したタイムゾーンでの現地時刻の文字列.
+
+    :Example:
+
+        >>> from mtools.clock_util.local_time import format_local_time
+        >>> format_local_time('Asia/Tokyo', 'HH:mm:ss')
+        '15:50:30'
+    """
+    return format_datetime(get_local_time(timezone), fmt)
+
+
+def get_local_times(zones: Iterable[str], instants: Optional[Any] = None, as_frame: bool = False) -> Any:
+    """複数の時刻を複数のタイムゾーンの現地時刻に一括で変換します.
+
+    タイムゾーンごとに UTC オフセットの切り替わりの表を作り、各時刻のオフセットを
+    二分探索(numpy.searchsorted)で求めます. 時刻の数に比例する処理は NumPy で行います.
+    使用するには NumPy が必要です. as_frame=True の場合は pandas も必要です.
+
+    :param zones: タイムゾーンのリスト. 例) ["Asia/Tokyo", "Europe/London"]
+    :param instants: 変換する時刻の配列. numpy.datetime64 の配列(UTC とみなします)か
+        UNIX 時間(秒)の数値の配列. 省略した場合は現在時刻だけを変換します.
+    :param as_frame: True の場合は pandas.DataFrame を返します.
+    :return: タイムゾーン -> 現地時刻(タイムゾーンなしの datetime64[us])の配列 の辞書.
+        as_frame=True の場合は、UTC の時刻を index、タイムゾーンを列とする DataFrame.
+
+    :Example:
+
+        >>> import numpy as np
+        >>> from mtools.clock_util.local_time import get_local_times
+        >>> times = get_local_times(["Asia/Tokyo"], np.array([0, 1530000000]))
+        >>> times["Asia/Tokyo"]
+        array(['1970-01-01T09:00:00.000000', '2018-06-26T17:00:00.000000'],
+              dtype='datetime64[us]')
+    """
+    import numpy as np
+
+    if instants is None:
+        instants = [arrow.utcnow().datetime.timestamp()]
+    t = np.asarray(instants)
+    if t.dtype.kind == "M":
+        t = t.astype("datetime64[us]")
+    else:
+        t = np.round(t.astype("float64") * 1000000).astype("int64").view("datetime64[us]")
+    us = t.view("int64")
+    nat = np.isnat(t)
+    # 秒に切り捨てた時刻でオフセットを求める.
+    seconds = us[~nat] // 1000000
+
+    result: Dict[str, Any] = {}
+    for zone in zones:
+        local = np.full(t.shape, np.datetime64("NaT"), dtype="datetime64[us]")
+        if seconds.size:
+            table, offsets = offset_table(zone, int(seconds.min()), int(seconds.max()))
+            idx = np.searchsorted(np.asarray(table, dtype="int64"), seconds, side="right") - 1
+            shift = np.asarray(offsets, dtype="int64")[idx] * 1000000
+            local[~nat] = (us[~nat] + shift).view("datetime64[us]")
+        result[zone] = local
+
+    if as_frame:
+        import pandas as pd
+        return pd.DataFrame(result, index=pd.DatetimeIndex(t, name="utc"))
+    return result
+
+
 if __name__ == "__main__":
     # 動作確認用.
     print(get_local_time("Asia/Tokyo"))
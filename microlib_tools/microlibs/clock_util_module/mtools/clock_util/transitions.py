@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""タイムゾーンの UTC オフセットの切り替わりの表を作るモジュールです.
+
+UTC オフセットは夏時間の開始・終了などの切り替わりの時刻でしか変わりません.
+offset_table は指定した期間の切り替わりの時刻と、その時刻以降のオフセットの表を返します.
+表は年ごとに作ってキャッシュするため、同じタイムゾーンと年に対しては一度だけ計算します.
+next_transition は次の切り替わりの時刻を探す関数で、myclock の ZoneOffset でも使います.
+"""
+from datetime import datetime, timezone, tzinfo
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# 切り替わりを探すときの刻み幅(秒).
+SEARCH_STEP = 86400
+# キャッシュする (タイムゾーン, 年) の数.
+CACHE_SIZE = 4096
+
+
+def probe(tz: tzinfo, timestamp: float) -> Tuple[int, str]:
+    """UNIX 時間における UTC オフセット(秒)とタイムゾーン名を返します.
+
+    :param tz: タイムゾーン.
+    :param timestamp: UNIX 時間(秒).
+    :return: (UTC オフセット(秒), タイムゾーン名)
+    """
+    dt = datetime.fromtimestamp(timestamp, tz)
+    return int(dt.utcoffset().total_seconds()), dt.tzname() or ""
+
+
+def next_transition(tz: tzinfo, start: float, end: float,
+                    current: Optional[Tuple[int, str]] = None) -> Optional[int]:
+    """start より後、end 以下で最初に UTC オフセットかタイムゾーン名が変わる時刻を返します.
+
+    SEARCH_STEP 秒ずつ進めて変わる区間を探し、その区間を秒単位まで二分探索します.
+
+    :param tz: タイムゾーン.
+    :param start: 探し始める UNIX 時間(秒).
+    :param end: 探し終える UNIX 時間(秒).
+    :param current: start における probe の結果. 求めてある場合に指定します.
+    :return: 切り替わりの UNIX 時間(秒). ない場合は None.
+    """
+    if current is None:
+        current = probe(tz, start)
+    low = start
+    while low < end:
+        high = min(low + SEARCH_STEP, end)
+        if probe(tz, high) != current:
+            # 切り替わりの時刻を秒単位まで二分探索する.
+            low, high = int(low), int(high)
+            while high - low > 1:
+                mid = (low + high) // 2
+                if probe(tz, mid) == current:
+                    low = mid
+                else:
+                    high = mid
+            return high
+        low = high
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _year_table(zone: str, year: int) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """一年分の (切り替わりの時刻, オフセット) の表を返します. 先頭は年の始まりの時刻です."""
+    # arrow は表を作るときにだけ読み込む.
+    from arrow.parser import TzinfoParser
+
+    tz = TzinfoParser.parse(zone)
+    start = int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp())
+    end = int(datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp())
+    instants, offsets = [start], [probe(tz, start)[0]]
+    t = next_transition(tz, start, end)
+    while t is not None and t < end:
+        offset = probe(tz, t)[0]
+        # タイムゾーン名だけが変わる切り替わりは省く.
+        if offset != offsets[-1]:
+            instants.append(t)
+            offsets.append(offset)
+        t = next_transition(tz, t, end)
+    return tuple(instants), tuple(offsets)
+
+
+def offset_table(zone: str, start: int, end: int) -> Tuple[List[int], List[int]]:
+    """期間 [start, end] の UTC オフセットの表を返します.
+
+    instants[i] 以降、instants[i + 1] より前の時刻のオフセットは offsets[i] です.
+    instants[0] は start 以前の時刻です.
+
+    :param zone: タイムゾーン. 例) Asia/Tokyo
+    :param start: 期間の始まりの UNIX 時間(秒).
+    :param end: 期間の終わりの UNIX 時間(秒).
+    :return: (切り替わりの時刻のリスト, オフセット(秒)のリスト)
+    """
+    first = datetime.fromtimestamp(start, timezone.utc).year
+    last = datetime.fromtimestamp(end, timezone.utc).year
+    instants: List[int] = []
+    offsets: List[int] = []
+    for year in range(first, last + 1):
+        for t, offset in zip(*_year_table(zone, year)):
+            # 年の始まりでオフセットが変わらない場合は省く.
+            if offsets and offsets[-1] == offset:
+                continue
+            instants.append(t)
+            offsets.append(offset)
+    return instants, offsets
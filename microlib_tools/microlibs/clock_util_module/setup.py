@@ -14,4 +14,8 @@ setup(
         # PyPi からインストールするパッケージ.
         "arrow",
     ],
+    extras_require={
+        # get_local_times で使うパッケージ.
+        "batch": ["numpy", "pandas"],
+    },
 )
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import random
+from datetime import datetime, timedelta, timezone
+from unittest import TestCase
+from zoneinfo import ZoneInfo
+
+import arrow
+from nose.tools import eq_, ok_
+
+from mtools.clock_util.formatter import CompiledFormat, compile_format, format_datetime
+
+# arrow.formatter.DateTimeFormatter の全てのトークンを使う書式.
+FORMATS = [
+    "YYYY-MM-DD HH:mm:ss ZZ",
+    "YY M D H m s Z ZZZ",
+    "DDDD DDD d W",
+    "hh h a A",
+    "S SS SSS SSSS SSSSS SSSSSS",
+    "X x",
+    "MMMM MMM Do dddd ddd",
+    "[at] HH[h] [[escaped]] YYYY",
+    "YYY-MMMMM ddddd",
+]
+ZONES = ["UTC", "Asia/Tokyo", "America/New_York", "Asia/Kolkata", "Australia/Lord_Howe", "Pacific/Chatham",
+         "America/St_Johns"]
+
+
+class CompiledFormatTestCase(TestCase):
+    """Test case for CompiledFormat compared with Arrow."""
+
+    def timestamps(self, n: int = 200):
+        rng = random.Random(0)
+        fixed = [0.0, -1.5, 1600000000.0, 1600000000.9999996, 1520751600.0, 951782400.0, -2208988800.0]
+        return fixed + [rng.uniform(-2e9, 4e9) for _ in range(n)]
+
+    def test_format(self) -> None:
+        """Test that format gives the same result as arrow.Arrow.format."""
+        for zone in ZONES:
+            tz = ZoneInfo(zone)
+            for fmt in FORMATS:
+                compiled = compile_format(fmt)
+                for t in self.timestamps():
+                    local = arrow.Arrow.fromtimestamp(t, tz)
+                    offset = int(local.utcoffset().total_seconds())
+                    eq_(compiled.format(t, offset, local.tzname()), local.format(fmt), f"{zone} {fmt} {t}")
+
+    def test_format_datetime(self) -> None:
+        """Test that format_datetime gives the same result as arrow.get(dt).format."""
+        for zone in ZONES:
+            tz = ZoneInfo(zone)
+            for fmt in FORMATS:
+                for t in self.timestamps(50):
+                    dt = datetime.fromtimestamp(t, tz)
+                    eq_(format_datetime(dt, fmt), arrow.get(dt).format(fmt), f"{zone} {fmt} {t}")
+
+    def test_locales(self) -> None:
+        """Test that names and years follow the locale like Arrow."""
+        fmt = "YYYY YY MMMM MMM Do dddd ddd a A"
+        for locale in ("ja", "fr", "de", "th", "en_gb"):
+            for t in self.timestamps(50):
+                local = arrow.Arrow.fromtimestamp(t, timezone.utc)
+                eq_(CompiledFormat(fmt, locale).format(t, 0), local.format(fmt, locale), f"{locale} {t}")
+
+    def test_fixed_offset(self) -> None:
+        """Test that a fixed offset datetime is formatted."""
+        dt = datetime(2018, 7, 9, 15, 50, 30, 123456, tzinfo=timezone(timedelta(hours=-3, minutes=-30)))
+        eq_(format_datetime(dt, "YYYY-MM-DD HH:mm:ss.SSSSSS ZZ Z"), "2018-07-09 15:50:30.123456 -03:30 -0330")
+
+    def test_cache(self) -> None:
+        """Test that a format is compiled once per format and locale."""
+        ok_(compile_format("HH:mm:ss") is compile_format("HH:mm:ss"))
+        ok_(compile_format("HH:mm:ss") is not compile_format("HH:mm:ss", "ja"))
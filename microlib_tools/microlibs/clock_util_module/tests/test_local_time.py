@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+import random
+import time
+from datetime import datetime, timezone
+from unittest import TestCase
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+from nose.tools import eq_, ok_
+
+from mtools.clock_util.local_time import get_local_times
+from mtools.clock_util.transitions import _year_table, offset_table
+
+# 2018-03-11 02:00 EST -> 03:00 EDT
+NY_DST_START = 1520751600
+# 2018-11-04 02:00 EDT -> 01:00 EST
+NY_DST_END = 1541311200
+ZONES = ["Asia/Tokyo", "America/New_York", "Europe/London", "Australia/Lord_Howe", "Asia/Kolkata",
+         "America/Sao_Paulo", "Pacific/Chatham", "Africa/Casablanca"]
+
+
+def _expected(zone: str, instants) -> np.ndarray:
+    """zoneinfo で求めた現地時刻の配列を返します."""
+    tz = ZoneInfo(zone)
+    local = []
+    for t in instants:
+        dt = datetime.fromtimestamp(t, timezone.utc).astimezone(tz)
+        local.append(np.datetime64(dt.replace(tzinfo=None), "us"))
+    return np.array(local, dtype="datetime64[us]")
+
+
+class GetLocalTimesTestCase(TestCase):
+    """Test case for get_local_times."""
+
+    def test_zoneinfo(self) -> None:
+        """Test that local times agree with zoneinfo."""
+        rng = random.Random(0)
+        instants = [rng.randint(-1000000000, 2000000000) for _ in range(2000)]
+        result = get_local_times(ZONES, np.array(instants))
+        eq_(list(result), ZONES)
+        for zone in ZONES:
+            ok_(np.array_equal(result[zone], _expected(zone, instants)), zone)
+
+    def test_transition(self) -> None:
+        """Test the seconds around a UTC offset transition."""
+        instants = np.array([NY_DST_START - 1, NY_DST_START, NY_DST_END - 1, NY_DST_END])
+        eq_(get_local_times(["America/New_York"], instants)["America/New_York"].astype(str).tolist(),
+            ["2018-03-11T01:59:59.000000", "2018-03-11T03:00:00.000000",
+             "2018-11-04T01:59:59.000000", "2018-11-04T01:00:00.000000"])
+
+    def test_fraction(self) -> None:
+        """Test that fractions of a second are kept, including before 1970."""
+        result = get_local_times(["Asia/Tokyo"], np.array([0.5, -0.25, 1530000000.123456]))["Asia/Tokyo"]
+        eq_(result.astype(str).tolist(),
+            ["1970-01-01T09:00:00.500000", "1970-01-01T08:59:59.750000", "2018-06-26T17:00:00.123456"])
+
+    def test_datetime64(self) -> None:
+        """Test that datetime64 values are treated as UTC and NaT is kept."""
+        instants = np.array(["2018-06-26T08:00:00", "NaT", "2018-01-01T00:00:00.5"], dtype="datetime64[ms]")
+        result = get_local_times(["Europe/London"], instants)["Europe/London"]
+        eq_(result.dtype, np.dtype("datetime64[us]"))
+        eq_(result.astype(str).tolist(), ["2018-06-26T09:00:00.000000", "NaT", "2018-01-01T00:00:00.500000"])
+
+    def test_all_nat(self) -> None:
+        """Test that only NaT gives only NaT."""
+        result = get_local_times(["Asia/Tokyo"], np.array(["NaT"], dtype="datetime64[s]"))
+        ok_(np.isnat(result["Asia/Tokyo"]).all())
+
+    def test_now(self) -> None:
+        """Test that the current time is converted when instants are omitted."""
+        before = time.time()
+        result = get_local_times(["UTC"])["UTC"]
+        eq_(result.shape, (1,))
+        ok_(before - 1 <= result[0].astype("int64") / 1e6 <= time.time() + 1)
+
+    def test_frame(self) -> None:
+        """Test that a DataFrame indexed by the UTC time is returned."""
+        frame = get_local_times(["Asia/Tokyo", "UTC"], np.array([0, 1530000000]), as_frame=True)
+        ok_(isinstance(frame, pd.DataFrame))
+        eq_(frame.index.name, "utc")
+        eq_(list(frame.columns), ["Asia/Tokyo", "UTC"])
+        eq_(frame.loc[pd.Timestamp("2018-06-26 08:00:00"), "Asia/Tokyo"], pd.Timestamp("2018-06-26 17:00:00"))
+
+
+class OffsetTableTestCase(TestCase):
+    """Test case for offset_table."""
+
+    def test_transitions(self) -> None:
+        """Test that the table has the transitions of the period."""
+        instants, offsets = offset_table("America/New_York", NY_DST_START - 86400, NY_DST_END + 86400)
+        eq_(instants[1:], [NY_DST_START, NY_DST_END])
+        eq_(offsets, [-18000, -14400, -18000])
+        ok_(instants[0] <= NY_DST_START - 86400)
+
+    def test_no_duplicate(self) -> None:
+        """Test that the start of a year without a change of the offset is left out."""
+        instants, offsets = offset_table("Asia/Tokyo", 1420070400, 1577836800)
+        eq_(len(instants), 1)
+        eq_(offsets, [32400])
+
+    def test_zoneinfo(self) -> None:
+        """Test that every transition agrees with zoneinfo."""
+        for zone in ZONES:
+            tz = ZoneInfo(zone)
+            instants, offsets = offset_table(zone, 946684800, 1893456000)
+            for t, offset in zip(instants, offsets):
+                eq_(int(datetime.fromtimestamp(t, tz).utcoffset().total_seconds()), offset, f"{zone} {t}")
+            for prev, t in zip(instants, instants[1:]):
+                ok_(prev < t, zone)
+                eq_(datetime.fromtimestamp(t - 1, tz).utcoffset(),
+                    datetime.fromtimestamp(prev, tz).utcoffset(), f"{zone} {t}")
+
+    def test_cache(self) -> None:
+        """Test that the table of a year is computed once."""
+        _year_table.cache_clear()
+        # どちらも 2017 年から 2020 年.
+        offset_table("Europe/London", 1500000000, 1600000000)
+        offset_table("Europe/London", 1510000000, 1590000000)
+        info = _year_table.cache_info()
+        eq_((info.misses, info.hits), (4, 4))
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""設定ファイルを実行した結果をキャッシュするモジュールです.
+
+設定ファイル(config.py)は traitlets の PyFileConfigLoader で実行する必要がありますが、
+traitlets.config の読み込みと設定ファイルの実行はコマンドの起動時間の大半を占めます.
+実行した結果はキャッシュのディレクトリの JSON ファイルとプロセス内のキャッシュに保存し、
+設定ファイルのパス・更新日時・サイズが変わっていなければ設定ファイルを実行せずに返します.
+
+JSON で同じ値に戻らない値(タプルや、文字列以外の辞書のキーなど)が設定されている場合は、
+ファイルには保存せずプロセス内だけでキャッシュします. どのプロセスでも同じ値を返すためです.
+
+- load_config_dict function: 実行した結果を通常の辞書で返す関数. traitlets を読み込みません.
+- load_config function: 実行した結果を traitlets の Config で返す関数.
+- invalidate function: キャッシュを削除する関数.
+"""
+import copy
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# 実行した結果を保存するディレクトリ. $XDG_CACHE_HOME(既定値は ~/.cache)以下に作ります.
+SNAPSHOT_DIR = ("mtools", "config")
+
+# 設定ファイルのパス -> (設定ファイルの状態, 実行した結果, JSON にできるかどうか)
+_memory: Dict[str, Tuple[List[Any], Any, bool]] = {}
+_lock = threading.Lock()
+
+
+def snapshot_path(path: Union[str, Path]) -> Path:
+    """設定ファイルの実行結果を保存するファイルのパスを返します.
+
+    設定ファイルのあるディレクトリ(ソースツリーなど)には書き込まないように、キャッシュのディレクトリに
+    設定ファイルの名前と絶対パスのハッシュを使ったファイル名で保存します.
+    例) ~/.cache/mtools/config/config.py.0123456789abcdef.json
+    """
+    cache = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    digest = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:16]
+    return cache.joinpath(*SNAPSHOT_DIR) / f"{Path(path).name}.{digest}.json"
+
+
+def _to_dict(config: Dict[str, Any]) -> Dict[str, Any]:
+    """traitlets の Config を、入れ子になった通常の辞書に変換します."""
+    return {k: _to_dict(v) if isinstance(v, dict) else v for k, v in config.items()}
+
+
+def _copy(value: Any) -> Any:
+    """JSON にできる値をコピーします. copy.deepcopy より速く動きます."""
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def _source(path: Path) -> Optional[List[Any]]:
+    """設定ファイルの (パス, 更新日時, サイズ) を返します. 設定ファイルがない場合は None."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [os.path.abspath(path), st.st_mtime_ns, st.st_size]
+
+
+def _load(path: Path, source: List[Any]) -> Tuple[Any, bool]:
+    """実行した結果を返します. (実行した結果, JSON にできるかどうか)"""
+    key = source[0]
+    with _lock:
+        cached = _memory.get(key)
+    if cached is not None and cached[0] == source:
+        return cached[1], cached[2]
+
+    snapshot = snapshot_path(path)
+    try:
+        data = json.loads(snapshot.read_text(encoding="utf-8"))
+        if data.get("source") == source:
+            with _lock:
+                _memory[key] = (source, data["config"], True)
+            return data["config"], True
+    except (OSError, ValueError, KeyError, AttributeError):
+        # 保存した結果がないか壊れている場合は設定ファイルを実行する.
+        pass
+
+    from traitlets.config.loader import PyFileConfigLoader
+    config = PyFileConfigLoader(str(path)).load_config()
+    ret = _to_dict(config)
+    try:
+        content = json.dumps({"source": source, "config": ret}, ensure_ascii=False)
+        serializable = json.loads(content)["config"] == ret
+    except (TypeError, ValueError):
+        serializable = False
+    if not serializable:
+        # JSON にできない値や、JSON で同じ値に戻らない値はプロセス内だけでキャッシュする.
+        with _lock:
+            _memory[key] = (source, config, False)
+        return config, False
+
+    try:
+        snapshot.parent.mkdir(parents=True, exist_ok=True)
+        tmp = snapshot.with_name(f"{snapshot.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(content, encoding="utf-8")
+        os.replace(str(tmp), str(snapshot))
+    except OSError:
+        # 保存できない場合も、実行した結果は返す.
+        pass
+    with _lock:
+        _memory[key] = (source, ret, True)
+    return ret, True
+
+
+def load_config_dict(path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """設定ファイルを実行した結果を辞書で返します.
+
+    :param path: 設定ファイルのパス.
+    :return: クラス名 -> (設定値の名前 -> 値) の辞書. 設定ファイルがない場合は空の辞書.
+             JSON で同じ値に戻らない値が設定されている場合は None を返します.
+             その場合は load_config を使ってください.
+    """
+    path = Path(path)
+    source = _source(path)
+    if source is None:
+        return {}
+    config, serializable = _load(path, source)
+    return _copy(config) if serializable else None
+
+
+def load_config(path: Union[str, Path]) -> Any:
+    """設定ファイルを実行した結果を traitlets の Config で返します.
+
+    PyFileConfigLoader(path).load_config() と同じ結果を返します.
+    返した Config を変更してもキャッシュには影響しません.
+
+    :param path: 設定ファイルのパス.
+    :return: traitlets.config.Config. 設定ファイルがない場合は空の Config.
+    """
+    from traitlets.config import Config
+
+    path = Path(path)
+    source = _source(path)
+    if source is None:
+        return Config()
+    config, serializable = _load(path, source)
+    return Config(_copy(config) if serializable else copy.deepcopy(config))
+
+
+def invalidate(path: Optional[Union[str, Path]] = None) -> None:
+    """キャッシュを削除します. 次に読み込むときは設定ファイルを実行します.
+
+    設定ファイルの更新日時とサイズが変わらないように書き換えた場合などに使います.
+
+    :param path: 設定ファイルのパス. 省略した場合はプロセス内のキャッシュを全て削除します.
+                 保存した実行結果のファイルは path を指定した場合だけ削除します.
+    """
+    with _lock:
+        if path is None:
+            _memory.clear()
+            return
+        _memory.pop(os.path.abspath(path), None)
+    try:
+        snapshot_path(path).unlink()
+    except FileNotFoundError:
+        pass
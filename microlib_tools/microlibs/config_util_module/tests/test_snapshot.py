@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from nose.tools import eq_, ok_
+from traitlets.config import Config
+from traitlets.config.loader import PyFileConfigLoader
+
+from mtools.config_util import snapshot
+
+
+class SnapshotTestCase(TestCase):
+    """Test case for mtools.config_util.snapshot."""
+
+    def setUp(self) -> None:
+        """Write a config file and use a cache directory in a temporary directory."""
+        snapshot.invalidate()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = Path(self.tmp.name) / "cache"
+        env = patch.dict(os.environ, {"XDG_CACHE_HOME": str(self.cache)})
+        env.start()
+        self.addCleanup(env.stop)
+        self.path = Path(self.tmp.name) / "config.py"
+        self.write('c.MyClock.time_zones = ["Asia/Tokyo"]\nc.MyClock.time_format = "HH:mm"\n')
+
+    def write(self, content: str) -> None:
+        self.path.write_text(content, encoding="utf-8")
+
+    def no_execution(self):
+        return patch.object(PyFileConfigLoader, "load_config", side_effect=AssertionError("executed"))
+
+    def test_same_as_loader(self) -> None:
+        """Test that the result equals running the config file."""
+        expected = PyFileConfigLoader(str(self.path)).load_config()
+        config = snapshot.load_config(self.path)
+        ok_(isinstance(config, Config))
+        eq_(config, expected)
+        eq_(snapshot.load_config_dict(self.path),
+            {"MyClock": {"time_zones": ["Asia/Tokyo"], "time_format": "HH:mm"}})
+
+    def test_memory_cache(self) -> None:
+        """Test that an unchanged config file is not executed again."""
+        snapshot.load_config(self.path)
+        with self.no_execution():
+            eq_(snapshot.load_config(self.path).MyClock.time_format, "HH:mm")
+
+    def test_snapshot_file(self) -> None:
+        """Test that another process reads the saved result without executing the config file."""
+        snapshot.load_config(self.path)
+        snapshot_path = snapshot.snapshot_path(self.path)
+        eq_(json.loads(snapshot_path.read_text(encoding="utf-8"))["config"]["MyClock"]["time_format"], "HH:mm")
+        # プロセス内のキャッシュだけを削除する.
+        snapshot.invalidate()
+        with self.no_execution():
+            eq_(snapshot.load_config_dict(self.path)["MyClock"]["time_zones"], ["Asia/Tokyo"])
+
+    def test_snapshot_path(self) -> None:
+        """Test that the result is saved in the cache directory, not next to the config file."""
+        snapshot.load_config(self.path)
+        eq_(sorted(p.name for p in self.path.parent.iterdir()), ["cache", "config.py"])
+        path = snapshot.snapshot_path(self.path)
+        eq_(path.parent, self.cache / "mtools" / "config")
+        ok_(path.name.startswith("config.py.") and path.name.endswith(".json"))
+        # 同じ名前でも別のディレクトリの設定ファイルは別のファイルに保存する.
+        ok_(snapshot.snapshot_path(Path(self.tmp.name) / "other" / "config.py") != path)
+
+    def test_changed(self) -> None:
+        """Test that a changed config file is executed again."""
+        snapshot.load_config(self.path)
+        self.write('c.MyClock.time_format = "HH:mm:ss"\n')
+        eq_(snapshot.load_config_dict(self.path), {"MyClock": {"time_format": "HH:mm:ss"}})
+
+    def test_invalidate(self) -> None:
+        """Test that invalidate with a path removes the saved result."""
+        snapshot.load_config(self.path)
+        stat = os.stat(self.path)
+        # 更新日時とサイズが変わらない書き換え.
+        line = 'c.MyClock.time_format = "mm:HH"\n'
+        self.write(line + " " * (stat.st_size - len(line)))
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        eq_(snapshot.load_config(self.path).MyClock.time_format, "HH:mm")
+        snapshot.invalidate(self.path)
+        ok_(not snapshot.snapshot_path(self.path).exists())
+        eq_(snapshot.load_config(self.path).MyClock.time_format, "mm:HH")
+
+    def test_broken_snapshot(self) -> None:
+        """Test that a broken saved result is replaced."""
+        path = snapshot.snapshot_path(self.path)
+        path.parent.mkdir(parents=True)
+        path.write_text("{", encoding="utf-8")
+        eq_(snapshot.load_config_dict(self.path)["MyClock"]["time_format"], "HH:mm")
+        eq_(json.loads(path.read_text(encoding="utf-8"))["config"]["MyClock"],
+            {"time_zones": ["Asia/Tokyo"], "time_format": "HH:mm"})
+
+    def test_copy(self) -> None:
+        """Test that changing a returned value does not change the cache."""
+        snapshot.load_config_dict(self.path)["MyClock"]["time_zones"].append("UTC")
+        snapshot.load_config(self.path).MyClock.time_zones.append("UTC")
+        eq_(snapshot.load_config_dict(self.path)["MyClock"]["time_zones"], ["Asia/Tokyo"])
+
+    def test_not_serializable(self) -> None:
+        """Test that values that cannot be saved as JSON are cached in the process only."""
+        self.write("c.MyClock.time_zones = {'Asia/Tokyo'}\n")
+        eq_(snapshot.load_config_dict(self.path), None)
+        eq_(snapshot.load_config(self.path).MyClock.time_zones, {"Asia/Tokyo"})
+        ok_(not snapshot.snapshot_path(self.path).exists())
+        with self.no_execution():
+            snapshot.load_config(self.path)
+
+    def test_not_round_trip(self) -> None:
+        """Test that tuples and non-string keys are kept as is, in the first process and in later ones."""
+        for content, value in (("c.MyClock.time_zones = ('Asia/Tokyo', 'UTC')\n", ("Asia/Tokyo", "UTC")),
+                               ("c.MyClock.time_zones = {1: 'Asia/Tokyo'}\n", {1: "Asia/Tokyo"})):
+            snapshot.invalidate()
+            self.write(content)
+            eq_(snapshot.load_config_dict(self.path), None)
+            eq_(snapshot.load_config(self.path).MyClock.time_zones, value)
+            ok_(not snapshot.snapshot_path(self.path).exists())
+            # 別のプロセスでも同じ値になる.
+            snapshot.invalidate()
+            eq_(snapshot.load_config(self.path).MyClock.time_zones, value)
+
+    def test_missing(self) -> None:
+        """Test that a missing config file gives an empty result."""
+        self.path.unlink()
+        eq_(snapshot.load_config_dict(self.path), {})
+        eq_(snapshot.load_config(self.path), Config())
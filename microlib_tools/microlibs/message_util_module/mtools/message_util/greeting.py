@@ -1,11 +1,161 @@
-"""挨拶に関する関数が入っているスクリプト."""
-from datetime import datetime
+"""挨拶に関する関数が入っているスクリプト.
 
-from mtools.clock_util.local_time import get_local_time
+挨拶の文言は言語ごとにカタログ(locales/greetings.json)から一度だけ読み込みます.
+タイムゾーンの言語は、タイムゾーン -> 国コード の表(locales/zones.json)と
+カタログの 国コード -> 言語 の表から決めます. 表にない国やタイムゾーンはカタログの既定の言語になります.
+
+挨拶は現地時刻の時(hour)だけで決まるため、タイムゾーンごとに次の正時まで結果をキャッシュします.
+"""
+import json
+import math
+import time
+from bisect import bisect_right
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from mtools.clock_util.transitions import offset_table
 
 TIMEZONE_JP = "Asia/Tokyo"
 TIMEZONE_NY = "America/New_York"
 
+# 挨拶のカタログとタイムゾーンの表があるディレクトリ.
+LOCALE_DIR = Path(__file__).resolve().parent / "locales"
+# 既定の挨拶のカタログ.
+DEFAULT_CATALOG = LOCALE_DIR / "greetings.json"
+# タイムゾーン -> 国コード の表. scripts/make_zone_table.py で作ります.
+ZONE_TABLE = LOCALE_DIR / "zones.json"
+
+# 現地時刻の時(0-23) -> 時間帯.
+PERIODS = ["night"] * 5 + ["morning"] * 5 + ["daytime"] * 8 + ["night"] * 6
+
+
+@lru_cache(maxsize=None)
+def load_zone_countries() -> Dict[str, str]:
+    """タイムゾーン -> 国コード の表を返します. 読み込みは最初の一回だけ行います."""
+    return json.loads(ZONE_TABLE.read_text(encoding="utf-8"))
+
+
+@lru_cache(maxsize=None)
+def load_catalog(path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """挨拶のカタログを返します. 読み込みはファイルごとに最初の一回だけ行います.
+
+    カタログは次の形式の JSON です.
+
+        {"default": "en",
+         "messages": {"en": {"morning": "Good morning.", "daytime": "Hello.", "night": "Good evening."}, ...},
+         "countries": {"US": "en", ...},
+         "zones": {"Asia/Tokyo": "jp", ...}}
+
+    "zones" は国コードより優先される タイムゾーン -> 言語 の表です. "countries" と "zones" は省略できます.
+
+    :param path: カタログのファイルのパス. 省略した場合は DEFAULT_CATALOG.
+    :return: カタログの辞書.
+    :raises ValueError: 既定の言語の文言がない場合.
+    """
+    path = Path(path or DEFAULT_CATALOG)
+    catalog = json.loads(path.read_text(encoding="utf-8"))
+    if catalog.get("default") not in catalog.get("messages", {}):
+        raise ValueError(f"Catalog has no messages for the default language: {path}")
+    return catalog
+
+
+class GreetingResolver:
+    """タイムゾーンごとの挨拶を求め、次の正時までキャッシュするクラス.
+
+    :Example:
+
+        >>> resolver = GreetingResolver()
+        >>> resolver.resolve(["Asia/Tokyo", "America/New_York"], now=1530000000)
+        ['こんにちは。', 'Good evening.']
+    """
+
+    def __init__(self, catalog: Optional[Union[str, Path]] = None) -> None:
+        """コンストラクタ.
+
+        :param catalog: 挨拶のカタログのファイルのパス. 省略した場合は DEFAULT_CATALOG.
+        """
+        c = load_catalog(catalog)
+        self.messages: Dict[str, Dict[str, str]] = c["messages"]
+        self.default: str = c["default"]
+        self.countries: Dict[str, str] = c.get("countries", {})
+        self.zones: Dict[str, str] = c.get("zones", {})
+        # タイムゾーン -> (有効な期間の始まり, 終わり, 挨拶)
+        self._cache: Dict[str, Tuple[float, float, str]] = {}
+
+    def language(self, zone: str) -> str:
+        """タイムゾーンの言語を返します.
+
+        :param zone: タイムゾーン. 例) Asia/Tokyo
+        :return: 言語. 例) jp
+        """
+        lang = self.zones.get(zone) or self.countries.get(load_zone_countries().get(zone, ""))
+        return lang if lang in self.messages else self.default
+
+    def resolve(self, zones: Iterable[str], now: Optional[float] = None) -> List[str]:
+        """複数のタイムゾーンの挨拶を、同じ時刻で求めます.
+
+        :param zones: タイムゾーンのリスト. 同じタイムゾーンが何度あっても構いません.
+        :param now: 時刻の UNIX 時間. 省略した場合は現在時刻を使います.
+        :return: zones と同じ順の挨拶のリスト.
+        """
+        if now is None:
+            now = time.time()
+        cache = self._cache
+        ret = []
+        for zone in zones:
+            entry = cache.get(zone)
+            if entry is None or not entry[0] <= now < entry[1]:
+                entry = cache[zone] = self._lookup(zone, now)
+            ret.append(entry[2])
+        return ret
+
+    def _lookup(self, zone: str, now: float) -> Tuple[float, float, str]:
+        """now の挨拶と、同じ挨拶になる期間 [始まり, 終わり) を求めます."""
+        instants, offsets = offset_table(zone, math.floor(now), math.floor(now))
+        i = bisect_right(instants, now) - 1
+        offset = offsets[i]
+        # 現地時刻の正時から次の正時までを有効な期間にする.
+        local_hour = math.floor((now + offset) / 3600)
+        start = max(local_hour * 3600 - offset, instants[i])
+        end = local_hour * 3600 + 3600 - offset
+        if i + 1 < len(instants):
+            # UTC オフセットが変わる場合はそこまで.
+            end = min(end, instants[i + 1])
+        message = self.messages[self.language(zone)][PERIODS[local_hour % 24]]
+        return start, end, message
+
+
+@lru_cache(maxsize=None)
+def get_resolver(catalog: Optional[Union[str, Path]] = None) -> GreetingResolver:
+    """カタログごとに共有する GreetingResolver を返します.
+
+    :param catalog: 挨拶のカタログのファイルのパス. 省略した場合は DEFAULT_CATALOG.
+    :return: GreetingResolver.
+    """
+    return GreetingResolver(catalog)
+
+
+def get_greeting_messages(zones: Iterable[str], now: Optional[float] = None,
+                          catalog: Optional[Union[str, Path]] = None) -> List[str]:
+    """複数のタイムゾーンにおける挨拶を、同じ現在時刻でまとめて返します.
+
+    結果はタイムゾーンごとに現地時刻の次の正時までキャッシュされるため、
+    大量の利用者の挨拶を求める場合も、タイムゾーンの変換はタイムゾーンの数だけで済みます.
+
+    :param zones: タイムゾーンのリスト. 例) ["Asia/Tokyo", "America/New_York"]
+    :param now: 時刻の UNIX 時間. 省略した場合は現在時刻を使います.
+    :param catalog: 挨拶のカタログのファイルのパス. 省略した場合は DEFAULT_CATALOG.
+    :return: zones と同じ順の、各タイムゾーンの現地時刻での挨拶のリスト.
+
+    :Example:
+
+        >>> from mtools.message_util.greeting import get_greeting_messages
+        >>> get_greeting_messages(["Asia/Tokyo", "America/New_York", "Europe/Paris"])
+        ['こんにちは。', 'Good evening.', 'Bonjour.']
+    """
+    return get_resolver(catalog).resolve(zones, now)
+
 
 def get_greeting_message(timezone: str) -> str:
     """指定したタイムゾーンにおける挨拶を返します.
@@ -15,12 +165,9 @@ def get_greeting_message(timezone: str) -> str:
 
     .. Note::
 
-        * 設定できるタイムゾーンは次のタイムゾーンになります.
-
-            * "Asia/Tokyo"
-            * "America/New_York"
-
-        * このサンプルでは例外に関しての考慮はしていません.
+        * 言語はタイムゾーンの国から決めます. 例) "Asia/Tokyo" は日本語、"America/New_York" は英語.
+        * 挨拶のカタログにない言語の国のタイムゾーンは英語になります.
+        * 複数のタイムゾーンの挨拶を求める場合は get_greeting_messages を使ってください.
 
     :Example:
 
@@ -28,30 +175,7 @@ def get_greeting_message(timezone: str) -> str:
         >>> get_greeting_message("Asia/Tokyo")
         'こんにちは。'
     """
-    # 各言語でのメッセージ.
-    messages = {"jp": {"morning": "おはよう。", "daytime": "こんにちは。", "night": "こんばんは。"},
-                "en": {"morning": "Good morning.", "daytime": "Hello.", "night": "Good evening."}}
-
-    # 指定タイムゾーンにおける現在時刻を得る.
-    dt = get_local_time(timezone)
-
-    # 言語を設定する.
-    if timezone == TIMEZONE_JP:
-        lang = "jp"
-    elif timezone == TIMEZONE_NY:
-        lang = "en"
-    else:
-        lang = "jp"
-
-    # 時間帯を設定する.
-    if 5 <= dt.hour and dt.hour <= 9:
-        t = "morning"
-    elif (18 <= dt.hour) or (0 <= dt.hour and dt.hour <= 5):
-        t = "night"
-    else:
-        t = "daytime"
-
-    return messages[lang][t]
+    return get_greeting_messages([timezone])[0]
 
 
 if __name__ == "__main__":
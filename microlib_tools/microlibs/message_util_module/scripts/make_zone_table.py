@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""タイムゾーン -> 国コード の表(mtools/message_util/locales/zones.json)を作るスクリプトです.
+
+IANA のタイムゾーンデータベースの zone.tab と tzdata.zi から作ります.
+"Japan" -> "Asia/Tokyo" のような別名(リンク)も、リンク先の国コードで登録します.
+ただし RENAMED の古い名前は、改名後のタイムゾーンの国コードで登録します.
+タイムゾーンデータベースを更新した場合に実行してください.
+
+message_util のディレクトリで実行してください.
+
+    $ python scripts/make_zone_table.py
+    $ python scripts/make_zone_table.py --zoneinfo /usr/share/zoneinfo
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict
+
+OUTPUT = Path(__file__).resolve().parent.parent / "mtools" / "message_util" / "locales" / "zones.json"
+
+# 古い名前 -> 改名後の zone.tab のタイムゾーン.
+# tzdata.zi ではこれらの名前は、改名後のタイムゾーンではなく同じ時刻の他の国のタイムゾーンにリンクされています.
+# 例) Africa/Asmera は Africa/Nairobi(KE) へのリンクですが、改名後の Africa/Asmara は ER です.
+RENAMED = {
+    "Africa/Asmera": "Africa/Asmara",
+    "Africa/Timbuktu": "Africa/Bamako",
+    "America/Coral_Harbour": "America/Atikokan",
+    "America/Virgin": "America/St_Thomas",
+    "Antarctica/South_Pole": "Antarctica/McMurdo",
+    "Atlantic/Jan_Mayen": "Arctic/Longyearbyen",
+    "Pacific/Johnston": "Pacific/Midway",
+    "Pacific/Ponape": "Pacific/Pohnpei",
+    "Pacific/Truk": "Pacific/Chuuk",
+    "Pacific/Yap": "Pacific/Chuuk",
+}
+
+
+def read_zone_tab(path: Path) -> Dict[str, str]:
+    """zone.tab からタイムゾーン -> 国コード の辞書を作ります."""
+    ret = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line and not line.startswith("#"):
+            country, _, zone = line.split("\t")[:3]
+            ret[zone] = country
+    return ret
+
+
+def read_links(path: Path) -> Dict[str, str]:
+    """tzdata.zi から別名 -> リンク先のタイムゾーン の辞書を作ります."""
+    ret = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.startswith("L "):
+            _, target, link = line.split()
+            ret[link] = target
+    return ret
+
+
+def main() -> None:
+    """スクリプトのエントリーポイント."""
+    parser = argparse.ArgumentParser(description="タイムゾーン -> 国コード の表を作ります.")
+    parser.add_argument("--zoneinfo", default="/usr/share/zoneinfo", help="タイムゾーンデータベースのディレクトリ.")
+    args = parser.parse_args()
+
+    zoneinfo = Path(args.zoneinfo)
+    countries = read_zone_tab(zoneinfo / "zone.tab")
+    for link, target in read_links(zoneinfo / "tzdata.zi").items():
+        # 改名されたタイムゾーンは、リンク先ではなく改名後のタイムゾーンの国にする.
+        target = RENAMED.get(link, target)
+        if link not in countries and target in countries:
+            countries[link] = countries[target]
+    OUTPUT.write_text(json.dumps(dict(sorted(countries.items())), indent=0) + "\n", encoding="utf-8")
+    print(f"{len(countries)} zones -> {OUTPUT}")
+
+
+if __name__ == "__main__":
+    main()
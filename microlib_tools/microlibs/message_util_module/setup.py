@@ -10,6 +10,8 @@ setup(
     description="Your microlib descriton",
     namespace_packages=['mtools'],
     packages=[microlib_name],
+    # 挨拶のカタログとタイムゾーンの表.
+    package_data={microlib_name: ["locales/*.json"]},
     install_requires=[
         # PyPi からインストールするパッケージ.
     ],
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import json
+import random
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+from nose.tools import eq_, ok_, raises
+
+from mtools.message_util import greeting
+from mtools.message_util.greeting import (PERIODS, GreetingResolver, get_greeting_message, get_greeting_messages,
+                                          load_catalog, load_zone_countries)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from make_zone_table import RENAMED  # noqa: E402
+
+# 2018-03-11 02:00 EST -> 03:00 EDT
+NY_DST_START = 1520751600
+
+
+class GreetingResolverTestCase(TestCase):
+    """Test case for GreetingResolver."""
+
+    def setUp(self) -> None:
+        """Create a resolver with the default catalog."""
+        self.resolver = GreetingResolver()
+
+    def test_resolve(self) -> None:
+        """Test that each zone gets the greeting of its language and local hour."""
+        eq_(self.resolver.resolve(["Asia/Tokyo", "America/New_York", "Asia/Tokyo"], now=1530000000),
+            ["こんにちは。", "Good evening.", "こんにちは。"])
+
+    def test_language(self) -> None:
+        """Test that the language is decided by the country of the zone."""
+        eq_(self.resolver.language("Asia/Tokyo"), "jp")
+        eq_(self.resolver.language("Japan"), "jp")
+        eq_(self.resolver.language("Europe/Paris"), "fr")
+        eq_(self.resolver.language("America/New_York"), "en")
+        # 表にないタイムゾーンは既定の言語.
+        eq_(self.resolver.language("Etc/UTC"), "en")
+        eq_(self.resolver.language("Nowhere/City"), "en")
+
+    def test_zoneinfo(self) -> None:
+        """Test that greetings agree with the local hour from zoneinfo."""
+        rng = random.Random(0)
+        zones = ["Asia/Tokyo", "America/New_York", "Europe/Paris", "Asia/Kolkata", "Australia/Lord_Howe",
+                 "America/Sao_Paulo", "Pacific/Chatham"]
+        for now in sorted(rng.uniform(1420070400, 1577836800) for _ in range(300)):
+            expected = []
+            for zone in zones:
+                hour = datetime.fromtimestamp(now, ZoneInfo(zone)).hour
+                expected.append(self.resolver.messages[self.resolver.language(zone)][PERIODS[hour]])
+            eq_(self.resolver.resolve(zones, now), expected, now)
+
+    def test_cache(self) -> None:
+        """Test that a zone is looked up once until the next local hour."""
+        with patch.object(GreetingResolver, "_lookup", side_effect=GreetingResolver._lookup,
+                          autospec=True) as lookup:
+            for t in range(1530000000, 1530000000 + 3600 * 3, 60):
+                self.resolver.resolve(["Asia/Tokyo", "Asia/Kolkata"], t)
+        # 1530000000 は UTC の正時. Asia/Tokyo は 3 回、+05:30 の Asia/Kolkata は 4 回求める.
+        eq_(lookup.call_count, 7)
+
+    def test_transition(self) -> None:
+        """Test that the cached period ends at a UTC offset transition."""
+        start, end, message = self.resolver._lookup("America/New_York", NY_DST_START - 1800)
+        eq_((start, end), (NY_DST_START - 3600, NY_DST_START))
+        eq_(message, "Good evening.")
+
+    def test_custom_catalog(self) -> None:
+        """Test that a catalog file overrides the languages of zones and countries."""
+        catalog = {"default": "xx",
+                   "messages": {"xx": {"morning": "m", "daytime": "d", "night": "n"},
+                                "yy": {"morning": "M", "daytime": "D", "night": "N"}},
+                   "countries": {"US": "yy"},
+                   "zones": {"Asia/Tokyo": "yy"}}
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "catalog.json"
+            path.write_text(json.dumps(catalog), encoding="utf-8")
+            resolver = GreetingResolver(path)
+        eq_(resolver.resolve(["Asia/Tokyo", "America/New_York", "Europe/Paris"], now=1530000000),
+            ["D", "N", "d"])
+
+    @raises(ValueError)
+    def test_catalog_without_default(self) -> None:
+        """Test that a catalog without messages for the default language is rejected."""
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "catalog.json"
+            path.write_text(json.dumps({"default": "xx", "messages": {}}), encoding="utf-8")
+            load_catalog(path)
+
+
+class ZoneTableTestCase(TestCase):
+    """Test case for the zone -> country table."""
+
+    def test_renamed(self) -> None:
+        """Test that renamed zones have the country of the new name, not of the link target."""
+        countries = load_zone_countries()
+        eq_(countries["Africa/Asmera"], "ER")
+        for old, new in RENAMED.items():
+            eq_(countries[old], countries[new], old)
+
+    def test_links(self) -> None:
+        """Test that links get the country of their target."""
+        countries = load_zone_countries()
+        eq_(countries["Japan"], "JP")
+        eq_(countries["US/Eastern"], "US")
+        eq_(countries["Asia/Calcutta"], "IN")
+
+
+class FunctionsTestCase(TestCase):
+    """Test case for the module functions."""
+
+    def test_messages(self) -> None:
+        """Test that the shared resolver is used."""
+        eq_(get_greeting_messages(["Asia/Tokyo", "America/New_York"], now=1530000000),
+            ["こんにちは。", "Good evening."])
+        ok_(greeting.get_resolver() is greeting.get_resolver())
+
+    def test_message(self) -> None:
+        """Test that a single greeting is one of the catalog messages."""
+        ok_(get_greeting_message("Asia/Tokyo") in ("おはよう。", "こんにちは。", "こんばんは。"))
@@ -11,6 +11,7 @@ PACKAGE_NAME = 'mtools'
 # インストールする microlibs
 SOURCES = {
     'microlibs.clock_util': 'microlibs/clock_util_module',
+    'microlibs.config_util': 'microlibs/config_util_module',
     'microlibs.message_util': 'microlibs/message_util_module',
 }
 
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""このモジュールには次のクラスが入っています.
+
+- MyClock class: 指定したタイムゾーンの日時および指定日のカウントダウンを表示するためのクラス.
+- CustomArrow class: カウントダウンの日時を生成するヘルパークラス.
+
+このモジュールは次の外部モジュールを使用しています.
+
+- 外部設定ファイルのよる更新に Traitlets を使用しています.
+- タイムゾーンの変換に Arrow を使用しています.
+"""
+from datetime import timedelta
+from pathlib import Path
+from typing import List as ListType
+from typing import Any, Dict, Optional
+
+import arrow
+from mtools.config_util.snapshot import invalidate, load_config
+from traitlets import Int, List, Unicode, observe
+from traitlets.config.configurable import Configurable
+
+from myclock.face import (DEFAULT_COUNTDOWN_LIMIT, DEFAULT_THE_DAY_DATETIME, DEFAULT_THE_DAY_TITLE,
+                          DEFAULT_TIME_FORMAT, DEFAULT_TIME_ZONES, ClockFace)
+
+
+class MyClock(Configurable):
+    """コンソールに各タイムゾーンの時刻と指定日へのカウントダウンを表示するクラス.
+
+    各タイムゾーンとカウントダウン用の指定日は外部ファイルから設定することができます.
+    外部設定ファイルはモジュールのインストール時にホームディレクトリの .myclock ディレクトリ以下に生成されます.
+    外部設定ファイルがない場合は内部のデフォルト値が使用されます.
+    モジュールをアンインストールしても設定ファイルは残ります.
+    """
+
+    # 設定値の初期値.
+    # 外部設定ファイル `~/.myclock/config.py` からも更新できます.
+    time_zones = List(DEFAULT_TIME_ZONES).tag(config=True)
+    time_format = Unicode(DEFAULT_TIME_FORMAT).tag(config=True)
+    the_day_datetime = Unicode(DEFAULT_THE_DAY_DATETIME).tag(config=True)
+    the_day_title = Unicode(DEFAULT_THE_DAY_TITLE).tag(config=True)
+    # 複数のカウントダウン. 指定した場合は the_day_datetime の代わりに表示します.
+    countdowns = List([]).tag(config=True)
+    countdown_limit = Int(DEFAULT_COUNTDOWN_LIMIT).tag(config=True)
+
+    def __init__(self) -> None:
+        """コンストラクタ.
+
+        - 外部設定ファイルが存在する場合は読込み、このクラスのプロパティを更新します.
+        - 設定ファイルが前回から変更されていない場合は、実行した結果のキャッシュを使います.
+        """
+        p = self.config_path
+        if p.exists():
+            # 設定ファイルが存在すれば読み込む.
+            c = load_config(p)
+            # 自身のパラメータを更新する.
+            self.update_config(c)
+
+    @property
+    def config_path(self) -> Path:
+        """外部設定ファイルのパス."""
+        return Path.home() / ".myclock" / "config.py"
+
+    def reload(self) -> bool:
+        """外部設定ファイルを読み込み直し、変更をまとめて反映します.
+
+        設定ファイルから削除された設定値は初期値に戻します.
+        設定ファイルに誤りがある場合は何も変更しません.
+
+        :return: 変更を反映した場合は True. 設定ファイルに誤りがある場合は False.
+        """
+        old = {name: getattr(self, name) for name in self.trait_names(config=True)}
+        try:
+            # 更新日時とサイズが変わらない書き換えもあるため、キャッシュは使わない.
+            invalidate(self.config_path)
+            c = load_config(self.config_path)
+            with self.hold_trait_notifications():
+                for name, trait in self.traits(config=True).items():
+                    setattr(self, name, trait.default())
+                self.update_config(c)
+            # 新しい設定値で表示できることを確かめる.
+            self.face
+        except Exception:
+            # 設定ファイルの実行時の例外や、設定値の型の誤り(TraitError)など.
+            with self.hold_trait_notifications():
+                for name, value in old.items():
+                    setattr(self, name, value)
+            return False
+        return True
+
+    @observe("time_zones", "time_format", "the_day_datetime", "the_day_title", "countdowns", "countdown_limit")
+    def _settings_changed(self, change: dict) -> None:
+        """設定値が変更された場合は、表示する行を作るオブジェクトを作り直すようにします."""
+        self._face = None
+
+    @property
+    def face(self) -> ClockFace:
+        """現在の設定値で表示する行を作るオブジェクト. 最初の一回だけ作ります."""
+        if getattr(self, "_face", None) is None:
+            self._face = ClockFace(self.time_zones, self.time_format,
+                                   self.the_day_datetime, self.the_day_title,
+                                   self.countdowns, self.countdown_limit)
+        return self._face
+
+    def lines(self, now: Optional[float] = None) -> ListType[str]:
+        """表示する行のリストを返します.
+
+        :param now: 表示する時刻の UNIX 時間. 省略した場合は現在時刻を使います.
+        :return: 各ローカル時刻とカウントダウンの行のリスト.
+        """
+        return self.face.lines(now)
+
+    def record(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """機械処理用の記録を返します.
+
+        :param now: 記録する時刻の UNIX 時間. 省略した場合は現在時刻を使います.
+        :return: UNIX 時間、各タイムゾーンの UTC オフセット、カウントダウンの残り時間の辞書.
+        """
+        return self.face.record(now)
+
+    def show(self) -> None:
+        """ローカル時刻とカウントダウンを表示します."""
+        print("\n".join(self.lines()))
+
+
+class CustomArrow(arrow.Arrow):
+    """カウントダウンのためのカスタム Arrow クラス."""
+
+    def till_the_day(self, dt: arrow) -> timedelta:
+        """指定日と現在日時との timedelta を返す.
+
+        :params dt: カウントダウンの対象となる指定日.
+        """
+        return dt - self
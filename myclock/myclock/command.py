@@ -1,26 +1,34 @@
 # -*- coding: utf-8 -*-
-"""このモジュールには次のクラスと関数が入っています.
+"""このモジュールには次の関数が入っています.
 
-- MyClock class: 指定したタイムゾーンの日時および指定日のカウントダウンを表示するためのクラス.
-- CustomArrow class: カウントダウンの日時を生成するヘルパークラス.
 - create_config function: 設定ファイルをホームディレクトリの .myclock 以下に生成する関数.
 - command function: MyClock を実行するための関数.
 
-このモジュールは次の外部モジュールを使用しています.
+MyClock class と CustomArrow class は myclock.clock モジュールに入っています.
+互換性のため、このモジュールからも参照できます.
 
-- 外部設定ファイルのよる更新に Traitlets を使用しています.
-- タイムゾーンの変換に Arrow を使用しています.
+毎秒の表示の更新は myclock.render モジュールで行います.
+--format jsonl|csv の出力は myclock.stream モジュールで行います.
+時刻の変換と整形は myclock.zones と myclock.formatter モジュールで行います.
+
+コマンドの起動を速くするため、traitlets と arrow はこのモジュールの読み込み時には読み込みません.
+一回だけ表示する場合は、設定ファイルの実行結果(mtools.config_util.snapshot)と ClockFace で表示します.
 """
 import argparse
+import os
+import signal
 import sys
-from datetime import datetime, timedelta
 from pathlib import Path
-from time import sleep
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from mtools.config_util.snapshot import load_config_dict
 
-import arrow
-from traitlets import Int, List, Unicode
-from traitlets.config.configurable import Configurable
-from traitlets.config.loader import PyFileConfigLoader
+from myclock.face import ClockFace
+from myclock.render import HIDE_CURSOR, SHOW_CURSOR, FrameRenderer, ticks
+from myclock.watch import watch_file
+
+if TYPE_CHECKING:
+    from myclock.clock import MyClock
 
 # 設定ファイルを保存するディレクトリ
 CONFIG_DIR = ".myclock"
@@ -37,62 +45,22 @@ c.MyClock.time_format = "HH:mm:ss"
 c.MyClock.the_day_datetime = "2020-07-24 20:00:00+09:00"
 # カウントダウンの日時の名称.
 c.MyClock.the_day_title = "Tokyo Olympic"
+# 複数のカウントダウン. 指定した場合は the_day_datetime の代わりに、
+# まだ過ぎていないものを近い順に countdown_limit 件表示します.
+# c.MyClock.countdowns = [
+#     {"title": "Release 1.0", "datetime": "2030-04-01 10:00:00+09:00"},
+#     {"title": "Release 2.0", "datetime": "2031-04-01 10:00:00+09:00"},
+# ]
+# c.MyClock.countdown_limit = 5
 """
 
 
-class MyClock(Configurable):
-    """コンソールに各タイムゾーンの時刻と指定日へのカウントダウンを表示するクラス.
-
-    各タイムゾーンとカウントダウン用の指定日は外部ファイルから設定することができます.
-    外部設定ファイルはモジュールのインストール時にホームディレクトリの .myclock ディレクトリ以下に生成されます.
-    外部設定ファイルがない場合は内部のデフォルト値が使用されます.
-    モジュールをアンインストールしても設定ファイルは残ります.
-    """
-
-    # 設定値の初期値.
-    # 外部設定ファイル `~/.myclock/config.py` からも更新できます.
-    time_zones = List(["Asia/Tokyo"]).tag(config=True)
-    time_format = Unicode("YYYY-MM-DD HH:mm:ss ZZ").tag(config=True)
-    the_day_datetime = Unicode("2020-07-24 20:00:00+09:00").tag(config=True)
-    the_day_title = Unicode("Tokyo Olympic").tag(config=True)
-
-    def __init__(self) -> None:
-        """コンストラクタ.
-
-        - 外部設定ファイルが存在する場合は読込み、このクラスのプロパティを更新します.
-        """
-        p = Path.home() / ".myclock" / "config.py"
-        if p.exists():
-            # 設定ファイルが存在すれば読み込む.
-            loader = PyFileConfigLoader(str(p))
-            c = loader.load_config()
-            # 自身のパラメータを更新する.
-            self.update_config(c)
-
-    def show(self) -> None:
-        """ローカル時刻とカウントダウンを表示します."""
-        # 各ローカル時刻を表示
-        utc = arrow.utcnow()
-        for zone in self.time_zones:
-            s = utc.to(zone).format(self.time_format)
-            print(f"{zone.split('/')[1]}\t{s}".expandtabs(16))
-
-        # カウントダウンを表示
-        factory = arrow.ArrowFactory(CustomArrow)
-        custom = factory.utcnow()
-        delta = custom.till_the_day(arrow.get(self.the_day_datetime))
-        print(f"{self.the_day_title}\t{str(delta).split('.')[0]}")
-
-
-class CustomArrow(arrow.Arrow):
-    """カウントダウンのためのカスタム Arrow クラス."""
-
-    def till_the_day(self, dt: arrow) -> timedelta:
-        """指定日と現在日時との timedelta を返す.
-
-        :params dt: カウントダウンの対象となる指定日.
-        """
-        return dt - self
+def __getattr__(name: str) -> Any:
+    """MyClock と CustomArrow は traitlets と arrow を使うため、参照されたときに読み込みます."""
+    if name in ("MyClock", "CustomArrow"):
+        from myclock import clock
+        return getattr(clock, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def create_config() -> None:
@@ -119,6 +87,11 @@ def command() -> None:
     :Arguments:
 
         - -l, --loop: このオプションをつけた場合は表示を毎秒更新し続けます.
+        - -f, --format: 出力の形式. text(初期値), jsonl, csv.
+          jsonl と csv は UNIX 時間、各タイムゾーンの UTC オフセット(秒)、カウントダウンの残り時間(秒)を
+          一行一件で出力します. メトリクスの収集などに使います.
+        - -i, --interval: --loop で更新する間隔(秒). 初期値は 1 秒.
+        - --flush-interval: jsonl と csv の出力をまとめて書き出す間隔(秒). 初期値は 1 秒.
 
     :Example:
 
@@ -127,28 +100,121 @@ def command() -> None:
         London          08:14:17
         New_York        03:14:17
         Tokyo Olympic	770 days, 3:45:42
+        >>> myclock --format jsonl
+        {"epoch":1532330057.0,"offsets":{"Asia/Tokyo":32400,...},"countdowns":{"Tokyo Olympic":66542943.0}}
 
     """
     parser = argparse.ArgumentParser(
         prog="myclock", description="設定されたタイムゾーンの時刻を表示します.")
     parser.add_argument("-l", "--loop", help="毎秒表示し続けます.", action="store_true")
+    parser.add_argument("-f", "--format", help="出力の形式.", choices=("text", "jsonl", "csv"), default="text")
+    parser.add_argument("-i", "--interval", help="--loop で更新する間隔(秒).", type=float, default=1.0)
+    parser.add_argument("--flush-interval", help="jsonl と csv の出力をまとめて書き出す間隔(秒).",
+                        type=float, default=1.0)
     args = vars(parser.parse_args())
-    mc = MyClock()
+    if args["interval"] <= 0:
+        parser.error("--interval must be positive")
 
     if not args["loop"]:
         # 時刻を表示します.
-        mc.show()
+        config = load_config_dict(Path.home() / CONFIG_DIR / CONFIG_FILE)
+        if config is not None:
+            face = ClockFace.from_config(config.get("MyClock", {}))
+            if args["format"] == "text":
+                print("\n".join(face.lines()))
+            else:
+                stream(face, args["format"], None)
+            return
+        # 設定ファイルの実行結果を保存できない場合は traitlets で読み込む.
+        from myclock.clock import MyClock
+        if args["format"] == "text":
+            MyClock().show()
+        else:
+            stream(MyClock(), args["format"], None)
 
     else:
         # 毎秒表示を続けます.
-        while(True):
-            mc.show()
-            sleep(1)
-            sys.stdout.write("\033[F")  # back to previous line
-            sys.stdout.write("\033[K")  # clear line
-            for _ in mc.time_zones:
-                sys.stdout.write("\033[F")  # back to previous line
-                sys.stdout.write("\033[K")  # clear line
+        from myclock.clock import MyClock
+        if args["format"] == "text":
+            loop(MyClock(), args["interval"])
+        else:
+            stream(MyClock(), args["format"], args["interval"], args["flush_interval"])
+
+
+def loop(mc: "MyClock", interval: float = 1.0) -> None:
+    """表示を毎秒更新し続けます. Ctrl-C で終了します.
+
+    更新は時刻の秒の切り替わりに合わせ、変わった行だけを一度に書き換えます.
+    設定ファイルが変更された場合は、次の更新の前に読み込み直して反映します.
+
+    :param mc: 表示する MyClock.
+    :param interval: 更新する間隔(秒).
+    """
+    renderer = FrameRenderer()
+    out = sys.stdout
+    watcher = watch_file(mc.config_path)
+    out.write(HIDE_CURSOR)
+    try:
+        # 最初の表示も切り替わりの時刻で作る.
+        for now in ticks(interval, immediate=True):
+            if watcher.changed():
+                # 誤りがある場合は変更前の設定のまま表示を続ける.
+                mc.reload()
+            out.write(renderer.render(mc.lines(now)))
+            out.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        out.write(SHOW_CURSOR)
+        out.flush()
+
+
+def _interrupt(signum: int, frame: Any) -> None:
+    """SIGTERM を Ctrl-C と同じように扱います."""
+    raise KeyboardInterrupt
+
+
+def stream(mc: Union["MyClock", ClockFace], fmt: str, interval: Optional[float],
+           flush_interval: float = 1.0) -> None:
+    """時刻とカウントダウンの記録を一行一件で出力します. Ctrl-C で終了します.
+
+    interval を指定した場合は、時刻の秒の切り替わりに合わせて interval 秒ごとに出力し続けます.
+    MyClock を渡した場合は、設定ファイルが変更されたときに読み込み直して反映します.
+    SIGTERM で終了する場合も、バッファに貯めた記録を書き出してから終了します.
+
+    :param mc: 記録を作る MyClock または ClockFace.
+    :param fmt: 出力の形式. "jsonl" または "csv".
+    :param interval: 出力する間隔(秒). None の場合は一件だけ出力します.
+    :param flush_interval: 出力をまとめて書き出す間隔(秒).
+    """
+    from myclock.stream import RecordWriter, open_output
+
+    out = open_output()
+    writer = RecordWriter(out, fmt, flush_interval)
+    # ClockFace は設定ファイルを読み込み直せないため監視しない.
+    watcher = None if interval is None or isinstance(mc, ClockFace) else watch_file(mc.config_path)
+    if interval is not None:
+        signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        if interval is None:
+            writer.write(mc.record())
+        else:
+            for now in ticks(interval):
+                if watcher is not None and watcher.changed():
+                    mc.reload()
+                writer.write(mc.record(now))
+        writer.flush()
+    except KeyboardInterrupt:
+        writer.flush()
+    except BrokenPipeError:
+        # 出力先のパイプが閉じられた場合は、残りの出力を捨てて終了する.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        if watcher is not None:
+            watcher.close()
+        if out is not sys.stdout:
+            out.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""複数のカウントダウンを管理するモジュールです.
+
+カウントダウンの日時は最初に一度だけ UNIX 時間に変換し、日時の順に並べておきます.
+毎秒の更新では、過ぎたカウントダウンを二分探索で読み飛ばし、次の N 件との差を計算するだけです.
+
+- CountdownIndex class: カウントダウンを日時の順に並べて保持するクラス.
+- parse_datetime function: カウントダウンの日時の文字列を解釈する関数.
+- parse_countdowns function: 設定ファイルのカウントダウンのリストを解釈する関数.
+- format_delta function: 残り時間を str(timedelta) と同じ形式の文字列にする関数.
+"""
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator, List, Tuple
+
+# (UNIX 時間, 名称)
+Countdown = Tuple[float, str]
+
+
+def parse_datetime(s: str) -> datetime:
+    """カウントダウンの日時の文字列を解釈します.
+
+    ISO 8601 の形式でない場合は arrow.get で解釈します. タイムゾーンがない場合は UTC とみなします.
+
+    :param s: 日時の文字列. 例) 2020-07-24 20:00:00+09:00
+    :return: タイムゾーン付きの datetime.
+    """
+    try:
+        dt = datetime.fromisoformat(s)
+    except ValueError:
+        import arrow
+        return arrow.get(s).datetime
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+
+def parse_countdowns(countdowns: Iterable[Any]) -> List[Countdown]:
+    """設定ファイルのカウントダウンのリストを (UNIX 時間, 名称) のリストにします.
+
+    各要素は {"title": 名称, "datetime": 日時} の辞書か、(名称, 日時) のリストで指定します.
+
+    :param countdowns: カウントダウンのリスト.
+    :return: (UNIX 時間, 名称) のリスト.
+    :raises ValueError: 要素の形式や日時の文字列が正しくない場合.
+    """
+    ret = []
+    for item in countdowns:
+        if isinstance(item, dict):
+            title, value = item.get("title"), item.get("datetime")
+        elif isinstance(item, (list, tuple)) and len(item) == 2:
+            title, value = item
+        else:
+            raise ValueError(f"Invalid countdown: {item!r}")
+        if not isinstance(title, str) or not isinstance(value, str):
+            raise ValueError(f"Invalid countdown: {item!r}")
+        ret.append((parse_datetime(value).timestamp(), title))
+    return ret
+
+
+def format_delta(seconds: float) -> str:
+    """残り時間を str(timedelta(seconds=seconds)) の秒未満を除いた形式にします.
+
+    :param seconds: 残り時間(秒).
+    :return: 例) "770 days, 3:45:42"
+    """
+    total = round(seconds * 1000000) // 1000000
+    days, rem = divmod(total, 86400)
+    hours, rem = divmod(rem, 3600)
+    minutes, secs = divmod(rem, 60)
+    hms = f"{hours}:{minutes:02d}:{secs:02d}"
+    if days:
+        return f"{days} day{'' if abs(days) == 1 else 's'}, {hms}"
+    return hms
+
+
+class CountdownIndex:
+    """カウントダウンを日時の順に並べて保持するクラス.
+
+    :Example:
+
+        >>> index = CountdownIndex([(200.0, "B"), (100.0, "A")])
+        >>> index.upcoming(150.0, 5)
+        [(200.0, 'B')]
+    """
+
+    def __init__(self, countdowns: Iterable[Countdown]) -> None:
+        """コンストラクタ.
+
+        :param countdowns: (UNIX 時間, 名称) のリスト.
+        """
+        self._events = sorted(countdowns, key=lambda c: c[0])
+        self._epochs = [c[0] for c in self._events]
+        # まだ過ぎていない最初のカウントダウンの位置と、その位置を求めた時刻.
+        self._start = 0
+        self._now = float("-inf")
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __iter__(self) -> Iterator[Countdown]:
+        return iter(self._events)
+
+    def upcoming(self, now: float, n: int) -> List[Countdown]:
+        """now より後のカウントダウンを近い順に n 件返します.
+
+        :param now: 現在時刻の UNIX 時間.
+        :param n: 返す件数の上限.
+        :return: (UNIX 時間, 名称) のリスト.
+        """
+        # 過ぎたカウントダウンを読み飛ばす. 時刻が戻った場合は先頭から探し直す.
+        lo = self._start if now >= self._now else 0
+        self._start = bisect_right(self._epochs, now, lo)
+        self._now = now
+        return self._events[self._start:self._start + n]
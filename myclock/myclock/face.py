@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""表示する行を作るためのモジュールです.
+
+ClockFace は設定値から各タイムゾーンの時刻とカウントダウンの行を作ります.
+traitlets と arrow を読み込まずに使えるため、一回だけ表示する myclock コマンドで使います.
+"""
+import time
+from typing import Any, Dict, List, Optional
+
+from myclock.countdown import CountdownIndex, format_delta, parse_countdowns, parse_datetime
+from myclock.formatter import compile_format
+from myclock.zones import ZoneOffset
+
+# 設定値の初期値.
+DEFAULT_TIME_ZONES = ["Asia/Tokyo"]
+DEFAULT_TIME_FORMAT = "YYYY-MM-DD HH:mm:ss ZZ"
+DEFAULT_THE_DAY_DATETIME = "2020-07-24 20:00:00+09:00"
+DEFAULT_THE_DAY_TITLE = "Tokyo Olympic"
+DEFAULT_COUNTDOWN_LIMIT = 5
+
+
+class ClockFace:
+    """各タイムゾーンの時刻と指定日へのカウントダウンの行を作るクラス.
+
+    タイムゾーンと書式、カウントダウンの日時の解釈はコンストラクタで一度だけ行います.
+
+    countdowns を指定した場合は、まだ過ぎていないカウントダウンを近い順に countdown_limit 件表示します.
+    指定しない場合は、従来どおり the_day_datetime へのカウントダウンを表示します.
+    """
+
+    def __init__(self, time_zones: Optional[List[str]] = None, time_format: str = DEFAULT_TIME_FORMAT,
+                 the_day_datetime: str = DEFAULT_THE_DAY_DATETIME,
+                 the_day_title: str = DEFAULT_THE_DAY_TITLE,
+                 countdowns: Optional[List[Any]] = None,
+                 countdown_limit: int = DEFAULT_COUNTDOWN_LIMIT) -> None:
+        """コンストラクタ.
+
+        :param time_zones: 表示するタイムゾーンのリスト.
+        :param time_format: 日時の書式.
+        :param the_day_datetime: カウントダウンを行う日時.
+        :param the_day_title: カウントダウンの日時の名称.
+        :param countdowns: 複数のカウントダウン. {"title": 名称, "datetime": 日時} のリスト.
+        :param countdown_limit: countdowns のうち表示する件数の上限.
+        """
+        if time_zones is None:
+            time_zones = DEFAULT_TIME_ZONES
+        # Asia 等は省いて表示する.
+        self.zones = [(zone.split('/')[1], ZoneOffset(zone)) for zone in time_zones]
+        self.format = compile_format(time_format)
+        self.the_day_timestamp = parse_datetime(the_day_datetime).timestamp()
+        self.the_day_title = the_day_title
+        self.countdowns = CountdownIndex(parse_countdowns(countdowns or []))
+        self.countdown_limit = countdown_limit
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ClockFace":
+        """設定ファイルの MyClock の設定値から作ります. 不明な設定値は無視します.
+
+        :param config: 設定値の名前 -> 値 の辞書.
+        :return: ClockFace.
+        """
+        names = ("time_zones", "time_format", "the_day_datetime", "the_day_title",
+                 "countdowns", "countdown_limit")
+        return cls(**{k: v for k, v in config.items() if k in names})
+
+    def lines(self, now: Optional[float] = None) -> List[str]:
+        """表示する行のリストを返します.
+
+        :param now: 表示する時刻の UNIX 時間. 省略した場合は現在時刻を使います.
+        :return: 各ローカル時刻とカウントダウンの行のリスト.
+        """
+        if now is None:
+            now = time.time()
+        # 各ローカル時刻
+        ret = []
+        for label, zone in self.zones:
+            offset, tzname = zone.lookup(now)
+            ret.append(f"{label}\t{self.format.format(now, offset, tzname)}".expandtabs(16))
+
+        # カウントダウン
+        if not self.countdowns:
+            ret.append(f"{self.the_day_title}\t{format_delta(self.the_day_timestamp - now)}")
+        for timestamp, title in self.countdowns.upcoming(now, self.countdown_limit):
+            ret.append(f"{title}\t{format_delta(timestamp - now)}")
+        return ret
+
+    def record(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """機械処理用の記録を返します. myclock --format jsonl|csv で使います.
+
+        カウントダウンは過ぎたものも含め、設定された全てを返します. (過ぎたものは負の値になります.)
+
+        :param now: 記録する時刻の UNIX 時間. 省略した場合は現在時刻を使います.
+        :return: {"epoch": UNIX 時間, "offsets": {タイムゾーン名: UTC オフセット(秒)},
+                  "countdowns": {名称: 残り時間(秒)}}
+        """
+        if now is None:
+            now = time.time()
+        now = round(now, 6)
+        if self.countdowns:
+            countdowns = {title: round(timestamp - now, 6) for timestamp, title in self.countdowns}
+        else:
+            countdowns = {self.the_day_title: round(self.the_day_timestamp - now, 6)}
+        return {
+            "epoch": now,
+            "offsets": {zone.zone: zone.lookup(now)[0] for _, zone in self.zones},
+            "countdowns": countdowns,
+        }
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""時刻を time_format の書式で整形するためのモジュールです.
+
+mtools.clock_util の formatter モジュールで書式を一度だけ解釈し、キャッシュして整形します.
+arrow は月や曜日の名称を使う書式の場合だけ読み込みます.
+"""
+from mtools.clock_util.formatter import CompiledFormat, compile_format
+
+__all__ = ["CompiledFormat", "compile_format"]
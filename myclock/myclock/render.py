@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""myclock --loop の表示を更新するためのモジュールです.
+
+- FrameRenderer class: 前回の表示との差分だけを書き換える文字列を作るクラス.
+- ticks function: 毎秒の更新のタイミングを、時刻の秒の切り替わりに合わせて返すジェネレータ.
+"""
+import math
+import time
+from typing import Iterator, List, Optional
+
+# カーソルを非表示・表示にするエスケープシーケンス.
+HIDE_CURSOR = "\033[?25l"
+SHOW_CURSOR = "\033[?25h"
+
+
+class FrameRenderer:
+    """一画面分の行のリストを受け取り、端末に書き込む文字列を作るクラス.
+
+    二回目以降はカーソルを一度だけ画面の先頭に戻し、変わった行だけを書き換えます.
+    """
+
+    def __init__(self) -> None:
+        """コンストラクタ."""
+        self.previous: Optional[List[str]] = None
+
+    def render(self, lines: List[str]) -> str:
+        """端末に書き込む文字列を返します.
+
+        :param lines: 表示する行のリスト.
+        :return: 端末に一度に書き込む文字列.
+        """
+        prev = self.previous
+        self.previous = list(lines)
+        if not prev:
+            return "".join(line + "\n" for line in lines)
+
+        # 前回の表示の先頭の行に戻る.
+        buf = [f"\033[{len(prev)}F"]
+        for i, line in enumerate(lines):
+            if i < len(prev) and prev[i] == line:
+                # 変わっていない行は書き換えずに次の行に移る.
+                buf.append("\n")
+            else:
+                buf.append(f"\033[K{line}\n")
+        if len(lines) < len(prev):
+            # 行数が減った場合は残りの行を消す.
+            buf.append("\033[J")
+        return "".join(buf)
+
+
+def ticks(interval: float = 1.0, immediate: bool = False) -> Iterator[float]:
+    """時刻の秒の切り替わりに合わせて、interval 秒ごとに値を返すジェネレータ.
+
+    待ち時間は単調増加する時計(time.monotonic)で計算するため、
+    表示にかかった時間や時刻の変更によって更新のタイミングがずれません.
+    処理が遅れて更新のタイミングを過ぎた場合は、過ぎた分を飛ばします.
+
+    :param interval: 更新の間隔(秒).
+    :param immediate: True の場合は、最初に待たずに直前の切り替わりの時刻を返します.
+        最初の表示も以降の更新と同じく切り替わりの時刻で作るため、同じ表示が二回続きません.
+    :return: 更新のタイミングの time.time() の値.
+    """
+    now = time.time()
+    # 直前の秒の切り替わり.
+    wall = math.floor(now / interval) * interval
+    target = time.monotonic() + (wall - now)
+    if immediate:
+        yield wall
+    while True:
+        target += interval
+        wall += interval
+        behind = time.monotonic() - target
+        if behind > 0:
+            skipped = math.ceil(behind / interval)
+            target += skipped * interval
+            wall += skipped * interval
+        delay = target - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        yield wall
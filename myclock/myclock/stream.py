@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""myclock --format jsonl|csv の出力を書き込むためのモジュールです.
+
+時刻とカウントダウンを、端末用の表示ではなく一行一件の記録として書き込みます.
+記録はバッファに貯めておき、flush_interval 秒ごとにまとめて書き出します.
+エスケープシーケンスは出力しません.
+
+- RecordWriter class: ClockFace.record の記録を JSON Lines または CSV で書き込むクラス.
+- open_output function: 標準出力をバッファ付きで開き直す関数.
+"""
+import csv
+import json
+import sys
+import time
+from typing import IO, Any, Dict, Optional, Tuple
+
+# 出力の形式.
+FORMATS = ("jsonl", "csv")
+# 出力をまとめて書き出す間隔(秒).
+DEFAULT_FLUSH_INTERVAL = 1.0
+# 出力のバッファのサイズ(バイト).
+BUFFER_SIZE = 65536
+
+
+def open_output(out: Optional[IO[str]] = None) -> IO[str]:
+    """出力先をバッファ付きで開き直します.
+
+    sys.stdout は端末に接続されている場合に一行ごとに書き出すため、同じファイル記述子を
+    BUFFER_SIZE のバッファで開き直します. ファイル記述子がない場合はそのまま返します.
+
+    :param out: 出力先. 省略した場合は sys.stdout.
+    :return: 出力先. 閉じても元のファイル記述子は閉じません.
+    """
+    if out is None:
+        out = sys.stdout
+    try:
+        fd = out.fileno()
+    except (AttributeError, OSError, ValueError):
+        # StringIO などファイル記述子がない場合.
+        return out
+    out.flush()
+    return open(fd, "w", buffering=BUFFER_SIZE, encoding="utf-8", newline="", closefd=False)
+
+
+class RecordWriter:
+    """ClockFace.record の記録を一行一件で書き込むクラス.
+
+    - jsonl: {"epoch":...,"offsets":{...},"countdowns":{...}} を一行に書き込みます.
+    - csv: epoch, offset:<タイムゾーン名>..., countdown:<名称>... の列で書き込みます.
+      列が変わった場合(設定ファイルを変更した場合など)は、ヘッダーを書き込み直します.
+
+    :Example:
+
+        >>> import io
+        >>> out = io.StringIO()
+        >>> writer = RecordWriter(out, "csv")
+        >>> writer.write({"epoch": 0.0, "offsets": {"Asia/Tokyo": 32400}, "countdowns": {"A": 10.0}})
+        >>> out.getvalue()
+        'epoch,offset:Asia/Tokyo,countdown:A\\n0.0,32400,10.0\\n'
+    """
+
+    def __init__(self, out: IO[str], fmt: str = "jsonl",
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL) -> None:
+        """コンストラクタ.
+
+        :param out: 出力先.
+        :param fmt: 出力の形式. "jsonl" または "csv".
+        :param flush_interval: 出力をまとめて書き出す間隔(秒). 0 の場合は一件ごとに書き出します.
+        :raises ValueError: 出力の形式が正しくない場合.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format: {fmt}")
+        self.out = out
+        self.fmt = fmt
+        self.flush_interval = flush_interval
+        self._encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        self._csv = csv.writer(out, lineterminator="\n")
+        self._columns: Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]] = None
+        self._flushed = time.monotonic()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """記録を一件書き込みます. 前回書き出してから flush_interval 秒を過ぎていれば書き出します.
+
+        :param record: ClockFace.record の記録.
+        """
+        if self.fmt == "jsonl":
+            self.out.write(self._encoder.encode(record) + "\n")
+        else:
+            self._write_csv(record)
+        if time.monotonic() - self._flushed >= self.flush_interval:
+            self.flush()
+
+    def _write_csv(self, record: Dict[str, Any]) -> None:
+        """記録を CSV の一行で書き込みます."""
+        offsets, countdowns = record["offsets"], record["countdowns"]
+        columns = (tuple(offsets), tuple(countdowns))
+        if columns != self._columns:
+            self._columns = columns
+            self._csv.writerow(["epoch"] + [f"offset:{k}" for k in columns[0]]
+                               + [f"countdown:{k}" for k in columns[1]])
+        self._csv.writerow([record["epoch"], *offsets.values(), *countdowns.values()])
+
+    def flush(self) -> None:
+        """バッファに貯めた記録を書き出します."""
+        self.out.flush()
+        self._flushed = time.monotonic()
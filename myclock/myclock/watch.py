@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""設定ファイルの変更を監視するモジュールです.
+
+myclock --loop の実行中に設定ファイルが変更されたことを知るために使います.
+監視はバックグラウンドのスレッドで行い、変更があった場合はフラグを立てます.
+毎秒の更新ではフラグを確認するだけなので、ファイルシステムにはアクセスしません.
+
+- InotifyWatcher class: Linux の inotify で変更を待つクラス.
+- PollingWatcher class: 一定の間隔でファイルの状態(os.stat)を確認するクラス. inotify が使えない環境で使います.
+- watch_file function: 使える方のクラスで監視を始める関数.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+
+# PollingWatcher がファイルの状態を確認する間隔(秒).
+POLL_INTERVAL = 5.0
+
+# inotify の定数. <sys/inotify.h> を参照.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_CLOEXEC = 0o2000000
+# 監視するイベント. エディタはファイルを置き換えて保存することがあるため、ディレクトリを監視する.
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+# struct inotify_event の name より前の部分.
+_EVENT = struct.Struct("iIII")
+
+
+class Watcher:
+    """ファイルの変更を監視するクラスの基底クラス."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """コンストラクタ.
+
+        :param path: 監視するファイルのパス.
+        """
+        self.path = Path(path)
+        self._changed = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "Watcher":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def start(self) -> "Watcher":
+        """バックグラウンドのスレッドで監視を始めます."""
+        self._thread = threading.Thread(target=self._run, name=f"watch-{self.path.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def changed(self) -> bool:
+        """前回の呼び出しから変更があったかどうかを返します. ファイルシステムにはアクセスしません."""
+        if not self._changed.is_set():
+            return False
+        self._changed.clear()
+        return True
+
+    def close(self) -> None:
+        """監視を終了します."""
+        self._stop.set()
+
+    def _run(self) -> None:
+        raise NotImplementedError
+
+
+class InotifyWatcher(Watcher):
+    """inotify でファイルの変更を待つクラス. Linux でのみ使えます."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """コンストラクタ.
+
+        :param path: 監視するファイルのパス. ファイルがあるディレクトリは存在している必要があります.
+        :raises OSError: inotify が使えない場合.
+        """
+        super().__init__(path)
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = libc.inotify_init1(IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        directory = str(self.path.parent).encode()
+        if libc.inotify_add_watch(self._fd, directory, WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, os.strerror(errno), str(self.path.parent))
+        # close() でスレッドを起こすためのパイプ.
+        self._wake_r, self._wake_w = os.pipe()
+
+    def _run(self) -> None:
+        name = self.path.name.encode()
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([self._fd, self._wake_r], [], [])
+                if self._fd not in ready:
+                    continue
+                buf = os.read(self._fd, 4096)
+                offset = 0
+                while offset + _EVENT.size <= len(buf):
+                    _, _, _, length = _EVENT.unpack_from(buf, offset)
+                    start = offset + _EVENT.size
+                    if buf[start:start + length].rstrip(b"\0") == name:
+                        self._changed.set()
+                    offset = start + length
+        finally:
+            for fd in (self._fd, self._wake_r, self._wake_w):
+                os.close(fd)
+
+    def close(self) -> None:
+        """監視を終了します."""
+        if not self._stop.is_set():
+            super().close()
+            if self._thread is not None:
+                try:
+                    os.write(self._wake_w, b"\0")
+                except OSError:
+                    # スレッドが既に終了している.
+                    pass
+            else:
+                for fd in (self._fd, self._wake_r, self._wake_w):
+                    os.close(fd)
+
+
+class PollingWatcher(Watcher):
+    """一定の間隔でファイルの状態を確認し、変更を検出するクラス."""
+
+    def __init__(self, path: Union[str, Path], interval: float = POLL_INTERVAL) -> None:
+        """コンストラクタ.
+
+        :param path: 監視するファイルのパス.
+        :param interval: ファイルの状態を確認する間隔(秒).
+        """
+        super().__init__(path)
+        self.interval = interval
+        self._state = self._stat()
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        """ファイルの (i-node 番号, 更新日時, サイズ) を返します. ファイルがない場合は None."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            state = self._stat()
+            if state != self._state:
+                self._state = state
+                self._changed.set()
+
+
+def watch_file(path: Union[str, Path], interval: float = POLL_INTERVAL) -> Watcher:
+    """ファイルの監視を始めます.
+
+    inotify が使える場合は InotifyWatcher を、使えない場合は PollingWatcher を使います.
+
+    :param path: 監視するファイルのパス.
+    :param interval: PollingWatcher がファイルの状態を確認する間隔(秒).
+    :return: 監視を始めた Watcher.
+    """
+    try:
+        watcher: Watcher = InotifyWatcher(path)
+    except (OSError, AttributeError, TypeError):
+        # inotify が使えない環境では、ファイルの状態を一定の間隔で確認する.
+        watcher = PollingWatcher(path, interval)
+    return watcher.start()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""タイムゾーンの UTC オフセットを、次の切り替わりの時刻までキャッシュするモジュールです.
+
+UTC オフセットが変わるのは夏時間の開始・終了などの切り替わりの時刻だけです.
+ZoneOffset は現在のオフセットと次の切り替わりの時刻を覚えておき、
+切り替わりを過ぎるまではタイムゾーンのデータベースを参照せずにオフセットを返します.
+切り替わりの時刻は mtools.clock_util.transitions で探します.
+"""
+from datetime import tzinfo
+from typing import Tuple
+
+from dateutil import tz as dateutil_tz
+from mtools.clock_util.transitions import SEARCH_STEP, next_transition, probe
+
+# 次の切り替わりを探す期間(秒). 見つからない場合はこの期間だけキャッシュし、期間を過ぎたら続きを探します.
+# 一回だけ表示する場合に、使わない先の期間まで探さないように短くしています.
+SEARCH_SECONDS = SEARCH_STEP
+
+
+def parse_zone(zone: str) -> tzinfo:
+    """タイムゾーン名を tzinfo に変換します.
+
+    "Asia/Tokyo" のような名前は dateutil で変換します. それ以外の "local" や "+09:00" などは
+    arrow.Arrow.to と同じように解釈するため、arrow を読み込んで変換します.
+
+    :param zone: タイムゾーン名.
+    :return: tzinfo.
+    """
+    if "/" in zone:
+        tz = dateutil_tz.gettz(zone)
+        if tz is not None:
+            return tz
+    from arrow.parser import TzinfoParser
+    return TzinfoParser.parse(zone)
+
+
+class ZoneOffset:
+    """一つのタイムゾーンの UTC オフセットのキャッシュ.
+
+    :Example:
+
+        >>> zone = ZoneOffset("Asia/Tokyo")
+        >>> zone.lookup(1600000000)
+        (32400, 'JST')
+    """
+
+    def __init__(self, zone: str) -> None:
+        """コンストラクタ.
+
+        :param zone: タイムゾーン名. arrow.Arrow.to と同じ形式で指定します.
+        """
+        self.zone = zone
+        self.tzinfo = parse_zone(zone)
+        self.offset = 0
+        self.tzname = ""
+        # キャッシュが有効な期間 [valid_from, valid_until).
+        self.valid_from = 0.0
+        self.valid_until = 0.0
+
+    def lookup(self, timestamp: float) -> Tuple[int, str]:
+        """UNIX 時間における UTC オフセット(秒)とタイムゾーン名を返します.
+
+        :param timestamp: UNIX 時間(秒).
+        :return: (UTC オフセット(秒), タイムゾーン名)
+        """
+        if not self.valid_from <= timestamp < self.valid_until:
+            self._update(timestamp)
+        return self.offset, self.tzname
+
+    def _update(self, timestamp: float) -> None:
+        """timestamp のオフセットを求め、次の切り替わりの時刻を探します."""
+        current = probe(self.tzinfo, timestamp)
+        self.offset, self.tzname = current
+        self.valid_from = timestamp
+        transition = next_transition(self.tzinfo, timestamp, timestamp + SEARCH_SECONDS, current)
+        self.valid_until = timestamp + SEARCH_SECONDS if transition is None else transition
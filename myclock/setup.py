@@ -9,7 +9,12 @@ setup(
     packages=find_packages(),
     install_requires=[
         "traitlets",
-        "arrow"],
+        "arrow",
+        "python-dateutil",
+        # 時刻の書式の解釈をキャッシュする. microlib_tools/microlibs/clock_util_module からインストールします.
+        "mtools_clock_util",
+        # 設定ファイルの実行結果をキャッシュする. microlib_tools/microlibs/config_util_module からインストールします.
+        "mtools_config_util"],
     # myclock コマンドはここで設定.
     entry_points={
         'console_scripts': ['myclock=myclock.command:command']}
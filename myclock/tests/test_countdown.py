@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from unittest import TestCase
+
+from nose.tools import eq_, ok_, raises
+
+from myclock.countdown import CountdownIndex, format_delta, parse_countdowns, parse_datetime
+from myclock.face import ClockFace
+
+COUNTDOWNS = [
+    {"title": "C", "datetime": "1970-01-01 00:05:00+00:00"},
+    {"title": "A", "datetime": "1970-01-01 00:01:00+00:00"},
+    ["B", "1970-01-01T00:02:00Z"],
+    ("D", "1970-01-01 09:10:00+09:00"),
+]
+
+
+class ParseTestCase(TestCase):
+    """Test case for parse_datetime and parse_countdowns."""
+
+    def test_datetime(self) -> None:
+        """Test that ISO 8601 strings are parsed and naive ones are treated as UTC."""
+        eq_(parse_datetime("2020-07-24 20:00:00+09:00").timestamp(), 1595588400)
+        eq_(parse_datetime("2020-07-24 11:00:00"), datetime(2020, 7, 24, 11, tzinfo=timezone.utc))
+
+    def test_arrow(self) -> None:
+        """Test that other formats are parsed by arrow."""
+        eq_(parse_datetime("2020-07-24T11:00:00.000+0000").timestamp(), 1595588400)
+
+    def test_countdowns(self) -> None:
+        """Test that dicts and pairs are parsed into (timestamp, title)."""
+        eq_(parse_countdowns(COUNTDOWNS), [(300.0, "C"), (60.0, "A"), (120.0, "B"), (600.0, "D")])
+
+    def test_invalid(self) -> None:
+        """Test that invalid countdowns are rejected."""
+        for item in ({"title": "A"}, ["A"], ("A", "B", "C"), "A", {"title": 1, "datetime": "2020-01-01"},
+                     {"title": "A", "datetime": "not a date"}):
+            try:
+                parse_countdowns([item])
+            except ValueError:
+                continue
+            raise AssertionError(f"accepted: {item!r}")
+
+
+class FormatDeltaTestCase(TestCase):
+    """Test case for format_delta."""
+
+    def test_format(self) -> None:
+        """Test examples of the format."""
+        eq_(format_delta(0), "0:00:00")
+        eq_(format_delta(86400), "1 day, 0:00:00")
+        eq_(format_delta(66541542.9), "770 days, 3:45:42")
+        eq_(format_delta(-1.5), "-1 day, 23:59:58")
+
+    def test_timedelta(self) -> None:
+        """Test that the result equals str(timedelta) without the fraction of a second."""
+        rng = random.Random(0)
+        for _ in range(1000):
+            seconds = rng.uniform(-1e8, 1e8)
+            eq_(format_delta(seconds), str(timedelta(seconds=math.floor(seconds))), seconds)
+
+
+class CountdownIndexTestCase(TestCase):
+    """Test case for CountdownIndex."""
+
+    def setUp(self) -> None:
+        """Create an index of the countdowns."""
+        self.index = CountdownIndex(parse_countdowns(COUNTDOWNS))
+
+    def test_sorted(self) -> None:
+        """Test that the countdowns are kept in order of time."""
+        eq_(len(self.index), 4)
+        eq_([title for _, title in self.index], ["A", "B", "C", "D"])
+        ok_(not CountdownIndex([]))
+
+    def test_upcoming(self) -> None:
+        """Test that the next n countdowns after now are returned."""
+        eq_(self.index.upcoming(0, 2), [(60.0, "A"), (120.0, "B")])
+        # ちょうどの時刻のカウントダウンは過ぎたとみなす.
+        eq_(self.index.upcoming(60, 2), [(120.0, "B"), (300.0, "C")])
+        eq_(self.index.upcoming(500, 5), [(600.0, "D")])
+        eq_(self.index.upcoming(600, 5), [])
+
+    def test_backwards(self) -> None:
+        """Test that countdowns come back when the time goes backwards."""
+        eq_(self.index.upcoming(400, 1), [(600.0, "D")])
+        eq_(self.index.upcoming(30, 1), [(60.0, "A")])
+
+    def test_bisect(self) -> None:
+        """Test random times against a linear search."""
+        rng = random.Random(0)
+        events = [(rng.uniform(0, 1000), str(i)) for i in range(100)]
+        index = CountdownIndex(events)
+        now = 0.0
+        for _ in range(1000):
+            now += rng.uniform(-20, 30)
+            expected = sorted(e for e in events if e[0] > now)[:3]
+            eq_(index.upcoming(now, 3), expected, now)
+
+
+class ClockFaceCountdownTestCase(TestCase):
+    """Test case for ClockFace with countdowns."""
+
+    def test_lines(self) -> None:
+        """Test that up to countdown_limit upcoming countdowns are shown instead of the day."""
+        face = ClockFace(["Etc/UTC"], "HH:mm:ss", countdowns=COUNTDOWNS, countdown_limit=2)
+        eq_(face.lines(90)[1:], ["B\t0:00:30", "C\t0:03:30"])
+        eq_(face.lines(700)[1:], [])
+
+    def test_the_day(self) -> None:
+        """Test that the day is shown without countdowns."""
+        face = ClockFace(["Etc/UTC"], "HH:mm:ss", "1970-01-02 00:00:00+00:00", "T")
+        eq_(face.lines(0)[1:], ["T\t1 day, 0:00:00"])
+
+    def test_record(self) -> None:
+        """Test that every countdown, including passed ones, is recorded."""
+        face = ClockFace(["Etc/UTC"], "HH:mm:ss", countdowns=COUNTDOWNS, countdown_limit=1)
+        eq_(face.record(90.5)["countdowns"], {"A": -30.5, "B": 29.5, "C": 209.5, "D": 509.5})
+
+    @raises(ValueError)
+    def test_invalid(self) -> None:
+        """Test that an invalid countdown is rejected when the face is created."""
+        ClockFace(["Etc/UTC"], countdowns=[{"title": "A"}])
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import tempfile
+from itertools import islice
+from unittest import TestCase
+from unittest.mock import patch
+
+from nose.tools import eq_, ok_
+
+from myclock import command, render
+from myclock.face import ClockFace
+from myclock.render import FrameRenderer, ticks
+
+
+class FakeClock:
+    """time.time, time.monotonic, time.sleep の代わり. sleep すると両方の時計が進みます."""
+
+    def __init__(self, now: float) -> None:
+        self.now = now
+        self.slept = []
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now + 1000.0
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(round(seconds, 6))
+        self.now += seconds
+
+    def patch(self):
+        return patch.multiple(render.time, time=self.time, monotonic=self.monotonic, sleep=self.sleep)
+
+
+class TicksTestCase(TestCase):
+    """Test case for ticks."""
+
+    def test_aligned(self) -> None:
+        """Test that ticks wait for the next second."""
+        clock = FakeClock(12.3)
+        with clock.patch():
+            eq_(list(islice(ticks(1.0), 3)), [13.0, 14.0, 15.0])
+        eq_(clock.slept, [0.7, 1.0, 1.0])
+
+    def test_immediate(self) -> None:
+        """Test that the first value is the previous second, without waiting."""
+        clock = FakeClock(12.3)
+        with clock.patch():
+            it = ticks(1.0, immediate=True)
+            eq_(next(it), 12.0)
+            eq_(clock.slept, [])
+            eq_(list(islice(it, 2)), [13.0, 14.0])
+
+    def test_interval(self) -> None:
+        """Test that ticks are aligned to multiples of the interval."""
+        clock = FakeClock(12.3)
+        with clock.patch():
+            eq_(list(islice(ticks(5.0, immediate=True), 3)), [10.0, 15.0, 20.0])
+
+    def test_skip(self) -> None:
+        """Test that ticks that have already passed are skipped."""
+        clock = FakeClock(12.3)
+        with clock.patch():
+            it = ticks(1.0)
+            eq_(next(it), 13.0)
+            clock.now += 2.5
+            eq_(next(it), 16.0)
+
+
+class FrameRendererTestCase(TestCase):
+    """Test case for FrameRenderer."""
+
+    def test_render(self) -> None:
+        """Test that only changed lines are rewritten."""
+        renderer = FrameRenderer()
+        eq_(renderer.render(["a", "b"]), "a\nb\n")
+        eq_(renderer.render(["a", "c"]), "\033[2F\n\033[Kc\n")
+        eq_(renderer.render(["a"]), "\033[2F\n\033[J")
+
+
+class LoopTestCase(TestCase):
+    """Test case for loop."""
+
+    def test_first_frame(self) -> None:
+        """Test that the countdown does not repeat between the first and second frames."""
+        face = ClockFace(["Etc/UTC"], "HH:mm:ss",
+                         countdowns=[{"title": "T", "datetime": "1970-01-01 00:01:40+00:00"}])
+        frames = []
+
+        class FakeClockApp:
+            config_path = os.path.join(tempfile.gettempdir(), "myclock-test-config.py")
+
+            def lines(self, now=None):
+                if len(frames) == 3:
+                    raise KeyboardInterrupt
+                frames.append(face.lines(now))
+                return frames[-1]
+
+            def reload(self) -> bool:
+                return True
+
+        clock = FakeClock(12.3)
+        with clock.patch(), patch.object(command.sys, "stdout", io.StringIO()):
+            command.loop(FakeClockApp())
+        eq_(len(frames), 3)
+        eq_(len({tuple(frame) for frame in frames}), 3)
+        ok_(frames[0][0].endswith("00:00:12"))
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from nose.tools import eq_, ok_
+
+# myclock のディレクトリ.
+ROOT = Path(__file__).resolve().parent.parent
+MICROLIBS = ROOT.parent / "microlib_tools" / "microlibs"
+# 一回だけ表示する myclock コマンドで読み込んではいけないモジュール.
+HEAVY_MODULES = ["traitlets", "arrow"]
+# myclock コマンドを実行し、読み込まれたモジュールの一覧を標準エラー出力の最後の行に書き出すスクリプト.
+SCRIPT = """
+import json, sys
+from myclock.command import command, create_config
+if sys.argv[1] == "create":
+    create_config()
+sys.argv = ["myclock"] + sys.argv[2:]
+command()
+sys.stderr.write("\\n" + json.dumps(sorted(sys.modules)))
+"""
+
+
+class StartupTestCase(TestCase):
+    """Test case for the modules loaded by a one-shot myclock command."""
+
+    def setUp(self) -> None:
+        """Use a temporary directory as the home directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def run_myclock(self, *args: str, create: bool = False):
+        """myclock コマンドを別のプロセスで実行し、(標準出力, 読み込まれたモジュールの一覧) を返します."""
+        env = dict(os.environ, HOME=self.tmp.name, XDG_CACHE_HOME=os.path.join(self.tmp.name, ".cache"))
+        paths = [ROOT, MICROLIBS / "clock_util_module", MICROLIBS / "config_util_module"]
+        env["PYTHONPATH"] = os.pathsep.join([str(p) for p in paths] + [env.get("PYTHONPATH", "")])
+        ret = subprocess.run([sys.executable, "-c", SCRIPT, "create" if create else "-"] + list(args),
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+                             env=env, check=True)
+        return ret.stdout, json.loads(ret.stderr.splitlines()[-1])
+
+    def test_first_run(self) -> None:
+        """Test that the first run executes the config file with traitlets."""
+        out, modules = self.run_myclock(create=True)
+        eq_(len(out.splitlines()), 4)
+        ok_("traitlets" in modules)
+
+    def test_no_heavy_imports(self) -> None:
+        """Test that later runs show the clock without traitlets and arrow."""
+        self.run_myclock(create=True)
+        for args in ((), ("--format", "jsonl"), ("--format", "csv")):
+            out, modules = self.run_myclock(*args)
+            ok_(out, args)
+            ok_("myclock.face" in modules and "mtools.config_util.snapshot" in modules)
+            for module in HEAVY_MODULES:
+                ok_(module not in modules, f"{module} is imported by myclock {' '.join(args)}")
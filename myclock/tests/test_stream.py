@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+import io
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from nose.tools import eq_, ok_, raises
+
+from myclock import stream
+from myclock.face import ClockFace
+from myclock.stream import RecordWriter, open_output
+
+RECORD = {"epoch": 1530000000.0, "offsets": {"Asia/Tokyo": 32400, "UTC": 0}, "countdowns": {"締切": 60.5}}
+
+
+class CountingIO(io.StringIO):
+    """flush の回数を数える StringIO."""
+
+    flushes = 0
+
+    def flush(self) -> None:
+        self.flushes += 1
+        super().flush()
+
+
+class RecordWriterTestCase(TestCase):
+    """Test case for RecordWriter."""
+
+    def test_jsonl(self) -> None:
+        """Test that each record is written on one line."""
+        out = io.StringIO()
+        writer = RecordWriter(out, "jsonl")
+        writer.write(RECORD)
+        writer.write(dict(RECORD, epoch=1530000001.0))
+        lines = out.getvalue().splitlines()
+        eq_(len(lines), 2)
+        eq_(json.loads(lines[0]), RECORD)
+        eq_(json.loads(lines[1])["epoch"], 1530000001.0)
+        # 区切りに空白を入れず、日本語はエスケープしない.
+        ok_('"countdowns":{"締切":60.5}' in lines[0])
+
+    def test_csv(self) -> None:
+        """Test that the header is written once for the same columns."""
+        out = io.StringIO()
+        writer = RecordWriter(out, "csv")
+        writer.write(RECORD)
+        writer.write(dict(RECORD, epoch=1530000001.0))
+        eq_(out.getvalue().splitlines(), [
+            "epoch,offset:Asia/Tokyo,offset:UTC,countdown:締切",
+            "1530000000.0,32400,0,60.5",
+            "1530000001.0,32400,0,60.5"])
+
+    def test_csv_columns_changed(self) -> None:
+        """Test that the header is written again when the columns change."""
+        out = io.StringIO()
+        writer = RecordWriter(out, "csv")
+        writer.write(RECORD)
+        writer.write({"epoch": 1.0, "offsets": {"UTC": 0}, "countdowns": {}})
+        writer.write({"epoch": 2.0, "offsets": {"UTC": 0}, "countdowns": {}})
+        eq_(out.getvalue().splitlines()[2:], ["epoch,offset:UTC", "1.0,0", "2.0,0"])
+
+    def test_flush_interval(self) -> None:
+        """Test that records are flushed at most once per flush_interval."""
+        clock = [100.0]
+        with patch.object(stream.time, "monotonic", lambda: clock[0]):
+            out = CountingIO()
+            writer = RecordWriter(out, "jsonl", flush_interval=1.0)
+            for _ in range(5):
+                writer.write(RECORD)
+                clock[0] += 0.3
+            eq_(out.flushes, 1)
+            writer.flush()
+            eq_(out.flushes, 2)
+
+    def test_flush_every_record(self) -> None:
+        """Test that flush_interval 0 flushes each record."""
+        out = CountingIO()
+        writer = RecordWriter(out, "csv", flush_interval=0)
+        writer.write(RECORD)
+        writer.write(RECORD)
+        eq_(out.flushes, 2)
+
+    def test_record(self) -> None:
+        """Test that a ClockFace record can be written in both formats."""
+        face = ClockFace(["Asia/Tokyo", "America/New_York"])
+        record = face.record(1530000000.0)
+        for fmt in ("jsonl", "csv"):
+            out = io.StringIO()
+            RecordWriter(out, fmt).write(record)
+            ok_(out.getvalue().endswith("\n"))
+            ok_("\x1b" not in out.getvalue())
+
+    @raises(ValueError)
+    def test_unknown_format(self) -> None:
+        """Test that an unknown format is rejected."""
+        RecordWriter(io.StringIO(), "xml")
+
+
+class OpenOutputTestCase(TestCase):
+    """Test case for open_output."""
+
+    def test_without_fileno(self) -> None:
+        """Test that a stream without a file descriptor is returned as is."""
+        out = io.StringIO()
+        ok_(open_output(out) is out)
+
+    def test_reopen(self) -> None:
+        """Test that the file descriptor is reopened with a buffer and kept open."""
+        with tempfile.TemporaryFile("w+") as f:
+            out = open_output(f)
+            ok_(out is not f)
+            out.write("abc\n")
+            out.close()
+            os.fstat(f.fileno())
+            f.seek(0)
+            eq_(f.read(), "abc\n")
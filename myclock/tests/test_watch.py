@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from nose.tools import eq_, ok_
+
+from myclock.clock import MyClock
+from myclock.face import DEFAULT_TIME_FORMAT, DEFAULT_TIME_ZONES
+from myclock.watch import InotifyWatcher, PollingWatcher, Watcher, watch_file
+
+
+def wait_changed(watcher: Watcher, timeout: float = 5.0) -> bool:
+    """changed() が True になるまで待ちます. timeout 秒待っても変更がない場合は False."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if watcher.changed():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class WatcherTests:
+    """Watcher のテスト. create で監視を始める Watcher を作ります."""
+
+    def create(self, path: Path) -> Watcher:
+        raise NotImplementedError
+
+    def setUp(self) -> None:
+        """Write a file in a temporary directory and start watching it."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "config.py"
+        self.path.write_text("a = 1\n", encoding="utf-8")
+        self.watcher = self.create(self.path)
+        self.addCleanup(self.watcher.close)
+
+    def test_unchanged(self) -> None:
+        """Test that nothing is reported without a change."""
+        ok_(not wait_changed(self.watcher, 0.3))
+
+    def test_write(self) -> None:
+        """Test that writing the file is reported once."""
+        self.path.write_text("a = 22\n", encoding="utf-8")
+        ok_(wait_changed(self.watcher))
+        ok_(not wait_changed(self.watcher, 0.3))
+
+    def test_replace(self) -> None:
+        """Test that replacing the file like an editor is reported."""
+        new = self.path.with_name("config.py.new")
+        new.write_text("a = 333\n", encoding="utf-8")
+        os.replace(new, self.path)
+        ok_(wait_changed(self.watcher))
+
+    def test_other_file(self) -> None:
+        """Test that changes of other files in the directory are not reported."""
+        self.path.with_name("other.py").write_text("b = 1\n", encoding="utf-8")
+        ok_(not wait_changed(self.watcher, 0.3))
+
+    def test_close(self) -> None:
+        """Test that the thread ends after close."""
+        self.watcher.close()
+        self.watcher._thread.join(5.0)
+        ok_(not self.watcher._thread.is_alive())
+
+
+class InotifyWatcherTestCase(WatcherTests, TestCase):
+    """Test case for InotifyWatcher."""
+
+    def create(self, path: Path) -> Watcher:
+        return InotifyWatcher(path).start()
+
+
+class PollingWatcherTestCase(WatcherTests, TestCase):
+    """Test case for PollingWatcher."""
+
+    def create(self, path: Path) -> Watcher:
+        return PollingWatcher(path, interval=0.02).start()
+
+
+class WatchFileTestCase(TestCase):
+    """Test case for watch_file."""
+
+    def test_inotify(self) -> None:
+        """Test that inotify is used when it is available."""
+        with tempfile.TemporaryDirectory() as d, watch_file(Path(d) / "config.py") as watcher:
+            ok_(isinstance(watcher, InotifyWatcher))
+
+    def test_polling(self) -> None:
+        """Test that the file is polled when inotify is not available."""
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "config.py"
+            with patch.object(InotifyWatcher, "__init__", side_effect=OSError), \
+                    watch_file(path, interval=0.02) as watcher:
+                ok_(isinstance(watcher, PollingWatcher))
+                # 監視を始めた後に作られたファイルも検出する.
+                path.write_text("a = 1\n", encoding="utf-8")
+                ok_(wait_changed(watcher))
+
+
+class ReloadTestCase(TestCase):
+    """Test case for MyClock.reload."""
+
+    def setUp(self) -> None:
+        """Use a temporary directory as the home directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        home = patch.object(Path, "home", return_value=Path(self.tmp.name))
+        home.start()
+        self.addCleanup(home.stop)
+        self.path = Path(self.tmp.name) / ".myclock" / "config.py"
+        self.path.parent.mkdir()
+        self.write('c.MyClock.time_zones = ["Asia/Tokyo"]\nc.MyClock.time_format = "HH:mm"\n')
+        self.clock = MyClock()
+
+    def write(self, content: str) -> None:
+        self.path.write_text(content, encoding="utf-8")
+
+    def test_apply(self) -> None:
+        """Test that the new config is applied and the lines are made again."""
+        eq_(self.clock.time_zones, ["Asia/Tokyo"])
+        face = self.clock.face
+        self.write('c.MyClock.time_zones = ["Asia/Tokyo", "Europe/London"]\nc.MyClock.time_format = "HH:mm"\n')
+        ok_(self.clock.reload())
+        eq_(self.clock.time_zones, ["Asia/Tokyo", "Europe/London"])
+        ok_(self.clock.face is not face)
+        eq_(len(self.clock.lines(1530000000)), len(face.lines(1530000000)) + 1)
+
+    def test_removed(self) -> None:
+        """Test that settings removed from the config get their defaults again."""
+        self.write('c.MyClock.time_format = "HH:mm:ss"\n')
+        ok_(self.clock.reload())
+        eq_(self.clock.time_zones, DEFAULT_TIME_ZONES)
+        eq_(self.clock.time_format, "HH:mm:ss")
+        self.path.unlink()
+        ok_(self.clock.reload())
+        eq_(self.clock.time_format, DEFAULT_TIME_FORMAT)
+
+    def test_error(self) -> None:
+        """Test that a broken config changes nothing."""
+        for content in ("raise RuntimeError\n",
+                        'c.MyClock.time_format = "HH:mm:ss"\nc.MyClock.time_zones = 1\n',
+                        'c.MyClock.time_format = "HH:mm:ss"\nc.MyClock.time_zones = ["Nowhere/City"]\n'):
+            self.write(content)
+            ok_(not self.clock.reload(), content)
+            eq_(self.clock.time_zones, ["Asia/Tokyo"])
+            eq_(self.clock.time_format, "HH:mm")
+            ok_(self.clock.lines(1530000000)[0].endswith("17:00"))
+
+    def test_same_size(self) -> None:
+        """Test that a rewrite keeping the modification time and size is applied."""
+        self.clock.face
+        stat = os.stat(self.path)
+        line = 'c.MyClock.time_format = "mm:HH"\n'
+        self.write(line + " " * (stat.st_size - len(line)))
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        ok_(self.clock.reload())
+        eq_(self.clock.time_format, "mm:HH")
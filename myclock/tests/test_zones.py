@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import random
+from datetime import datetime, timedelta
+from unittest import TestCase
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+from nose.tools import eq_, ok_
+
+from mtools.clock_util import transitions
+from mtools.clock_util.transitions import offset_table
+
+from myclock import zones
+from myclock.zones import SEARCH_SECONDS, ZoneOffset, parse_zone
+
+# 2018-03-11 02:00 EST -> 03:00 EDT
+NY_DST_START = 1520751600
+# 2018-11-04 02:00 EDT -> 01:00 EST
+NY_DST_END = 1541311200
+
+
+class ZoneOffsetTestCase(TestCase):
+    """Test case for ZoneOffset."""
+
+    def test_transition(self) -> None:
+        """Test that the cache ends exactly at the next transition."""
+        zone = ZoneOffset("America/New_York")
+        eq_(zone.lookup(NY_DST_START - 3600), (-18000, "EST"))
+        eq_(zone.valid_until, NY_DST_START)
+        eq_(zone.lookup(NY_DST_START - 1), (-18000, "EST"))
+        eq_(zone.lookup(NY_DST_START), (-14400, "EDT"))
+        eq_(zone.lookup(NY_DST_END - 1), (-14400, "EDT"))
+        eq_(zone.valid_until, NY_DST_END)
+        eq_(zone.lookup(NY_DST_END), (-18000, "EST"))
+
+    def test_lazy(self) -> None:
+        """Test that the first lookup searches only until SEARCH_SECONDS later."""
+        zone = ZoneOffset("America/New_York")
+        with patch.object(transitions, "probe", wraps=transitions.probe) as probe, \
+                patch.object(zones, "probe", probe):
+            eq_(zone.lookup(NY_DST_START - 86400 * 30), (-18000, "EST"))
+        eq_(probe.call_count, 2)
+        eq_(zone.valid_until, NY_DST_START - 86400 * 30 + SEARCH_SECONDS)
+
+    def test_no_transition(self) -> None:
+        """Test that a zone without transitions is cached for SEARCH_SECONDS."""
+        zone = ZoneOffset("Asia/Tokyo")
+        eq_(zone.lookup(1600000000.5), (32400, "JST"))
+        eq_(zone.valid_until, 1600000000.5 + SEARCH_SECONDS)
+
+    def test_cached(self) -> None:
+        """Test that the zone database is not consulted until the transition."""
+        zone = ZoneOffset("Europe/London")
+        zone.lookup(1600000000)
+        with patch.object(zones, "probe", side_effect=AssertionError), \
+                patch.object(transitions, "probe", side_effect=AssertionError):
+            for t in range(1600000000, int(zone.valid_until), 3600):
+                eq_(zone.lookup(t), (3600, "BST"))
+
+    def test_offset_table(self) -> None:
+        """Test that the transitions agree with mtools.clock_util.transitions.offset_table."""
+        zone = ZoneOffset("Europe/London")
+        instants, offsets = offset_table("Europe/London", 1420070400, 1577836800)
+        t = 1420070400
+        found = []
+        while t < 1577836800:
+            zone.lookup(t)
+            found.append((int(zone.valid_from), zone.offset))
+            t = zone.valid_until
+        expected = [(i, offset) for i, offset in zip(instants[1:], offsets[1:]) if i < 1577836800]
+        eq_([pair for pair in found if pair[0] in instants[1:]], expected)
+
+    def test_backwards(self) -> None:
+        """Test that an instant before the cached period is looked up again."""
+        zone = ZoneOffset("America/New_York")
+        zone.lookup(NY_DST_START)
+        eq_(zone.lookup(NY_DST_START - 1), (-18000, "EST"))
+
+    def test_zoneinfo(self) -> None:
+        """Test that offsets agree with zoneinfo over several years."""
+        rng = random.Random(0)
+        for name in ("America/New_York", "Europe/Paris", "Australia/Sydney", "Asia/Kolkata",
+                     "America/Sao_Paulo", "Pacific/Chatham"):
+            zone = ZoneOffset(name)
+            tz = ZoneInfo(name)
+            instants = sorted(rng.uniform(1420070400, 1577836800) for _ in range(500))
+            for t in instants:
+                expected = datetime.fromtimestamp(t, tz)
+                eq_(zone.lookup(t), (int(expected.utcoffset().total_seconds()), expected.tzname()),
+                    f"{name} {t}")
+
+
+class ParseZoneTestCase(TestCase):
+    """Test case for parse_zone."""
+
+    def test_name(self) -> None:
+        """Test that a zone name is parsed."""
+        eq_(datetime(2018, 7, 1, tzinfo=parse_zone("Asia/Tokyo")).utcoffset(), timedelta(hours=9))
+
+    def test_arrow_formats(self) -> None:
+        """Test that other formats are parsed like arrow."""
+        eq_(datetime(2018, 7, 1, tzinfo=parse_zone("+05:30")).utcoffset(), timedelta(hours=5, minutes=30))
+        eq_(datetime(2018, 7, 1, tzinfo=parse_zone("UTC")).utcoffset(), timedelta(0))
+        ok_(parse_zone("local") is not None)
+
+    def test_fixed_offset(self) -> None:
+        """Test that a fixed offset never changes."""
+        zone = ZoneOffset("+09:00")
+        eq_(zone.lookup(0)[0], 32400)
+        eq_(zone.valid_until, SEARCH_SECONDS)
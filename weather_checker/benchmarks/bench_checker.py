@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""weather_checker のベンチマークです.
+
+次の処理の処理速度(件/秒)と最大メモリ使用量を計測します.
+
+- parse: 記録した応答(tests/fixtures)のデコード.
+- format: create_message と render_reports による 1 件、47 件、1 万件の整形.
+- fetch: 応答時間を模倣したローカルの HTTP サーバー(ReplayServer)からの全都道府県の取得.
+
+ネットワークにはアクセスしません. `pip install -e .` でインストールした後、
+weather_checker のディレクトリで実行してください.
+
+    $ python benchmarks/bench_checker.py
+    $ python benchmarks/bench_checker.py --latency 0.1 --json result.json
+    $ python benchmarks/bench_checker.py --compare result.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from weather_checker.checker import PLACESS, create_message, get_information_many
+from weather_checker.client import WeatherClient
+from weather_checker.decoder import BACKEND, decode_report
+from weather_checker.render import render_reports
+from weather_checker.transport import ReplayServer
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+
+
+def measure(name: str, n: int, func: Callable[[], Any], repeat: int = 3) -> Dict[str, Any]:
+    """func を repeat 回実行し、最も速かった時間と最大メモリ使用量を返します.
+
+    :param name: ベンチマークの名前.
+    :param n: 一回の実行で処理する件数.
+    :param func: 計測する関数.
+    :param repeat: 実行する回数.
+    :return: 計測結果.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    # メモリの計測は実行速度に影響するため、別に実行する.
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"name": name, "n": n, "seconds": best, "ops_per_sec": n / best, "peak_kib": peak / 1024}
+
+
+def bench_parse(iterations: int) -> List[Dict[str, Any]]:
+    """記録した応答のデコードを計測します."""
+    payloads = [p.read_bytes() for p in sorted(FIXTURES.glob("*.json"))]
+
+    def run() -> None:
+        for _ in range(iterations):
+            for payload in payloads:
+                decode_report(payload)
+
+    return [measure(f"parse ({BACKEND})", iterations * len(payloads), run)]
+
+
+def bench_format(sizes: List[int]) -> List[Dict[str, Any]]:
+    """create_message と render_reports による整形を計測します."""
+    base = [decode_report(p.read_bytes()) for p in sorted(FIXTURES.glob("*.json"))]
+    results = []
+    for size in sizes:
+        reports = [base[i % len(base)] for i in range(size)]
+        results.append(measure(f"create_message x{size}", size,
+                               lambda: [create_message(r) for r in reports]))
+        for fmt in ("text", "tsv", "jsonl"):
+            results.append(measure(f"render_reports {fmt} x{size}", size,
+                                   lambda: render_reports(reports, fmt)))
+    return results
+
+
+def bench_fetch(latency: float, workers: List[int]) -> List[Dict[str, Any]]:
+    """全都道府県の取得を、応答時間を模倣したローカルの HTTP サーバーから計測します."""
+    places = list(PLACESS.keys())
+    payload = (FIXTURES / "130010.json").read_bytes()
+    results = []
+    with tempfile.TemporaryDirectory() as d:
+        # 全ての都市コードに同じ応答を用意する.
+        for code in PLACESS.values():
+            (Path(d) / f"{code}.json").write_bytes(payload)
+
+        with ReplayServer(d, latency=latency) as server:
+            for n in workers:
+                with WeatherClient(server.url_base, pool_maxsize=n) as client:
+                    results.append(measure(f"fetch all workers={n}", len(places),
+                                           lambda: get_information_many(places, n, client=client),
+                                           repeat=1))
+    return results
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    """計測結果を表にして表示します."""
+    print(f"{'benchmark':<32}{'n':>8}{'seconds':>12}{'ops/sec':>14}{'peak KiB':>12}")
+    for r in results:
+        print(f"{r['name']:<32}{r['n']:>8}{r['seconds']:>12.4f}{r['ops_per_sec']:>14.1f}{r['peak_kib']:>12.1f}")
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> int:
+    """前回の計測結果と比較し、処理速度が tolerance の割合以上落ちたベンチマークの数を返します."""
+    prev = {r["name"]: r for r in baseline}
+    regressions = 0
+    for r in results:
+        if r["name"] not in prev:
+            continue
+        ratio = r["ops_per_sec"] / prev[r["name"]]["ops_per_sec"]
+        if ratio < 1 - tolerance:
+            print(f"regression: {r['name']} {ratio:.2f}x of baseline")
+            regressions += 1
+    return regressions
+
+
+def main() -> int:
+    """ベンチマークのエントリーポイント."""
+    parser = argparse.ArgumentParser(description="weather_checker のベンチマークを実行します.")
+    parser.add_argument("--iterations", type=int, default=1000, help="デコードを繰り返す回数.")
+    parser.add_argument("--latency", type=float, default=0.05, help="模倣する Web API の応答時間(秒).")
+    parser.add_argument("--quick", action="store_true", help="件数を減らして短時間で実行します.")
+    parser.add_argument("--json", metavar="FILE", help="計測結果を JSON で保存します.")
+    parser.add_argument("--compare", metavar="FILE", help="--json で保存した計測結果と比較します.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="--compare で許容する処理速度の低下の割合.")
+    args = parser.parse_args()
+
+    sizes = [1, 47, 1000] if args.quick else [1, 47, 10000]
+    iterations = 100 if args.quick else args.iterations
+    results = bench_parse(iterations)
+    results += bench_format(sizes)
+    results += bench_fetch(args.latency, [1, 8])
+    print_results(results)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        return 1 if compare(results, baseline, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""コマンドの起動時間のベンチマークです.
+
+``python -X importtime`` の出力から、エントリーポイントのモジュールの読み込み時間と、
+読み込まれた重いモジュール(requests など)を表示します.
+また、モジュールを読み込むだけのプロセスの実行時間を `python -c pass` と比較します.
+
+weather_checker のディレクトリで実行してください.
+
+    $ python benchmarks/bench_startup.py
+    $ python benchmarks/bench_startup.py --budget 50
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+# 起動時には読み込みたくない、読み込みに時間がかかるモジュール.
+HEAVY_MODULES = ["requests", "urllib3", "http.client", "http.server", "concurrent.futures"]
+
+
+def _env() -> Dict[str, str]:
+    """weather_checker を読み込めるように PYTHONPATH を設定した環境変数を返します."""
+    env = dict(os.environ)
+    paths = [str(ROOT)] + [p for p in env.get("PYTHONPATH", "").split(os.pathsep) if p]
+    env["PYTHONPATH"] = os.pathsep.join(paths)
+    return env
+
+
+def import_time(module: str) -> Tuple[int, List[str]]:
+    """モジュールの読み込み時間(マイクロ秒)と、読み込まれたモジュールの一覧を返します.
+
+    :param module: 計測するモジュール.
+    :return: (読み込み時間(マイクロ秒), 読み込まれたモジュール名のリスト)
+    """
+    ret = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         stderr=subprocess.PIPE, universal_newlines=True, env=_env(), check=True)
+    cumulative = 0
+    modules = []
+    for line in ret.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        if not total.strip().isdigit():
+            # 見出しの行.
+            continue
+        modules.append(name.strip())
+        if name.strip() == module:
+            cumulative = int(total)
+    return cumulative, modules
+
+
+def wall_time(code: str, repeat: int) -> float:
+    """python -c code の実行時間(秒)の中央値を返します."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], env=_env(), check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main() -> int:
+    """ベンチマークのエントリーポイント."""
+    parser = argparse.ArgumentParser(description="コマンドの起動時間を計測します.")
+    parser.add_argument("modules", nargs="*", default=["weather_checker.checker"],
+                        help="計測するモジュール. 既定値は weather_checker.checker です.")
+    parser.add_argument("--repeat", type=int, default=10, help="プロセスを実行する回数.")
+    parser.add_argument("--budget", type=float, metavar="MS",
+                        help="読み込み時間の上限(ミリ秒). 超えた場合は終了コード 1 で終了します.")
+    args = parser.parse_args()
+
+    baseline = wall_time("pass", args.repeat)
+    print(f"{'module':<28}{'import ms':>12}{'process ms':>12}  heavy modules")
+    over = 0
+    for module in args.modules:
+        cumulative, modules = import_time(module)
+        process = wall_time(f"import {module}", args.repeat) - baseline
+        heavy = [m for m in HEAVY_MODULES if m in modules]
+        print(f"{module:<28}{cumulative / 1000:>12.1f}{process * 1000:>12.1f}  {', '.join(heavy) or '-'}")
+        if args.budget is not None and cumulative / 1000 > args.budget:
+            print(f"over budget: {module} {cumulative / 1000:.1f} ms > {args.budget} ms")
+            over += 1
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,7 +13,9 @@ setup(
     # ユーザーが指定した場合にインストールされる外部パッケージ.
     extras_require={
         "test": ["nose"],
-        "doc": ["sphinx"]},
+        "doc": ["sphinx"],
+        # JSON のデコードを高速にする.
+        "fast": ["orjson"]},
     # コマンドが実行されたときのエントリーポイント.
     entry_points={
         'console_scripts': ['weather=weather_checker.checker:entry_point']}
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import tempfile
+import time
+from unittest import TestCase
+
+from nose.tools import eq_, ok_, raises
+
+from weather_checker.cache import ForecastCache
+
+
+class ForecastCacheTestCase(TestCase):
+    """Test case for forecast cache."""
+
+    def setUp(self) -> None:
+        """Run setup function before every test."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.calls = 0
+
+    def tearDown(self) -> None:
+        """Run tear down function after every test."""
+        self.tmp.cleanup()
+
+    def loader(self) -> dict:
+        """Count calls and return dummy information."""
+        self.calls += 1
+        return {"place": "東京都", "calls": self.calls}
+
+    def test_fetch(self) -> None:
+        """Test function for fetch (memory tier)."""
+        cache = ForecastCache(ttl=60)
+        eq_(cache.fetch("130010", self.loader)["calls"], 1)
+        eq_(cache.fetch("130010", self.loader)["calls"], 1)
+        eq_(self.calls, 1)
+        eq_(cache.stats, {"hits": 1, "stale_hits": 0, "misses": 1})
+
+    def test_fetch_disk(self) -> None:
+        """Test function for fetch (disk tier)."""
+        ForecastCache(ttl=60, cache_dir=self.tmp.name).fetch("130010", self.loader)
+        cache = ForecastCache(ttl=60, cache_dir=self.tmp.name)
+        eq_(cache.fetch("130010", self.loader)["place"], "東京都")
+        eq_(self.calls, 1)
+        eq_(cache.hits, 1)
+
+    def test_fetch_expired(self) -> None:
+        """Test function for fetch (expired entry)."""
+        cache = ForecastCache(ttl=60, stale_ttl=0)
+        cache.set("130010", {"calls": 0}, fetched_at=time.time() - 120)
+        eq_(cache.fetch("130010", self.loader)["calls"], 1)
+        eq_(cache.misses, 1)
+
+    def test_fetch_stale(self) -> None:
+        """Test function for fetch (stale-while-revalidate)."""
+        cache = ForecastCache(ttl=60, stale_ttl=600)
+        cache.set("130010", {"calls": 0}, fetched_at=time.time() - 120)
+        eq_(cache.fetch("130010", self.loader)["calls"], 0)
+        for thread in list(cache._refreshing.values()):
+            thread.join()
+        eq_(cache.fetch("130010", self.loader)["calls"], 1)
+        eq_(cache.stats, {"hits": 1, "stale_hits": 1, "misses": 0})
+
+    def test_lru(self) -> None:
+        """Test function for LRU eviction."""
+        cache = ForecastCache(maxsize=2)
+        cache.set("1", 1)
+        cache.set("2", 2)
+        cache.get("1")
+        cache.set("3", 3)
+        ok_(cache.get("2") is None)
+        eq_(cache.get("1")[1], 1)
+
+    @raises(RuntimeError)
+    def test_fetch_error(self) -> None:
+        """Test function for fetch (loader error)."""
+        def fail() -> None:
+            raise RuntimeError("network error")
+        ForecastCache().fetch("130010", fail)
@@ -1,10 +1,21 @@
 # -*- coding: utf-8 -*-
 
+import json
+import tempfile
+import time
+from pathlib import Path
 from unittest import TestCase
+from unittest.mock import MagicMock, patch
 
 from nose.tools import eq_, ok_, raises, set_trace
 
-from weather_checker.checker import create_message, get_information
+from weather_checker.cache import ForecastCache
+from weather_checker.checker import create_message, get_information, get_information_many
+from weather_checker.model import Forecast, WeatherReport
+from weather_checker.transport import ReplayTransport
+
+# 記録した Web API の応答.
+FIXTURES = Path(__file__).parent / "fixtures"
 
 
 class WeatherCheckerTestCase(TestCase):
@@ -34,15 +45,76 @@ class WeatherCheckerTestCase(TestCase):
         """Test function for get_information."""
         test_data = ["Hokkaido", "Okinawa"]
         answers = ["道央", "沖縄県"]
+        client = ReplayTransport(FIXTURES)
         for dat, ans in zip(test_data, answers):
-            ret = get_information(dat)
-            eq_(ret["place"], ans)
+            ret = get_information(dat, client)
+            eq_(ret.place, ans)
+
+    def test_get_information_alias(self) -> None:
+        """Test function for get_information (city code and Japanese name)."""
+        client = ReplayTransport(FIXTURES)
+        for dat in ["130010", "東京都", "とうきょう"]:
+            eq_(get_information(dat, client).place, "東京都")
 
     @raises(ValueError)
     def test_get_information_error(self) -> None:
         """Test function for get_information (error case)."""
         get_information("California")
 
+    def test_get_information_cache(self) -> None:
+        """Test function for get_information (disk cache)."""
+        forecast = {"telop": "晴れ", "temperature": {"min": None, "max": {"celsius": "33"}}}
+        payload = json.dumps({"title": "東京都 東京 の天気", "description": {"text": "天気概況のテスト"},
+                              "forecasts": [forecast] * 3}).encode("utf-8")
+        client = MagicMock()
+        client.fetch.return_value = payload
+
+        with tempfile.TemporaryDirectory() as d:
+            ret1 = get_information("Tokyo", client, ForecastCache(cache_dir=d))
+            ret2 = get_information("Tokyo", client, ForecastCache(cache_dir=d))
+        eq_(client.fetch.call_count, 1)
+        eq_(ret1, ret2)
+        eq_(ret2.forecasts[0], Forecast("晴れ", None, "33"))
+
+    def test_get_information_many(self) -> None:
+        """Test function for get_information_many."""
+        def fake_get_information(place, client=None, cache=None, fuzzy=False):
+            # 後の地名ほど早く返るようにして、結果の順番を確認する.
+            time.sleep({"Hokkaido": 0.03, "Tokyo": 0.02, "Okinawa": 0.01}.get(place, 0))
+            if place == "California":
+                raise ValueError(f"Unknown place: {place}")
+            return WeatherReport(place, "", ())
+
+        places = ["Hokkaido", "California", "Tokyo", "Okinawa"]
+        with patch("weather_checker.checker.get_information", fake_get_information):
+            ret = get_information_many(places, max_workers=4)
+
+        eq_(len(ret), len(places))
+        eq_(ret[0].place, "Hokkaido")
+        ok_(isinstance(ret[1], ValueError))
+        eq_(ret[2].place, "Tokyo")
+        eq_(ret[3].place, "Okinawa")
+
+    def test_get_information_many_unexpected_error(self) -> None:
+        """Test function for get_information_many (unexpected exception)."""
+        def fake_get_information(place, client=None, cache=None, fuzzy=False):
+            if place == "Tokyo":
+                raise TypeError("unexpected")
+            return WeatherReport(place, "", ())
+
+        with patch("weather_checker.checker.get_information", fake_get_information):
+            ret = get_information_many(["Hokkaido", "Tokyo", "Okinawa"])
+
+        eq_(ret[0].place, "Hokkaido")
+        ok_(isinstance(ret[1], TypeError))
+        eq_(ret[2].place, "Okinawa")
+
+    def test_get_information_many_error(self) -> None:
+        """Test function for get_information_many (error case)."""
+        ret = get_information_many(["California", "Mars"])
+        eq_(len(ret), 2)
+        ok_(all(isinstance(x, ValueError) for x in ret))
+
     def test_create_message(self) -> None:
         """Test function for create_message."""
         test_data = {
@@ -57,3 +129,14 @@ class WeatherCheckerTestCase(TestCase):
         ok_(ret.find("東京都") > -1)
         ok_(ret.find("天気概況のテスト") > -1)
         ok_(ret.find("20℃") > -1)
+
+    def test_create_message_report(self) -> None:
+        """Test function for create_message (WeatherReport)."""
+        test_data = WeatherReport("東京都", "天気概況のテスト",
+                                  (Forecast("晴れ", None, "40"), Forecast("曇り", "20", "30"),
+                                   Forecast("雨", "10", "20")))
+
+        ret = create_message(test_data)
+        eq_(ret, create_message(test_data.to_dict()))
+        ok_(ret.find("最低気温: --℃") > -1)
+        ok_(ret.find("20℃") > -1)
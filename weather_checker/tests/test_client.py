@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import requests
+from nose.tools import eq_, raises
+
+from weather_checker.client import WeatherClient
+
+
+def make_response(status_code: int, payload: bytes = b"", headers: dict = None) -> MagicMock:
+    """Create a dummy response of requests."""
+    ret = MagicMock()
+    ret.status_code = status_code
+    ret.headers = headers or {}
+    ret.content = payload
+    if status_code >= 400:
+        ret.raise_for_status.side_effect = requests.HTTPError(f"{status_code} Error")
+    return ret
+
+
+class WeatherClientTestCase(TestCase):
+    """Test case for weather client."""
+
+    def setUp(self) -> None:
+        """Run setup function before every test."""
+        self.client = WeatherClient()
+
+    def tearDown(self) -> None:
+        """Run tear down function after every test."""
+        self.client.close()
+
+    def test_fetch(self) -> None:
+        """Test function for fetch."""
+        res = make_response(200, b'{"title": "Tokyo"}')
+        with patch.object(self.client.session, "get", return_value=res) as get:
+            eq_(self.client.fetch("130010"), b'{"title": "Tokyo"}')
+        eq_(get.call_args[1]["params"], {"city": "130010"})
+        eq_(get.call_args[1]["headers"], {})
+
+    def test_fetch_not_modified(self) -> None:
+        """Test function for fetch (conditional request)."""
+        headers = {"ETag": '"abc"', "Last-Modified": "Tue, 21 Aug 2018 08:00:00 GMT"}
+        responses = [make_response(200, b'{"title": "Tokyo"}', headers), make_response(304)]
+        with patch.object(self.client.session, "get", side_effect=responses) as get:
+            self.client.fetch("130010")
+            eq_(self.client.fetch("130010"), b'{"title": "Tokyo"}')
+        eq_(get.call_args[1]["headers"],
+            {"If-None-Match": '"abc"', "If-Modified-Since": "Tue, 21 Aug 2018 08:00:00 GMT"})
+
+    @raises(requests.HTTPError)
+    def test_fetch_error(self) -> None:
+        """Test function for fetch (error case)."""
+        with patch.object(self.client.session, "get", return_value=make_response(404)):
+            self.client.fetch("130010")
+
+    def test_pool(self) -> None:
+        """Test function for connection pool settings."""
+        adapter = self.client.session.get_adapter("http://weather.livedoor.com/")
+        eq_(adapter._pool_maxsize, 8)
+        eq_(adapter.max_retries.total, 3)
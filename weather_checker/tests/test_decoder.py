@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import json
+from unittest import TestCase
+
+from nose.tools import eq_, ok_, raises
+
+from weather_checker.decoder import decode_report
+from weather_checker.model import Forecast, WeatherReport
+
+PAYLOAD = {
+    "pinpointLocations": [{"link": "http://weather.livedoor.com/area/forecast/1310100", "name": "千代田区"}],
+    "link": "http://weather.livedoor.com/area/forecast/130010",
+    "forecasts": [
+        {"dateLabel": "今日", "telop": "晴時々曇", "date": "2018-08-21",
+         "temperature": {"min": None, "max": {"celsius": "33", "fahrenheit": "91.4"}}},
+        {"dateLabel": "明日", "telop": "晴れ", "date": "2018-08-22",
+         "temperature": {"min": {"celsius": "25", "fahrenheit": "77.0"},
+                         "max": {"celsius": "34", "fahrenheit": "93.2"}}},
+        {"dateLabel": "明後日", "telop": "曇のち雨", "date": "2018-08-23",
+         "temperature": {"min": None, "max": None}}],
+    "location": {"city": "東京", "area": "関東", "prefecture": "東京都"},
+    "publicTime": "2018-08-21T11:00:00+0900",
+    "copyright": {"provider": [{"link": "http://tenki.jp/", "name": "日本気象協会"}], "title": "(C) LINE Corporation"},
+    "title": "東京都 東京 の天気",
+    "description": {"text": "天気概況のテスト", "publicTime": "2018-08-21T10:39:00+0900"}}
+
+
+class DecoderTestCase(TestCase):
+    """Test case for decoder."""
+
+    def test_decode_report(self) -> None:
+        """Test function for decode_report."""
+        ret = decode_report(json.dumps(PAYLOAD).encode("utf-8"))
+        ok_(isinstance(ret, WeatherReport))
+        eq_(ret.place, "東京都")
+        eq_(ret.description, "天気概況のテスト")
+        eq_(ret.forecasts, (Forecast("晴時々曇", None, "33"),
+                            Forecast("晴れ", "25", "34"),
+                            Forecast("曇のち雨", None, None)))
+
+    def test_to_dict(self) -> None:
+        """Test function for WeatherReport.to_dict."""
+        ret = decode_report(json.dumps(PAYLOAD)).to_dict()
+        eq_(ret["place"], "東京都")
+        eq_(ret["forecasts"][0]["temp_min"], None)
+        eq_(ret["forecasts"][1]["temp_min"], {"celsius": "25"})
+
+    @raises(ValueError)
+    def test_decode_report_error(self) -> None:
+        """Test function for decode_report (error case)."""
+        payload = dict(PAYLOAD, forecasts=PAYLOAD["forecasts"][:2])
+        decode_report(json.dumps(payload))
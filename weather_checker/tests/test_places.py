@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+
+from nose.tools import eq_, ok_, raises
+
+from weather_checker.places import (CODE_TO_PLACE, JAPANESE_NAMES, PLACESS, UnknownPlaceError,
+                                    resolve_place, suggest_places)
+
+
+class PlacesTestCase(TestCase):
+    """Test case for place lookup."""
+
+    def test_index(self) -> None:
+        """Test function for the indexes."""
+        eq_(set(JAPANESE_NAMES), set(PLACESS))
+        eq_(len(CODE_TO_PLACE), len(PLACESS))
+
+    def test_resolve_place(self) -> None:
+        """Test function for resolve_place."""
+        test_data = ["Tokyo", "tokyo", "ＴＯＫＹＯ", " Tōkyō ", "130010", "東京都", "東京",
+                     "とうきょう", "トウキョウ", "toky"]
+        for dat in test_data:
+            eq_(resolve_place(dat), "Tokyo")
+        eq_(resolve_place("道央"), "Hokkaido")
+        eq_(resolve_place("沖縄県"), "Okinawa")
+        eq_(resolve_place("京都"), "Kyoto")
+        eq_(resolve_place("和歌"), "Wakayama")
+
+    def test_resolve_place_fuzzy(self) -> None:
+        """Test function for resolve_place (fuzzy)."""
+        eq_(resolve_place("Tokio", fuzzy=True), "Tokyo")
+        eq_(resolve_place("Hiroshma", fuzzy=True), "Hiroshima")
+
+    @raises(UnknownPlaceError)
+    def test_resolve_place_ambiguous(self) -> None:
+        """Test function for resolve_place (ambiguous prefix)."""
+        resolve_place("to")
+
+    @raises(UnknownPlaceError)
+    def test_resolve_place_error(self) -> None:
+        """Test function for resolve_place (error case)."""
+        resolve_place("Tokio")
+
+    def test_suggest_places(self) -> None:
+        """Test function for suggest_places."""
+        eq_(suggest_places("Tokio")[0], "Tokyo")
+        ok_("Tochigi" in suggest_places("to", n=10))
+        eq_(suggest_places("California"), [])
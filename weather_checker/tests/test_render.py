@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import io
+import json
+from unittest import TestCase
+
+from nose.tools import eq_, raises
+
+from weather_checker.model import Forecast, WeatherReport
+from weather_checker.render import display_width, format_message, pad, render_reports
+
+REPORTS = [
+    WeatherReport("東京都", "天気概況のテスト",
+                  (Forecast("晴時々曇", None, "33"), Forecast("晴れ", "25", "34"), Forecast("雨", None, None))),
+    WeatherReport("沖縄県", "天気概況のテスト2",
+                  (Forecast("晴れ", "28", "32"), Forecast("曇り", "27", "31"), Forecast("晴れ", "27", "32")))]
+
+
+class RenderTestCase(TestCase):
+    """Test case for render."""
+
+    def test_display_width(self) -> None:
+        """Test function for display_width."""
+        eq_(display_width("晴れ"), 4)
+        eq_(display_width("abc"), 3)
+        eq_(display_width("曇 ﾊﾚ"), 5)
+
+    def test_pad(self) -> None:
+        """Test function for pad."""
+        eq_(pad("晴れ", 8), "晴れ    ")
+        eq_(pad("晴時々曇", 8), "晴時々曇")
+        eq_(pad("晴れ(a)", 8), "晴れ(a) ")
+        eq_(pad("晴のち曇時々雨", 8), "晴のち曇時々雨")
+
+    def test_format_message(self) -> None:
+        """Test function for format_message."""
+        lines = format_message(REPORTS[0]).split("\n")
+        eq_(lines[0], "東京都 の天気")
+        eq_(lines[2], "今日　: 晴時々曇    最低気温: --℃    最高気温: 33℃")
+        eq_(lines[3], "明日　: 晴れ        最低気温: 25℃    最高気温: 34℃")
+        eq_(lines[-1], "天気概況のテスト")
+
+    def test_render_text(self) -> None:
+        """Test function for render_reports (text)."""
+        out = io.StringIO()
+        ret = render_reports(REPORTS, "text", out)
+        eq_(out.getvalue(), ret)
+        eq_(ret, format_message(REPORTS[0]) + "\n\n" + format_message(REPORTS[1]) + "\n")
+        eq_(render_reports([], "text"), "")
+
+    def test_render_tsv(self) -> None:
+        """Test function for render_reports (tsv)."""
+        lines = render_reports(REPORTS, "tsv").splitlines()
+        eq_(len(lines), 7)
+        eq_(lines[1], "東京都\t0\t晴時々曇\t\t33")
+
+    def test_render_jsonl(self) -> None:
+        """Test function for render_reports (jsonl)."""
+        lines = render_reports(REPORTS, "jsonl").splitlines()
+        eq_(len(lines), 2)
+        dat = json.loads(lines[1])
+        eq_(dat["place"], "沖縄県")
+        eq_(dat["forecasts"][0], {"weather": "晴れ", "temp_min": "28", "temp_max": "32"})
+
+    @raises(ValueError)
+    def test_render_error(self) -> None:
+        """Test function for render_reports (error case)."""
+        render_reports(REPORTS, "xml")
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import io
+from threading import Thread
+from unittest import TestCase
+from unittest.mock import patch
+
+from nose.tools import eq_, ok_
+
+from weather_checker.checker import UnknownPlaceError, entry_point
+from weather_checker.model import Forecast, WeatherReport
+from weather_checker.server import WeatherDaemon, WeatherServer, query_daemon
+
+
+def fake_get_information_many(places, max_workers=None, cache=None, client=None, fuzzy=False):
+    """Return dummy reports except for Okinawa."""
+    return [RuntimeError("timeout") if p == "Okinawa" else fake_get_information(p) for p in places]
+
+
+def fake_get_information(place, client=None, cache=None, fuzzy=False):
+    """Return a dummy report."""
+    if place == "California":
+        raise UnknownPlaceError(f"Unknown place: {place}")
+    return WeatherReport(place, "天気概況のテスト", (Forecast("晴れ", None, "33"),) * 3)
+
+
+class WeatherServerTestCase(TestCase):
+    """Test case for weather server."""
+
+    def setUp(self) -> None:
+        """Run setup function before every test."""
+        self.patches = [patch("weather_checker.server.get_information", fake_get_information),
+                        patch("weather_checker.server.get_information_many", fake_get_information_many)]
+        for p in self.patches:
+            p.start()
+        self.daemon = WeatherDaemon(["Tokyo", "Okinawa"])
+        self.server = WeatherServer(self.daemon, port=0)
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self) -> None:
+        """Run tear down function after every test."""
+        self.server.shutdown()
+        self.server.server_close()
+        for p in self.patches:
+            p.stop()
+
+    def test_refresh(self) -> None:
+        """Test function for WeatherDaemon.refresh."""
+        self.daemon.refresh()
+        stats = self.daemon.stats
+        eq_(stats["places"], 1)
+        eq_(stats["refreshes"], 1)
+        eq_(stats["errors"], {"Okinawa": "timeout"})
+
+    def test_query_daemon(self) -> None:
+        """Test function for query_daemon."""
+        self.daemon.refresh()
+        ret = query_daemon(self.server.url, ["Tokyo", "California", "Osaka"])
+        eq_(len(ret), 3)
+        eq_(ret[0], fake_get_information("Tokyo"))
+        ok_(isinstance(ret[1], UnknownPlaceError))
+        # 保持していない地域はその場で取得する.
+        eq_(ret[2].place, "Osaka")
+
+    def test_query_daemon_fuzzy(self) -> None:
+        """Test function for query_daemon (fuzzy)."""
+        self.daemon.refresh()
+        ret = query_daemon(self.server.url, ["Tokio", "Tokyo"])
+        ok_(isinstance(ret[0], UnknownPlaceError))
+        ret = query_daemon(self.server.url, ["Tokio", "Tokyo"], fuzzy=True)
+        eq_(ret, [fake_get_information("Tokyo")] * 2)
+
+    def test_entry_point_fuzzy(self) -> None:
+        """Test that weather --fuzzy --daemon passes fuzzy to the daemon."""
+        self.daemon.refresh()
+        argv = ["weather", "--daemon", self.server.url, "--fuzzy", "-p", "Tokio", "-f", "tsv", "--no-cache"]
+        with patch("sys.argv", argv), patch("weather_checker.checker.get_information") as get_information, \
+                patch("sys.stdout", new_callable=io.StringIO) as out:
+            eq_(entry_point(), 0)
+        # 常駐プロセスから取得したので、Web API からは取得しない.
+        eq_(get_information.call_count, 0)
+        ok_("Tokyo" in out.getvalue())
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from nose.tools import eq_, ok_
+
+from weather_checker import checker
+from weather_checker.cache import ForecastCache
+from weather_checker.decoder import decode_report
+
+# weather_checker のディレクトリ.
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).parent / "fixtures"
+# weather コマンドの起動時に読み込んではいけないモジュール.
+HEAVY_MODULES = ["requests", "urllib3", "http.client", "http.server", "concurrent.futures"]
+
+
+def _loaded_modules(module: str):
+    """別のプロセスでモジュールを読み込み、読み込まれたモジュールの一覧を返します."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(ROOT), env.get("PYTHONPATH", "")])
+    code = f"import json, sys, {module}; sys.stdout.write(json.dumps(sorted(sys.modules)))"
+    ret = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, universal_newlines=True,
+                         env=env, check=True)
+    return json.loads(ret.stdout)
+
+
+class StartupTestCase(TestCase):
+    """Test case for the startup of the weather command."""
+
+    def test_no_heavy_imports(self) -> None:
+        """Test that the entry point module does not import heavy modules."""
+        modules = _loaded_modules("weather_checker.checker")
+        ok_("weather_checker.checker" in modules)
+        for module in HEAVY_MODULES:
+            ok_(module not in modules, f"{module} is imported at startup of weather_checker.checker")
+
+    def test_cache_hit_without_client(self) -> None:
+        """Test that a cache hit does not create the default client."""
+        report = decode_report((FIXTURES / "130010.json").read_bytes())
+        saved = checker._default_client
+        checker._default_client = None
+        try:
+            with tempfile.TemporaryDirectory() as d:
+                cache = ForecastCache(cache_dir=d)
+                cache.set("130010", report)
+                eq_(checker.get_information("Tokyo", cache=cache), report)
+                eq_(checker._default_client, None)
+        finally:
+            checker._default_client = saved
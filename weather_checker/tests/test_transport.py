@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from nose.tools import eq_, ok_, raises
+
+from weather_checker.checker import get_information, get_information_many
+from weather_checker.client import WeatherClient
+from weather_checker.transport import RecordingTransport, ReplayServer, ReplayTransport
+
+# 記録した Web API の応答.
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class TransportTestCase(TestCase):
+    """Test case for replay and recording transports."""
+
+    def test_replay(self) -> None:
+        """Test function for ReplayTransport."""
+        for preload in (False, True):
+            client = ReplayTransport(FIXTURES, preload=preload)
+            eq_(client.fetch("130010"), (FIXTURES / "130010.json").read_bytes())
+
+    @raises(KeyError)
+    def test_replay_error(self) -> None:
+        """Test function for ReplayTransport (error case)."""
+        ReplayTransport(FIXTURES).fetch("999999")
+
+    @raises(KeyError)
+    def test_replay_invalid_code(self) -> None:
+        """Test function for ReplayTransport (invalid city code)."""
+        ReplayTransport(FIXTURES).fetch("../130010")
+
+    def test_record(self) -> None:
+        """Test function for RecordingTransport."""
+        with tempfile.TemporaryDirectory() as d:
+            with RecordingTransport(Path(d) / "recorded", ReplayTransport(FIXTURES)) as client:
+                ret = get_information("Okinawa", client)
+            eq_(ret.place, "沖縄県")
+            eq_(get_information("Okinawa", ReplayTransport(Path(d) / "recorded")), ret)
+
+    def test_replay_server(self) -> None:
+        """Test function for ReplayServer."""
+        with ReplayServer(FIXTURES) as server, WeatherClient(server.url_base, retries=0) as client:
+            ret = get_information_many(["Hokkaido", "Tokyo", "Aomori"], client=client)
+        eq_(ret[0].place, "道央")
+        eq_(ret[1].place, "東京都")
+        ok_(isinstance(ret[2], Exception))
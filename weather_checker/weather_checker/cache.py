@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""天気の情報を都市コードごとに保持するキャッシュです.
+
+キャッシュは次の二段構成になっています.
+- メモリ上の LRU キャッシュ.
+- ディレクトリ以下に都市コードごとに JSON ファイルを置くディスクキャッシュ(任意).
+
+有効期限(TTL)を過ぎた情報も stale_ttl の間は古い情報として返し、
+裏で新しい情報を取得し直します(stale-while-revalidate).
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+# キャッシュの有効期限(秒).
+DEFAULT_TTL = 30 * 60
+# 有効期限を過ぎた情報を返してもよい期間(秒).
+DEFAULT_STALE_TTL = 3 * 60 * 60
+# メモリ上に保持する都市の数.
+DEFAULT_MAXSIZE = 64
+
+
+class ForecastCache:
+    """都市コードをキーにして天気の情報を保持するキャッシュ.
+
+    :Example:
+
+        >>> cache = ForecastCache(ttl=600, cache_dir="~/.weather_checker/cache")
+        >>> info = cache.fetch("130010", lambda: load_from_web("130010"))
+        >>> cache.stats
+        {'hits': 0, 'stale_hits': 0, 'misses': 1}
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, stale_ttl: float = DEFAULT_STALE_TTL,
+                 maxsize: int = DEFAULT_MAXSIZE,
+                 cache_dir: Optional[Union[str, Path]] = None) -> None:
+        """コンストラクタ.
+
+        :param ttl: キャッシュの有効期限(秒).
+        :param stale_ttl: 有効期限を過ぎた後、古い情報を返してもよい期間(秒). 0 の場合は返しません.
+        :param maxsize: メモリ上に保持する都市の数.
+        :param cache_dir: ディスクキャッシュのディレクトリ. 省略した場合はメモリ上のみで保持します.
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        # 都市コード -> (取得時刻, 情報)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._refreshing: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """ヒット数とミス数を返します."""
+        return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses}
+
+    def get(self, code: str) -> Optional[Tuple[float, Any]]:
+        """キャッシュされている情報を取得時刻とともに返します.
+
+        有効期限は確認しません. キャッシュにない場合は None を返します.
+
+        :param code: 都市コード.
+        :return: (取得時刻, 情報) のタプル.
+        """
+        with self._lock:
+            entry = self._entries.get(code)
+            if entry is not None:
+                self._entries.move_to_end(code)
+                return entry
+
+        entry = self._read_disk(code)
+        if entry is not None:
+            with self._lock:
+                self._store(code, entry)
+        return entry
+
+    def set(self, code: str, info: Any, fetched_at: Optional[float] = None) -> None:
+        """情報をキャッシュします.
+
+        :param code: 都市コード.
+        :param info: 天気の情報.
+        :param fetched_at: 取得時刻. 省略した場合は現在時刻になります.
+        """
+        entry = (time.time() if fetched_at is None else fetched_at, info)
+        with self._lock:
+            self._store(code, entry)
+        self._write_disk(code, entry)
+
+    def fetch(self, code: str, loader: Callable[[], Any]) -> Any:
+        """キャッシュから情報を返し、なければ loader で取得してキャッシュします.
+
+        有効期限切れでも stale_ttl 以内の情報はそのまま返し、別スレッドで取得し直します.
+
+        :param code: 都市コード.
+        :param loader: 情報を取得する関数.
+        :return: 天気の情報.
+        """
+        entry = self.get(code)
+        if entry is not None:
+            fetched_at, info = entry
+            age = time.time() - fetched_at
+            if age < self.ttl:
+                self._count("hits")
+                return info
+            if age < self.ttl + self.stale_ttl:
+                self._count("stale_hits")
+                self._revalidate(code, loader)
+                return info
+
+        self._count("misses")
+        info = loader()
+        self.set(code, info)
+        return info
+
+    def clear(self) -> None:
+        """メモリ上とディスク上のキャッシュを全て削除します."""
+        with self._lock:
+            self._entries.clear()
+        if self.cache_dir and self.cache_dir.exists():
+            for p in self.cache_dir.glob("*.json"):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+
+    def _count(self, name: str) -> None:
+        """カウンタを一つ増やします."""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _store(self, code: str, entry: Tuple[float, Any]) -> None:
+        """ロックを取得した状態で、メモリ上に保存します."""
+        self._entries[code] = entry
+        self._entries.move_to_end(code)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _revalidate(self, code: str, loader: Callable[[], Any]) -> None:
+        """別スレッドで情報を取得し直します. 同じ都市の取得は同時に一つだけ行います."""
+        def run() -> None:
+            try:
+                self.set(code, loader())
+            except Exception:
+                # 取得し直せなかった場合は古い情報を残しておく.
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.pop(code, None)
+
+        with self._lock:
+            if code in self._refreshing:
+                return
+            # コマンドの終了前に取得し直した情報を保存できるよう、デーモンスレッドにはしない.
+            thread = threading.Thread(target=run, name=f"revalidate-{code}")
+            self._refreshing[code] = thread
+        thread.start()
+
+    def _path(self, code: str) -> Path:
+        return self.cache_dir / f"{code}.json"
+
+    def _read_disk(self, code: str) -> Optional[Tuple[float, Any]]:
+        """ディスクキャッシュから読み込みます. 読めない場合は None を返します."""
+        if not self.cache_dir:
+            return None
+        try:
+            dat = json.loads(self._path(code).read_text(encoding="utf-8"))
+            return dat["fetched_at"], dat["info"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_disk(self, code: str, entry: Tuple[float, Any]) -> None:
+        """ディスクキャッシュに書き込みます. 書き込めない場合は何もしません."""
+        if not self.cache_dir:
+            return
+        p = self._path(code)
+        tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps({"fetched_at": entry[0], "info": entry[1]}, ensure_ascii=False),
+                           encoding="utf-8")
+            # 他のプロセスが書きかけのファイルを読まないよう、置き換えで保存する.
+            os.replace(str(tmp), str(p))
+        except (OSError, TypeError, ValueError):
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
@@ -4,127 +4,127 @@
 天気の情報の取得には以下の Web API を使用しています.
 - お天気Webサービス（Livedoor Weather Web Service / LWWS）
 http://weather.livedoor.com/weather_hacks/webservice
+
+コマンドの起動を速くするため、requests や HTTP サーバーなど読み込みに時間がかかるモジュールは
+使うときに読み込みます. キャッシュから表示する場合はこれらを読み込みません.
 """
 
 import argparse
-from typing import Dict, Sequence, Union
-
-import requests
-
-URL_BASE = "http://weather.livedoor.com/forecast/webservice/json/v1"
-PLACESS = {
-    "Hokkaido": "016010",
-    "Aomori": "020010",
-    "Miyagi": "040010",
-    "Akita": "050010",
-    "Yamagata": "060010",
-    "Fukushima": "070010",
-    "Ibaraki": "080010",
-    "Tochigi": "090010",
-    "Gunma": "100010",
-    "Saitama": "110010",
-    "Chiba": "120010",
-    "Tokyo": "130010",
-    "Kanagawa": "140010",
-    "Niigata": "150010",
-    "Toyama": "160010",
-    "Ishikawa": "170010",
-    "Fukui": "180010",
-    "Yamanashi": "190010",
-    "Nagano": "200010",
-    "Gifu": "210010",
-    "Shizuoka": "220010",
-    "Aichi": "230010",
-    "Mie": "240010",
-    "Shiga": "250010",
-    "Kyoto": "260010",
-    "Osaka": "270000",
-    "Hyogo": "280010",
-    "Nara": "290010",
-    "Wakayama": "300010",
-    "Tottori": "310010",
-    "Shimane": "320010",
-    "Okayama": "330010",
-    "Hiroshima": "340010",
-    "Yamaguchi": "350010",
-    "Tokushima": "360010",
-    "Kagawa": "370000",
-    "Ehime": "380010",
-    "Kochi": "390010",
-    "Fukuoka": "400010",
-    "Saga": "410010",
-    "Nagasaki": "420010",
-    "Kumamoto": "430010",
-    "Oita": "440010",
-    "Miyazaki": "450010",
-    "Kagoshima": "460010",
-    "Okinawa": "471010"}
-
-
-def get_information(place: str) -> Dict[str, Union[str, Sequence[Dict[str, str]]]]:
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+from weather_checker.cache import DEFAULT_TTL, ForecastCache
+from weather_checker.client import URL_BASE, Transport, WeatherClient
+from weather_checker.decoder import decode_report
+from weather_checker.model import WeatherReport, as_report
+from weather_checker.places import PLACESS, UnknownPlaceError, resolve_place, suggest_places
+from weather_checker.render import FORMATS, format_message, render_reports
+
+# 全都道府県を指定するための地名.
+PLACE_ALL = "all"
+# 一括取得時の同時接続数の上限.
+MAX_WORKERS = 8
+# コマンドで使用するディスクキャッシュのディレクトリ.
+CACHE_DIR = Path.home() / ".weather_checker" / "cache"
+# 常駐プロセスの URL を指定する環境変数.
+DAEMON_ENV = "WEATHER_DAEMON"
+# 常駐プロセスが待ち受けるアドレスとポート番号の既定値.
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+# 常駐プロセスが情報を取得し直す間隔(秒)の既定値.
+DAEMON_INTERVAL = 10 * 60
+
+# 従来の辞書の形式の天気の情報.
+WeatherInfo = Dict[str, Union[str, Sequence[Dict[str, str]]]]
+# 一括取得時に地名ごとのエラーとして扱う例外.
+# requests.RequestException は OSError を継承しているため、requests を読み込まずに捕まえられる.
+FETCH_ERRORS = (ValueError, KeyError, IndexError, OSError)
+
+# プロセス内で共有するクライアント.
+_default_client: Optional[WeatherClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> WeatherClient:
+    """プロセス内で共有するクライアントを返します. 初回の呼び出し時に生成します."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = WeatherClient(URL_BASE, pool_maxsize=MAX_WORKERS)
+        return _default_client
+
+
+def get_information(place: str, client: Optional[Transport] = None,
+                    cache: Optional[ForecastCache] = None, fuzzy: bool = False) -> WeatherReport:
     """Web API から天気と天気概況を取得します.
 
-    :params place: 都道府県名(ローマ字)
-    :return: 天気予報と天気概況の文字列が入った辞書.
+    :params place: 都道府県名(ローマ字). 都市コードや漢字・かなの都道府県名、前方一致でも指定できます.
+    :params client: 使用するクライアント. ReplayTransport など Transport を継承したものを指定できます.
+                   省略した場合はプロセス内で共有するクライアントを使います.
+    :params cache: 使用するキャッシュ. 省略した場合は毎回 Web API から取得します.
+    :params fuzzy: True の場合、ローマ字の綴りの誤りを考慮して地名を探します.
+    :return: 天気予報と天気概況.
+    """
+    code = PLACESS[resolve_place(place, fuzzy)]
+    if cache is not None:
+        # ディスクキャッシュから読み込んだ情報はリストになっているので変換する.
+        # キャッシュにある場合はクライアントを生成しない.
+        return as_report(cache.fetch(code, lambda: _fetch_information(code, client or get_default_client())))
+    return _fetch_information(code, client or get_default_client())
+
+
+def _fetch_information(code: str, client: Transport) -> WeatherReport:
+    """Web API から指定した都市コードの天気と天気概況を取得します.
+
+    :params code: 都市コード.
+    :params client: 使用するクライアント.
+    :return: 天気予報と天気概況.
     """
-    if place not in PLACESS.keys():
-        raise ValueError(f"Unknown place: {place}")
-
-    # Web サービスから情報を取得する.
-    args = f"?city={PLACESS[place]}"
-    url = URL_BASE + args
-    ret = requests.get(url)
-    dat = ret.json()
-
-    # 必要な情報を辞書にして返す.
-    return {
-        # 地名
-        "place": dat["title"].split(" ")[0],
-        # 天気概況
-        "description": dat["description"]["text"],
-        # 予報
-        "forecasts": [
-            # 今日
-            {"weather": dat["forecasts"][0]["telop"],
-             "temp_min": dat["forecasts"][0]["temperature"]["min"],
-             "temp_max": dat["forecasts"][0]["temperature"]["max"]},
-            # 明日
-            {"weather": dat["forecasts"][1]["telop"],
-             "temp_min": dat["forecasts"][1]["temperature"]["min"],
-             "temp_max": dat["forecasts"][1]["temperature"]["max"]},
-            # 明後日
-            {"weather": dat["forecasts"][2]["telop"],
-             "temp_min": dat["forecasts"][2]["temperature"]["min"],
-             "temp_max": dat["forecasts"][2]["temperature"]["max"]}]}
-
-
-def create_message(weather_info: Dict[str, Union[str, Sequence[Dict[str, str]]]]) -> str:
+    # Web サービスから情報を取得し、必要な項目だけを取り出す.
+    return decode_report(client.fetch(code))
+
+
+def get_information_many(places: Sequence[str], max_workers: int = MAX_WORKERS,
+                         cache: Optional[ForecastCache] = None, client: Optional[Transport] = None,
+                         fuzzy: bool = False) -> List[Union[WeatherReport, Exception]]:
+    """複数の都道府県の天気と天気概況をまとめて取得します.
+
+    スレッドプールで並列に取得し、接続は一つのクライアントで共有します.
+
+    :params places: 都道府県名(ローマ字)のリスト.
+    :params max_workers: 同時に接続する数の上限.
+    :params cache: 使用するキャッシュ. 省略した場合は毎回 Web API から取得します.
+    :params client: 使用するクライアント. 省略した場合はプロセス内で共有するクライアントを使います.
+                   キャッシュにない地名を取得するときに生成します.
+    :params fuzzy: True の場合、ローマ字の綴りの誤りを考慮して地名を探します.
+    :return: places と同じ順番に並べた結果のリスト.
+             取得に失敗した地名の要素には、その例外(FETCH_ERRORS 以外も含む)が入ります.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(get_information, place, client, cache, fuzzy) for place in places]
+        results: List[Union[WeatherReport, Exception]] = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # 一つの地名の予期しない例外で、他の地名の結果を失わないようにする.
+                results.append(e)
+
+    return results
+
+
+def create_message(weather_info: Union[WeatherReport, WeatherInfo]) -> str:
     """表示するためのメッセージを作る.
 
-    :param weather_info: 天気の情報が入った辞書.
+    :param weather_info: 天気の情報. 従来の辞書の形式も受け付けます.
     :return: 表示要文字列.
     """
-    dat = weather_info
-    d1_w = dat["forecasts"][0]["weather"]
-    d2_w = dat["forecasts"][1]["weather"]
-    d3_w = dat["forecasts"][2]["weather"]
-    # None の場合は -- にしておく.
-    d1_min = dat["forecasts"][0]["temp_min"]["celsius"] if dat["forecasts"][0]["temp_min"] else "--"
-    d1_max = dat["forecasts"][0]["temp_max"]["celsius"] if dat["forecasts"][0]["temp_max"] else "--"
-    d2_min = dat["forecasts"][1]["temp_min"]["celsius"] if dat["forecasts"][1]["temp_min"] else "--"
-    d2_max = dat["forecasts"][1]["temp_max"]["celsius"] if dat["forecasts"][1]["temp_max"] else "--"
-    d3_min = dat["forecasts"][2]["temp_min"]["celsius"] if dat["forecasts"][2]["temp_min"] else "--"
-    d3_max = dat["forecasts"][2]["temp_max"]["celsius"] if dat["forecasts"][2]["temp_max"] else "--"
-    desc = dat["description"]
-
-    # 書式を整えた文字列を返す.
-    return f"""{dat["place"]} の天気
--------------------------------------------------------------------
-今日　: {d1_w}{" "*(8-len(d1_w*2))}    最低気温:{d1_min:>3}℃    最高気温:{d1_max:>3}℃
-明日　: {d2_w}{" "*(8-len(d2_w*2))}    最低気温:{d2_min:>3}℃    最高気温:{d2_max:>3}℃
-明後日: {d3_w}{" "*(8-len(d3_w*2))}    最低気温:{d3_min:>3}℃    最高気温:{d3_max:>3}℃
--------------------------------------------------------------------
-{desc}"""
+    return format_message(as_report(weather_info))
 
 
 def entry_point() -> int:
@@ -132,20 +132,94 @@ def entry_point() -> int:
     parser = argparse.ArgumentParser(
         prog="weather", description="指定地域の天気と天気概況を表示します.")
     # コマンドラインオプションの設定.
-    parser.add_argument("-p", "--place", help="都道府県名を指定します.")
+    parser.add_argument("-p", "--place", action="append",
+                        help=f"都道府県名を指定します. 都市コードや漢字・かなでも指定できます. "
+                             f"複数回指定でき、{PLACE_ALL} で全都道府県を表示します.")
+    parser.add_argument("--fuzzy", help="綴りの誤りを考慮して地名を探します.", action="store_true")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="text",
+                        help="出力の形式を指定します. 既定値は text です.")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL,
+                        help=f"キャッシュの有効期限(秒)を指定します. 既定値は {DEFAULT_TTL} 秒です.")
+    parser.add_argument("--no-cache", help="キャッシュを使わずに取得します.", action="store_true")
+    parser.add_argument("--record", metavar="DIR",
+                        help="Web API の応答を指定したディレクトリに保存します.")
+    parser.add_argument("--replay", metavar="DIR",
+                        help="Web API の代わりに、指定したディレクトリに保存した応答を使います.")
+    parser.add_argument("--daemon", default=os.environ.get(DAEMON_ENV),
+                        help=f"常駐プロセスの URL を指定します. 環境変数 {DAEMON_ENV} でも指定できます.")
+    # weather serve で常駐プロセスを起動する.
+    subparsers = parser.add_subparsers(dest="command")
+    serve_parser = subparsers.add_parser("serve", help="常駐プロセスとして起動します.")
+    serve_parser.add_argument("--host", default=DAEMON_HOST,
+                              help=f"待ち受けるアドレスを指定します. 既定値は {DAEMON_HOST} です.")
+    serve_parser.add_argument("--port", type=int, default=DAEMON_PORT,
+                              help=f"待ち受けるポート番号を指定します. 既定値は {DAEMON_PORT} です.")
+    serve_parser.add_argument("--interval", type=float, default=DAEMON_INTERVAL,
+                              help=f"情報を取得し直す間隔(秒)を指定します. 既定値は {DAEMON_INTERVAL} 秒です.")
     args = vars(parser.parse_args())
-    # 指定がない場合は Tokyo をデフォルトとしておく.
-    place = args["place"] if args["place"] else "Tokyo"
-    try:
-        info = get_information(place)
-        mes = create_message(info)
-        #  結果を表示.
-        print(mes)
 
+    if args["command"] == "serve":
+        # 常駐プロセスのモジュールはこのモジュールを使うため、ここで読み込む.
+        from weather_checker import server
+        server.serve(args["host"], args["port"], args["interval"])
         return 0
-    except ValueError:
-        print(f"地名エラー: {place}")
-        return -1
+
+    cache = None if args["no_cache"] else ForecastCache(ttl=args["ttl"], cache_dir=CACHE_DIR)
+    client: Optional[Transport] = None
+    if args["replay"]:
+        from weather_checker.transport import ReplayTransport
+        # 保存した応答はキャッシュしない.
+        client = ReplayTransport(args["replay"])
+        cache = None
+    elif args["record"]:
+        from weather_checker.transport import RecordingTransport
+        client = RecordingTransport(args["record"], get_default_client())
+        cache = None
+    # 指定がない場合は Tokyo をデフォルトとしておく.
+    places = args["place"] if args["place"] else ["Tokyo"]
+    if PLACE_ALL in places:
+        places = list(PLACESS.keys())
+
+    results: Optional[List[Union[WeatherReport, Exception]]] = None
+    if args["daemon"] and client is None:
+        from weather_checker.server import query_daemon
+        try:
+            results = query_daemon(args["daemon"], places, fuzzy=args["fuzzy"])
+        except (OSError, ValueError):
+            # 常駐プロセスに接続できない場合は Web API から取得する.
+            pass
+
+    if results is None:
+        if len(places) == 1:
+            # 一地域だけの場合はスレッドを使わずに取得する.
+            try:
+                results = [get_information(places[0], client, cache, args["fuzzy"])]
+            except FETCH_ERRORS as e:
+                results = [e]
+        else:
+            # 複数の地名はまとめて取得する.
+            results = get_information_many(places, cache=cache, client=client, fuzzy=args["fuzzy"])
+
+    # エラーは text 形式の場合のみ結果と一緒に表示し、それ以外の形式では標準エラー出力に表示する.
+    err = sys.stdout if args["format"] == "text" else sys.stderr
+    reports = []
+    status = 0
+    for place, info in zip(places, results):
+        if isinstance(info, Exception):
+            if isinstance(info, UnknownPlaceError):
+                suggestions = suggest_places(place)
+                hint = f" (候補: {', '.join(suggestions)})" if suggestions else ""
+                print(f"地名エラー: {place}{hint}", file=err)
+            else:
+                print(f"取得エラー: {place}: {info}", file=err)
+            status = -1
+        else:
+            reports.append(info)
+
+    #  結果を指定された順番にまとめて表示.
+    render_reports(reports, args["format"], sys.stdout)
+
+    return status
 
 
 if __name__ == "__main__":
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""お天気Webサービス(LWWS)に接続するクライアントです.
+
+一つの requests.Session を使い回し、接続を維持(keep-alive)したまま取得します.
+前回の応答の ETag / Last-Modified を使った条件付きリクエストを送り、
+304 Not Modified が返った場合は前回の情報をそのまま返します.
+応答はデコードせずにそのまま返します. デコードは weather_checker.decoder で行います.
+
+requests は読み込みに時間がかかるため、WeatherClient を生成するときに読み込みます.
+キャッシュや常駐プロセスから情報を返す場合は読み込みません.
+"""
+
+import threading
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
+
+URL_BASE = "http://weather.livedoor.com/forecast/webservice/json/v1"
+# 接続とレスポンスの読み込みのタイムアウト(秒).
+DEFAULT_TIMEOUT = (3.05, 10)
+# 再試行の回数と、再試行の間隔を決める係数.
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.3
+# 接続プールに保持する接続の数.
+DEFAULT_POOL_MAXSIZE = 8
+# 再試行するステータスコード.
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class _Validator(NamedTuple):
+    """条件付きリクエストのために保持する前回の応答."""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    payload: bytes
+
+
+class Transport:
+    """都市コードを受け取り、Web API の応答を返すクラスの基底クラス.
+
+    get_information などに渡すクライアントは fetch() と close() を実装してください.
+    """
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def fetch(self, code: str) -> bytes:
+        """指定した都市コードの情報を取得します.
+
+        :param code: 都市コード.
+        :return: Web API が返した JSON.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """保持している資源を解放します."""
+        pass
+
+
+class WeatherClient(Transport):
+    """LWWS から天気の情報を取得するクライアント.
+
+    :Example:
+
+        >>> with WeatherClient() as client:
+        ...     payload = client.fetch("130010")
+        >>> decode_report(payload).place
+        '東京都'
+    """
+
+    def __init__(self, url_base: str = URL_BASE,
+                 timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES, backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE) -> None:
+        """コンストラクタ.
+
+        :param url_base: Web API の URL.
+        :param timeout: タイムアウト(秒). (接続, 読み込み) のタプルでも指定できます.
+        :param retries: 接続エラーやサーバーエラーの場合に再試行する回数.
+        :param backoff_factor: 再試行の間隔を決める係数.
+        :param pool_maxsize: 接続プールに保持する接続の数. 同時に取得するスレッド数に合わせてください.
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.url_base = url_base
+        self.timeout = timeout
+        retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=RETRY_STATUSES)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._validators: Dict[str, _Validator] = {}
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """保持している接続を閉じます."""
+        self.session.close()
+
+    def fetch(self, code: str) -> bytes:
+        """指定した都市コードの情報を取得します.
+
+        :param code: 都市コード.
+        :return: Web API が返した JSON.
+        """
+        with self._lock:
+            prev = self._validators.get(code)
+        headers = {}
+        if prev is not None:
+            if prev.etag:
+                headers["If-None-Match"] = prev.etag
+            if prev.last_modified:
+                headers["If-Modified-Since"] = prev.last_modified
+
+        ret = self.session.get(self.url_base, params={"city": code}, headers=headers,
+                               timeout=self.timeout)
+        if ret.status_code == 304 and prev is not None:
+            # 更新がないので前回の情報を使う.
+            return prev.payload
+
+        ret.raise_for_status()
+        dat = ret.content
+        etag = ret.headers.get("ETag")
+        last_modified = ret.headers.get("Last-Modified")
+        if etag or last_modified:
+            with self._lock:
+                self._validators[code] = _Validator(etag, last_modified, dat)
+        return dat
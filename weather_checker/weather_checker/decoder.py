@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""LWWS が返す JSON から必要な項目だけを取り出します.
+
+JSON のデコードには、インストールされていれば高速なライブラリを使います.
+使用するライブラリはインポート時に次の順番で選ばれます.
+
+1. orjson (``pip install weather[fast]`` でインストールされます.)
+2. ujson
+3. 標準ライブラリの json
+"""
+
+import json
+from typing import Any, Callable, Dict, Optional, Union
+
+from weather_checker.model import Forecast, WeatherReport
+
+loads: Callable[[Union[bytes, str]], Any]
+try:
+    import orjson
+    loads = orjson.loads
+    BACKEND = "orjson"
+except ImportError:
+    try:
+        import ujson
+        loads = ujson.loads
+        BACKEND = "ujson"
+    except ImportError:
+        loads = json.loads
+        BACKEND = "json"
+
+# 取り出す予報の日数(今日、明日、明後日).
+FORECAST_DAYS = 3
+
+
+def decode_report(payload: Union[bytes, str]) -> WeatherReport:
+    """Web API が返した JSON から天気予報と天気概況を取り出します.
+
+    pinpointLocations や copyright など使わない項目は、デコード後すぐに破棄されます.
+
+    :param payload: Web API が返した JSON.
+    :return: 天気予報と天気概況.
+    """
+    return report_from_payload(loads(payload))
+
+
+def report_from_payload(dat: Dict[str, Any]) -> WeatherReport:
+    """デコード済みの JSON から天気予報と天気概況を取り出します.
+
+    :param dat: Web API が返した JSON を辞書にしたもの.
+    :return: 天気予報と天気概況.
+    """
+    forecasts = dat["forecasts"]
+    if len(forecasts) < FORECAST_DAYS:
+        raise ValueError(f"Too few forecasts: {len(forecasts)}")
+
+    return WeatherReport(
+        # 地名
+        place=dat["title"].split(" ")[0],
+        # 天気概況
+        description=dat["description"]["text"],
+        # 今日、明日、明後日の予報
+        forecasts=tuple(Forecast(f["telop"],
+                                 _celsius(f["temperature"]["min"]),
+                                 _celsius(f["temperature"]["max"]))
+                        for f in forecasts[:FORECAST_DAYS]))
+
+
+def _celsius(temperature: Optional[Dict[str, str]]) -> Optional[str]:
+    """気温の項目から摂氏の値を取り出します. 予報がない場合は None を返します."""
+    return temperature["celsius"] if temperature else None
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""天気の情報を保持する型です.
+
+辞書ではなく NamedTuple で保持するため、インスタンスごとに辞書を持たず、
+大量の情報を保持してもメモリを圧迫しません.
+"""
+
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple, Union
+
+
+class Forecast(NamedTuple):
+    """一日分の予報.
+
+    :param weather: 天気. 例) 晴時々曇
+    :param temp_min: 最低気温(摂氏). 予報がない場合は None.
+    :param temp_max: 最高気温(摂氏). 予報がない場合は None.
+    """
+
+    weather: str
+    temp_min: Optional[str]
+    temp_max: Optional[str]
+
+    @classmethod
+    def from_dict(cls, dat: Dict[str, Any]) -> "Forecast":
+        """辞書の形式から変換します.
+
+        気温は従来の {"celsius": "30"} の形式と、文字列のみの形式を受け付けます.
+        """
+        return cls(dat["weather"], _celsius(dat["temp_min"]), _celsius(dat["temp_max"]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """従来の辞書の形式に変換します."""
+        return {"weather": self.weather,
+                "temp_min": {"celsius": self.temp_min} if self.temp_min is not None else None,
+                "temp_max": {"celsius": self.temp_max} if self.temp_max is not None else None}
+
+
+class WeatherReport(NamedTuple):
+    """ある地域の天気予報と天気概況.
+
+    :param place: 地名. 例) 東京都
+    :param description: 天気概況.
+    :param forecasts: 今日、明日、明後日の予報.
+    """
+
+    place: str
+    description: str
+    forecasts: Tuple[Forecast, ...]
+
+    @classmethod
+    def from_dict(cls, dat: Dict[str, Any]) -> "WeatherReport":
+        """辞書の形式から変換します."""
+        return cls(dat["place"], dat["description"],
+                   tuple(Forecast.from_dict(f) for f in dat["forecasts"]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """従来の辞書の形式に変換します."""
+        return {"place": self.place,
+                "description": self.description,
+                "forecasts": [f.to_dict() for f in self.forecasts]}
+
+
+def as_report(dat: Union[WeatherReport, Dict[str, Any], Sequence[Any]]) -> WeatherReport:
+    """天気の情報を WeatherReport に変換します.
+
+    辞書の形式と、JSON に保存したときのリストの形式を受け付けます.
+
+    :param dat: 天気の情報.
+    :return: 天気予報と天気概況.
+    """
+    if isinstance(dat, WeatherReport):
+        return dat
+    if isinstance(dat, dict):
+        return WeatherReport.from_dict(dat)
+    place, description, forecasts = dat
+    return WeatherReport(place, description, tuple(Forecast(*f) for f in forecasts))
+
+
+def _celsius(temperature: Union[Dict[str, str], str, None]) -> Optional[str]:
+    """気温の項目から摂氏の値を取り出します."""
+    if isinstance(temperature, dict):
+        return temperature["celsius"]
+    return temperature or None
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""地名から都市コードを引くための索引です.
+
+次のいずれの形式でも地名を指定できます. 索引はインポート時に一度だけ作ります.
+
+- 都道府県名(ローマ字). 大文字・小文字、全角・半角、長音記号(Tōkyō)は区別しません.
+- 都市コード. 例) 130010
+- 都道府県名(漢字). 例) 東京都, 東京
+- 都道府県名(ひらがな・カタカナ). 例) とうきょう, トウキョウ
+- Web API が返す地名. 例) 道央
+- 一意に決まる前方一致. 例) toky, 和歌
+- fuzzy=True を指定した場合は、ローマ字の綴りの誤り. 例) Tokio
+"""
+
+import difflib
+import unicodedata
+from typing import Dict, List, Set
+
+PLACESS = {
+    "Hokkaido": "016010",
+    "Aomori": "020010",
+    "Miyagi": "040010",
+    "Akita": "050010",
+    "Yamagata": "060010",
+    "Fukushima": "070010",
+    "Ibaraki": "080010",
+    "Tochigi": "090010",
+    "Gunma": "100010",
+    "Saitama": "110010",
+    "Chiba": "120010",
+    "Tokyo": "130010",
+    "Kanagawa": "140010",
+    "Niigata": "150010",
+    "Toyama": "160010",
+    "Ishikawa": "170010",
+    "Fukui": "180010",
+    "Yamanashi": "190010",
+    "Nagano": "200010",
+    "Gifu": "210010",
+    "Shizuoka": "220010",
+    "Aichi": "230010",
+    "Mie": "240010",
+    "Shiga": "250010",
+    "Kyoto": "260010",
+    "Osaka": "270000",
+    "Hyogo": "280010",
+    "Nara": "290010",
+    "Wakayama": "300010",
+    "Tottori": "310010",
+    "Shimane": "320010",
+    "Okayama": "330010",
+    "Hiroshima": "340010",
+    "Yamaguchi": "350010",
+    "Tokushima": "360010",
+    "Kagawa": "370000",
+    "Ehime": "380010",
+    "Kochi": "390010",
+    "Fukuoka": "400010",
+    "Saga": "410010",
+    "Nagasaki": "420010",
+    "Kumamoto": "430010",
+    "Oita": "440010",
+    "Miyazaki": "450010",
+    "Kagoshima": "460010",
+    "Okinawa": "471010"}
+
+# 都道府県名(ローマ字) -> (漢字, ひらがな)
+JAPANESE_NAMES = {
+    "Hokkaido": ("北海道", "ほっかいどう"),
+    "Aomori": ("青森県", "あおもり"),
+    "Miyagi": ("宮城県", "みやぎ"),
+    "Akita": ("秋田県", "あきた"),
+    "Yamagata": ("山形県", "やまがた"),
+    "Fukushima": ("福島県", "ふくしま"),
+    "Ibaraki": ("茨城県", "いばらき"),
+    "Tochigi": ("栃木県", "とちぎ"),
+    "Gunma": ("群馬県", "ぐんま"),
+    "Saitama": ("埼玉県", "さいたま"),
+    "Chiba": ("千葉県", "ちば"),
+    "Tokyo": ("東京都", "とうきょう"),
+    "Kanagawa": ("神奈川県", "かながわ"),
+    "Niigata": ("新潟県", "にいがた"),
+    "Toyama": ("富山県", "とやま"),
+    "Ishikawa": ("石川県", "いしかわ"),
+    "Fukui": ("福井県", "ふくい"),
+    "Yamanashi": ("山梨県", "やまなし"),
+    "Nagano": ("長野県", "ながの"),
+    "Gifu": ("岐阜県", "ぎふ"),
+    "Shizuoka": ("静岡県", "しずおか"),
+    "Aichi": ("愛知県", "あいち"),
+    "Mie": ("三重県", "みえ"),
+    "Shiga": ("滋賀県", "しが"),
+    "Kyoto": ("京都府", "きょうと"),
+    "Osaka": ("大阪府", "おおさか"),
+    "Hyogo": ("兵庫県", "ひょうご"),
+    "Nara": ("奈良県", "なら"),
+    "Wakayama": ("和歌山県", "わかやま"),
+    "Tottori": ("鳥取県", "とっとり"),
+    "Shimane": ("島根県", "しまね"),
+    "Okayama": ("岡山県", "おかやま"),
+    "Hiroshima": ("広島県", "ひろしま"),
+    "Yamaguchi": ("山口県", "やまぐち"),
+    "Tokushima": ("徳島県", "とくしま"),
+    "Kagawa": ("香川県", "かがわ"),
+    "Ehime": ("愛媛県", "えひめ"),
+    "Kochi": ("高知県", "こうち"),
+    "Fukuoka": ("福岡県", "ふくおか"),
+    "Saga": ("佐賀県", "さが"),
+    "Nagasaki": ("長崎県", "ながさき"),
+    "Kumamoto": ("熊本県", "くまもと"),
+    "Oita": ("大分県", "おおいた"),
+    "Miyazaki": ("宮崎県", "みやざき"),
+    "Kagoshima": ("鹿児島県", "かごしま"),
+    "Okinawa": ("沖縄県", "おきなわ")}
+
+# Web API の title に含まれる、都道府県名以外の地名.
+ALIASES = {
+    "道央": "Hokkaido"}
+
+# 長音記号付きのローマ字を置き換える表.
+_MACRONS = str.maketrans("āīūēōâîûêô", "aiueoaiueo")
+# ひらがなをカタカナに置き換える表.
+_KATAKANA = str.maketrans({chr(c): chr(c + 0x60) for c in range(ord("ぁ"), ord("ゖ") + 1)})
+
+
+class UnknownPlaceError(ValueError):
+    """指定された地名が不明な場合の例外."""
+
+
+def normalize(name: str) -> str:
+    """索引のキーに使うために地名を正規化します.
+
+    全角英数字を半角にし、小文字にして、長音記号と前後の空白を取り除きます.
+
+    :param name: 地名.
+    :return: 正規化した地名.
+    """
+    return unicodedata.normalize("NFKC", name).strip().lower().translate(_MACRONS)
+
+
+def _build_index() -> Dict[str, str]:
+    """正規化した地名 -> 都道府県名(ローマ字) の索引を作ります."""
+    index: Dict[str, str] = {}
+    for place, code in PLACESS.items():
+        kanji, hiragana = JAPANESE_NAMES[place]
+        keys = [place, code, kanji, hiragana, hiragana.translate(_KATAKANA)]
+        # 都・府・県を省いた名前でも引けるようにする. 北海道は省かない.
+        if kanji[-1] in "都府県":
+            keys.append(kanji[:-1])
+        for key in keys:
+            index[normalize(key)] = place
+    for alias, place in ALIASES.items():
+        index[normalize(alias)] = place
+    return index
+
+
+def _build_trie(keys: Dict[str, str]) -> Dict[str, Set[str]]:
+    """前方一致のための索引を作ります.
+
+    各接頭辞に、その接頭辞で始まるキーの都道府県名(ローマ字)の集合を対応させます.
+    検索は接頭辞の長さ k に対して O(k) で済みます.
+    """
+    trie: Dict[str, Set[str]] = {}
+    for key, place in keys.items():
+        for i in range(1, len(key) + 1):
+            trie.setdefault(key[:i], set()).add(place)
+    return trie
+
+
+# 都市コード -> 都道府県名(ローマ字)
+CODE_TO_PLACE = {code: place for place, code in PLACESS.items()}
+# 正規化した地名 -> 都道府県名(ローマ字)
+NAME_INDEX = _build_index()
+# 接頭辞 -> 都道府県名(ローマ字)の集合
+PREFIX_INDEX = _build_trie(NAME_INDEX)
+# 綴りの誤りを探すための、ローマ字の地名の一覧.
+_ROMAJI = {normalize(place): place for place in PLACESS}
+
+
+def resolve_place(name: str, fuzzy: bool = False) -> str:
+    """地名を PLACESS のキーである都道府県名(ローマ字)に変換します.
+
+    :param name: 地名. 受け付ける形式はモジュールの説明を参照してください.
+    :param fuzzy: True の場合、一致しなければローマ字の綴りの誤りを考慮して探します.
+    :return: 都道府県名(ローマ字).
+    :raises UnknownPlaceError: 地名が不明、もしくは一意に決まらない場合.
+
+    :Example:
+
+        >>> resolve_place("東京都")
+        'Tokyo'
+        >>> resolve_place("471010")
+        'Okinawa'
+    """
+    # 正しい形式で指定された場合は正規化しない.
+    if name in PLACESS:
+        return name
+    key = normalize(name)
+    place = NAME_INDEX.get(key)
+    if place is not None:
+        return place
+
+    candidates = PREFIX_INDEX.get(key, set()) if key else set()
+    if len(candidates) == 1:
+        return next(iter(candidates))
+    if fuzzy:
+        matches = difflib.get_close_matches(key, _ROMAJI.keys(), n=1, cutoff=0.75)
+        if matches:
+            return _ROMAJI[matches[0]]
+    if candidates:
+        raise UnknownPlaceError(f"Ambiguous place: {name} ({', '.join(sorted(candidates))})")
+    raise UnknownPlaceError(f"Unknown place: {name}")
+
+
+def suggest_places(name: str, n: int = 3) -> List[str]:
+    """地名の候補を返します.
+
+    :param name: 地名.
+    :param n: 返す候補の数の上限.
+    :return: 都道府県名(ローマ字)のリスト.
+    """
+    key = normalize(name)
+    candidates = sorted(PREFIX_INDEX.get(key, set()))
+    matches = difflib.get_close_matches(key, _ROMAJI.keys(), n=n, cutoff=0.6)
+    candidates += [_ROMAJI[m] for m in matches if _ROMAJI[m] not in candidates]
+    return candidates[:n]
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""天気の情報を表示用の文字列に整形します.
+
+複数の地域の情報を一つのバッファにまとめて整形し、一度に書き出します.
+出力の形式は次の三つです.
+
+- text: 人が読むための形式. 天気の幅は全角・半角を考慮して揃えます.
+- tsv: 一行に一日分の予報を並べた形式.
+- jsonl: 一行に一地域分の情報を JSON にした形式.
+"""
+
+import io
+import json
+import unicodedata
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional, TextIO
+
+from weather_checker.model import WeatherReport
+
+FORMATS = ("text", "tsv", "jsonl")
+# 表示する日の名称.
+DAY_LABELS = ("今日　", "明日　", "明後日")
+# 天気を表示する幅(半角の文字数).
+WEATHER_WIDTH = 8
+RULE = "-" * 67
+TSV_HEADER = "place\tday\tweather\ttemp_min\ttemp_max\n"
+
+
+@lru_cache(maxsize=4096)
+def display_width(s: str) -> int:
+    """端末に表示したときの幅を返します. 全角文字は 2 として数えます.
+
+    :param s: 文字列.
+    :return: 表示幅(半角の文字数).
+    """
+    return sum(2 if unicodedata.east_asian_width(c) in ("W", "F") else 1 for c in s)
+
+
+@lru_cache(maxsize=1024)
+def pad(s: str, width: int) -> str:
+    """表示幅が width になるように、文字列の後ろを空白で埋めます.
+
+    :param s: 文字列.
+    :param width: 表示幅(半角の文字数).
+    :return: 空白で埋めた文字列. 幅を超えている場合はそのまま返します.
+    """
+    return s + " " * (width - display_width(s))
+
+
+def _write_text(report: WeatherReport, write: Callable[[str], Any]) -> None:
+    """text 形式で書き込みます."""
+    write(f"{report.place} の天気\n{RULE}\n")
+    for label, forecast in zip(DAY_LABELS, report.forecasts):
+        # None の場合は -- にしておく.
+        t_min = forecast.temp_min if forecast.temp_min is not None else "--"
+        t_max = forecast.temp_max if forecast.temp_max is not None else "--"
+        write(f"{label}: {pad(forecast.weather, WEATHER_WIDTH)}    "
+              f"最低気温:{t_min:>3}℃    最高気温:{t_max:>3}℃\n")
+    write(f"{RULE}\n{report.description}")
+
+
+def _write_tsv(report: WeatherReport, write: Callable[[str], Any]) -> None:
+    """tsv 形式で書き込みます. 予報がない気温は空欄にします."""
+    for day, forecast in enumerate(report.forecasts):
+        write(f"{report.place}\t{day}\t{forecast.weather}\t"
+              f"{forecast.temp_min or ''}\t{forecast.temp_max or ''}\n")
+
+
+def _write_jsonl(report: WeatherReport, write: Callable[[str], Any]) -> None:
+    """jsonl 形式で書き込みます."""
+    write(json.dumps({"place": report.place,
+                      "description": report.description,
+                      "forecasts": [f._asdict() for f in report.forecasts]},
+                     ensure_ascii=False, separators=(",", ":")))
+    write("\n")
+
+
+def format_message(report: WeatherReport) -> str:
+    """一地域分の情報を text 形式に整形します.
+
+    :param report: 天気予報と天気概況.
+    :return: 表示用文字列.
+    """
+    buf = io.StringIO()
+    _write_text(report, buf.write)
+    return buf.getvalue()
+
+
+def render_reports(reports: Iterable[WeatherReport], fmt: str = "text",
+                   out: Optional[TextIO] = None) -> str:
+    """複数の地域の情報をまとめて整形します.
+
+    :param reports: 天気予報と天気概況のリスト.
+    :param fmt: 出力の形式. text, tsv, jsonl のいずれか.
+    :param out: 書き出し先. 指定した場合は整形した文字列を一度に書き込みます.
+    :return: 整形した文字列.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+
+    buf = io.StringIO()
+    write = buf.write
+    if fmt == "text":
+        for i, report in enumerate(reports):
+            # 地域の間は空行で区切る.
+            write("\n\n" if i else "")
+            _write_text(report, write)
+        if buf.tell():
+            write("\n")
+    elif fmt == "tsv":
+        write(TSV_HEADER)
+        for report in reports:
+            _write_tsv(report, write)
+    else:
+        for report in reports:
+            _write_jsonl(report, write)
+
+    ret = buf.getvalue()
+    if out is not None:
+        out.write(ret)
+    return ret
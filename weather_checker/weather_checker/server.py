@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""天気の情報を保持し続け、ローカルの HTTP で返す常駐プロセスです.
+
+``weather serve`` で起動します. 全都道府県の情報を一定の間隔で取得し直し、
+メモリ上に保持した情報を次のエンドポイントから返します.
+
+- GET /weather?place=Tokyo&place=Osaka&format=json
+  format には json (既定値), text, tsv, jsonl を指定できます.
+  fuzzy=1 を指定した場合は、ローマ字の綴りの誤りを考慮して地名を探します. (weather --fuzzy と同じ)
+- GET /stats
+  保持している情報の件数や最後に取得した時刻を返します.
+
+``weather`` コマンドは ``--daemon`` もしくは環境変数 WEATHER_DAEMON に
+常駐プロセスの URL が指定されている場合、Web API ではなく常駐プロセスから情報を取得します.
+"""
+
+import json
+import random
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from weather_checker.checker import (DAEMON_HOST, DAEMON_INTERVAL, DAEMON_PORT, FETCH_ERRORS, MAX_WORKERS,
+                                    get_information, get_information_many)
+from weather_checker.client import Transport, WeatherClient
+from weather_checker.model import WeatherReport, as_report
+from weather_checker.places import PLACESS, UnknownPlaceError, resolve_place
+from weather_checker.render import FORMATS, render_reports
+
+DEFAULT_HOST = DAEMON_HOST
+DEFAULT_PORT = DAEMON_PORT
+# 情報を取得し直す間隔(秒)と、その揺らぎの割合.
+DEFAULT_INTERVAL = DAEMON_INTERVAL
+DEFAULT_JITTER = 0.1
+# 常駐プロセスに問い合わせるときのタイムアウト(秒).
+QUERY_TIMEOUT = 2.0
+
+
+class WeatherDaemon:
+    """指定した地域の情報を定期的に取得し、メモリ上に保持するクラス."""
+
+    def __init__(self, places: Optional[Sequence[str]] = None, interval: float = DEFAULT_INTERVAL,
+                 jitter: float = DEFAULT_JITTER, max_workers: int = MAX_WORKERS,
+                 client: Optional[Transport] = None) -> None:
+        """コンストラクタ.
+
+        :param places: 取得する都道府県名(ローマ字)のリスト. 省略した場合は全都道府県を取得します.
+        :param interval: 情報を取得し直す間隔(秒).
+        :param jitter: 間隔の揺らぎの割合. 複数のプロセスが同時に取得しないようにします.
+        :param max_workers: 同時に接続する数の上限.
+        :param client: 使用するクライアント. 省略した場合は同時接続数に合わせて生成します.
+        """
+        self.places = list(places) if places else list(PLACESS.keys())
+        self.interval = interval
+        self.jitter = jitter
+        self.max_workers = max_workers
+        self.client = client or WeatherClient(pool_maxsize=max_workers)
+        self.refreshes = 0
+        self.updated_at: Optional[float] = None
+        self._reports: Dict[str, WeatherReport] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """保持している情報の件数、取得し直した回数、最後に取得した時刻、エラーを返します."""
+        with self._lock:
+            return {"places": len(self._reports), "refreshes": self.refreshes,
+                    "updated_at": self.updated_at, "errors": dict(self._errors)}
+
+    def refresh(self) -> None:
+        """全ての地域の情報を取得し直します. 取得に失敗した地域は前回の情報を残します."""
+        results = get_information_many(self.places, self.max_workers, client=self.client)
+        with self._lock:
+            for place, info in zip(self.places, results):
+                if isinstance(info, Exception):
+                    self._errors[place] = str(info)
+                else:
+                    self._reports[place] = info
+                    self._errors.pop(place, None)
+            self.refreshes += 1
+            self.updated_at = time.time()
+
+    def get(self, place: str, fuzzy: bool = False) -> WeatherReport:
+        """保持している情報を返します. まだ保持していない地域はその場で取得します.
+
+        :param place: 都道府県名(ローマ字). 都市コードや漢字・かなの都道府県名でも指定できます.
+        :param fuzzy: True の場合、ローマ字の綴りの誤りを考慮して地名を探します.
+        :return: 天気予報と天気概況.
+        """
+        place = resolve_place(place, fuzzy)
+        with self._lock:
+            report = self._reports.get(place)
+        if report is None:
+            report = get_information(place, self.client)
+            with self._lock:
+                self._reports[place] = report
+        return report
+
+    def start(self) -> None:
+        """別スレッドで定期的な取得を開始します."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="weather-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """定期的な取得を停止します."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """WeatherServer のリクエストを処理するクラス."""
+
+    server: "WeatherServer"
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        if url.path == "/weather":
+            fuzzy = query.get("fuzzy", ["0"])[0] in ("1", "true")
+            self._weather(query.get("place", ["Tokyo"]), query.get("format", ["json"])[0], fuzzy)
+        elif url.path == "/stats":
+            self._send(200, json.dumps(self.server.weather.stats), "application/json")
+        else:
+            self._send(404, "Not Found", "text/plain")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # シェルから頻繁に呼ばれるため、アクセスログは出力しない.
+        pass
+
+    def _weather(self, places: List[str], fmt: str, fuzzy: bool = False) -> None:
+        if fmt != "json" and fmt not in FORMATS:
+            self._send(400, f"Unknown format: {fmt}", "text/plain")
+            return
+
+        results: List[Union[WeatherReport, Exception]] = []
+        for place in places:
+            try:
+                results.append(self.server.weather.get(place, fuzzy))
+            except FETCH_ERRORS as e:
+                results.append(e)
+
+        if fmt == "json":
+            # 指定された順番に、情報もしくはエラーを並べて返す.
+            body = json.dumps([_to_json(x) for x in results], ensure_ascii=False)
+            self._send(200, body, "application/json")
+        else:
+            reports = [x for x in results if isinstance(x, WeatherReport)]
+            self._send(200, render_reports(reports, fmt), "text/plain")
+
+    def _send(self, status: int, body: str, content_type: str) -> None:
+        dat = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(dat)))
+        self.end_headers()
+        self.wfile.write(dat)
+
+
+class WeatherServer(ThreadingMixIn, HTTPServer):
+    """WeatherDaemon が保持している情報を返す HTTP サーバー."""
+
+    daemon_threads = True
+
+    def __init__(self, weather: WeatherDaemon, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        """コンストラクタ.
+
+        :param weather: 情報を保持している WeatherDaemon.
+        :param host: 待ち受けるアドレス.
+        :param port: 待ち受けるポート番号. 0 の場合は空いているポートを使います.
+        """
+        super().__init__((host, port), _Handler)
+        self.weather = weather
+
+    @property
+    def url(self) -> str:
+        """サーバーの URL を返します."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def _to_json(info: Union[WeatherReport, Exception]) -> Dict[str, Any]:
+    """情報もしくはエラーを JSON にできる辞書に変換します."""
+    if isinstance(info, WeatherReport):
+        return {"place": info.place, "description": info.description,
+                "forecasts": [f._asdict() for f in info.forecasts]}
+    kind = "unknown_place" if isinstance(info, UnknownPlaceError) else "fetch_error"
+    return {"error": str(info), "type": kind}
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, interval: float = DEFAULT_INTERVAL,
+          max_workers: int = MAX_WORKERS) -> None:
+    """常駐プロセスを起動します. Ctrl-C で終了します.
+
+    :param host: 待ち受けるアドレス.
+    :param port: 待ち受けるポート番号.
+    :param interval: 情報を取得し直す間隔(秒).
+    :param max_workers: 同時に接続する数の上限.
+    """
+    weather = WeatherDaemon(interval=interval, max_workers=max_workers)
+    server = WeatherServer(weather, host, port)
+    weather.start()
+    print(f"serving on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        weather.stop()
+
+
+def query_daemon(url: str, places: Sequence[str], timeout: float = QUERY_TIMEOUT,
+                 fuzzy: bool = False) -> List[Union[WeatherReport, Exception]]:
+    """常駐プロセスから情報を取得します.
+
+    :param url: 常駐プロセスの URL. 例) http://127.0.0.1:8765
+    :param places: 都道府県名(ローマ字)のリスト.
+    :param timeout: タイムアウト(秒).
+    :param fuzzy: True の場合、ローマ字の綴りの誤りを考慮して地名を探すように常駐プロセスに指定します.
+    :return: places と同じ順番に並べた結果のリスト.
+             地名が不明な場合は UnknownPlaceError、取得に失敗した場合は RuntimeError が入ります.
+    :raises OSError: 常駐プロセスに接続できない場合.
+    """
+    params = [("place", p) for p in places] + [("format", "json")]
+    if fuzzy:
+        params.append(("fuzzy", "1"))
+    query = urllib.parse.urlencode(params)
+    # ローカルへの接続なので、環境変数のプロキシ設定は使わない.
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    with opener.open(f"{url.rstrip('/')}/weather?{query}", timeout=timeout) as ret:
+        dat = json.loads(ret.read().decode("utf-8"))
+
+    results: List[Union[WeatherReport, Exception]] = []
+    for x in dat:
+        if "error" not in x:
+            results.append(as_report(x))
+        elif x.get("type") == "unknown_place":
+            results.append(UnknownPlaceError(x["error"]))
+        else:
+            results.append(RuntimeError(x["error"]))
+    return results
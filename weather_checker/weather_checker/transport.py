@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""Web API の応答を記録・再生するクライアントです.
+
+ネットワークにつながらない環境でのテストやベンチマークに使います.
+
+- RecordingTransport: 実際の応答を取得し、都市コードごとのファイルに保存します.
+- ReplayTransport: 保存したファイルから応答を返します.
+- ReplayServer: 保存したファイルを LWWS と同じ URL で返すローカルの HTTP サーバーです.
+  WeatherClient の url_base に ReplayServer.url_base を指定して使います.
+
+:Example:
+
+    >>> with RecordingTransport("fixtures") as client:
+    ...     get_information("Tokyo", client)
+    >>> get_information("Tokyo", ReplayTransport("fixtures")).place
+    '東京都'
+"""
+
+import os
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from typing import Any, Dict, Optional, Union
+
+from weather_checker.client import Transport, WeatherClient
+
+# LWWS の URL のパス.
+URL_PATH = "/forecast/webservice/json/v1"
+
+
+def _payload_path(directory: Path, code: str) -> Path:
+    """都市コードの応答を保存するファイルのパスを返します."""
+    # 都市コード以外の文字列でディレクトリの外を参照しないようにする.
+    if not code.isalnum():
+        raise KeyError(f"Invalid city code: {code}")
+    return directory / f"{code}.json"
+
+
+class ReplayTransport(Transport):
+    """ディレクトリに保存した応答を返すクライアント."""
+
+    def __init__(self, directory: Union[str, Path], preload: bool = False) -> None:
+        """コンストラクタ.
+
+        :param directory: 都市コードごとの応答 ``<都市コード>.json`` が入っているディレクトリ.
+        :param preload: True の場合は全てのファイルを読み込んでおき、以降はメモリ上から返します.
+        """
+        self.directory = Path(directory)
+        self._payloads: Dict[str, bytes] = {}
+        if preload:
+            for p in self.directory.glob("*.json"):
+                self._payloads[p.stem] = p.read_bytes()
+
+    def fetch(self, code: str) -> bytes:
+        """保存した応答を返します.
+
+        :param code: 都市コード.
+        :return: 保存した JSON.
+        :raises KeyError: 応答が保存されていない場合.
+        """
+        payload = self._payloads.get(code)
+        if payload is not None:
+            return payload
+        try:
+            return _payload_path(self.directory, code).read_bytes()
+        except FileNotFoundError:
+            raise KeyError(f"No recorded response: {code}")
+
+
+class RecordingTransport(Transport):
+    """実際の応答を取得し、ディレクトリに保存するクライアント."""
+
+    def __init__(self, directory: Union[str, Path], transport: Optional[Transport] = None) -> None:
+        """コンストラクタ.
+
+        :param directory: 応答を保存するディレクトリ.
+        :param transport: 応答を取得するクライアント. 省略した場合は WeatherClient を使います.
+        """
+        self.directory = Path(directory)
+        self.transport = transport or WeatherClient()
+
+    def fetch(self, code: str) -> bytes:
+        """応答を取得し、``<都市コード>.json`` に保存してから返します.
+
+        :param code: 都市コード.
+        :return: Web API が返した JSON.
+        """
+        payload = self.transport.fetch(code)
+        p = _payload_path(self.directory, code)
+        tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(payload)
+        os.replace(str(tmp), str(p))
+        return payload
+
+    def close(self) -> None:
+        """応答を取得するクライアントを閉じます."""
+        self.transport.close()
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    """ReplayServer のリクエストを処理するクラス."""
+
+    server: "ReplayServer"
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlparse(self.path)
+        code = urllib.parse.parse_qs(url.query).get("city", [""])[0]
+        try:
+            if url.path != URL_PATH:
+                raise KeyError(url.path)
+            payload = self.server.replay.fetch(code)
+        except KeyError:
+            self.send_error(404)
+            return
+
+        if self.server.latency:
+            # 実際の Web API の応答時間を模倣する.
+            time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class ReplayServer(ThreadingMixIn, HTTPServer):
+    """保存した応答を LWWS と同じ URL で返すローカルの HTTP サーバー."""
+
+    daemon_threads = True
+
+    def __init__(self, directory: Union[str, Path], host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0) -> None:
+        """コンストラクタ.
+
+        :param directory: 都市コードごとの応答が入っているディレクトリ.
+        :param host: 待ち受けるアドレス.
+        :param port: 待ち受けるポート番号. 0 の場合は空いているポートを使います.
+        :param latency: 応答を返すまでに待つ時間(秒).
+        """
+        super().__init__((host, port), _ReplayHandler)
+        self.replay = ReplayTransport(directory, preload=True)
+        self.latency = latency
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url_base(self) -> str:
+        """WeatherClient の url_base に指定する URL を返します."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{URL_PATH}"
+
+    def __enter__(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.shutdown()
+        self.server_close()